@@ -0,0 +1,76 @@
+"""
+Message History Compaction
+Keeps AgentState.messages bounded by folding old messages into a structured summary
+"""
+from typing import Dict, Any, Optional
+from langchain_core.messages import HumanMessage, AIMessage, RemoveMessage
+from app.agent.models import AgentState, HistorySummary
+
+
+# Number of completed flows kept verbatim in the summary
+MAX_SUMMARY_FLOWS = 10
+
+
+def summarize_flow(state: AgentState) -> Dict[str, Any]:
+    """
+    Capture the outcome of the current flow before its fields are reset
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Compact flow record
+    """
+    return {
+        "intent": state.get("intent"),
+        "order_number": state.get("order_number"),
+        "desired_action": state.get("desired_action"),
+        "ticket_id": (state.get("action_ticket") or {}).get("id"),
+    }
+
+
+def compact_history(
+    state: AgentState,
+    window: int,
+    completed_flow: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Trim messages to the last `window` entries and fold the rest into history_summary
+    Pure function - returns a state update (RemoveMessage markers + new summary)
+
+    Args:
+        state: Current agent state
+        window: Number of messages to keep verbatim (<= 0 disables trimming)
+        completed_flow: Flow record to fold into the summary (from the reset path)
+
+    Returns:
+        State update, or empty dict if nothing changed
+    """
+    messages = state.get("messages", [])
+    overflow = len(messages) - window if window > 0 else 0
+
+    if overflow <= 0 and not completed_flow:
+        return {}
+
+    summary = HistorySummary(**(state.get("history_summary") or {}))
+
+    removals = []
+    for msg in messages[:max(overflow, 0)]:
+        if not msg.id:
+            continue
+        removals.append(RemoveMessage(id=msg.id))
+        summary.compacted_messages += 1
+        if isinstance(msg, HumanMessage):
+            summary.user_messages += 1
+        elif isinstance(msg, AIMessage):
+            summary.assistant_messages += 1
+
+    if completed_flow:
+        summary.flows_completed += 1
+        summary.recent_flows = (summary.recent_flows + [completed_flow])[-MAX_SUMMARY_FLOWS:]
+
+    update: Dict[str, Any] = {"history_summary": summary.model_dump()}
+    if removals:
+        update["messages"] = removals
+
+    return update
@@ -0,0 +1,246 @@
+"""
+Fast-path Intent Classifier
+Local tiers that run before the LLM: compiled request phrases, then an optional
+bag-of-words logistic model trained offline (scripts/train_intent_model.py).
+The LLM is only called when neither tier is confident.
+"""
+import logging
+import json
+import math
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+from app.agent.order_numbers import order_number_recognizer
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+INTENTS = ("return", "refund", "order_status", "other")
+
+# Keyword tier - seeded from the examples in classify_intent.SYSTEM_PROMPT.
+# A keyword alone is only a hint ("What is your return policy?", "Where is my
+# refund?" are not return/refund requests); it is trusted when the message also
+# carries an order number.
+KEYWORD_RULES = {
+    "return": re.compile(r"\b(return(s|ed|ing)?|send (it|this|them) back)\b"),
+    "refund": re.compile(r"\b(refund(ed|s)?|money back)\b"),
+    "order_status": re.compile(
+        r"\b(where('s| is) my (order|package)|status of my (order|package)|order status|track(ing)?|shipped)\b"
+    ),
+    "other": re.compile(r"\b(phone number|opening hours)\b"),
+}
+
+# Verb phrases that state the request outright - confident on their own
+INTENT_PHRASES = {
+    "return": re.compile(
+        r"\b((want|need|like|wish|trying|have) to return|"
+        r"return (my|this|the|these|those|an?) (order|item|package|purchase|product)s?|"
+        r"send (it|this|them) back)\b"
+    ),
+    "refund": re.compile(
+        r"\b((want|need|like|get|have|request) (a|my) refund|"
+        r"refund (my|this|the) (order|purchase|item)|"
+        r"(want|need|like|get) my money back)\b"
+    ),
+    "order_status": re.compile(
+        r"\b(where('s| is) my (order|package)|status of my (order|package)|"
+        r"track my (order|package)|has my (order|package) shipped)\b"
+    ),
+    "other": re.compile(r"\b(your (phone number|opening hours))\b"),
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+class IntentPrediction(BaseModel):
+    """Local classification result"""
+    intent: str
+    confidence: float
+    tier: str
+    confident: bool
+
+
+def extract_features(text: str) -> List[str]:
+    """
+    Tokenize text into unigram and bigram features
+
+    Args:
+        text: Raw user message
+
+    Returns:
+        Feature list
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class BagOfWordsModel:
+    """
+    Multinomial logistic regression over bag-of-words features
+    Weights are produced offline by scripts/train_intent_model.py
+    """
+
+    def __init__(self, intents: List[str], bias: Dict[str, float], weights: Dict[str, Dict[str, float]]):
+        self.intents = intents
+        self.bias = bias
+        self.weights = weights
+
+    @classmethod
+    def load(cls, path: Path) -> "BagOfWordsModel":
+        """
+        Load model weights from a JSON file
+
+        Args:
+            path: Model file path
+
+        Returns:
+            Loaded model
+        """
+        data = json.loads(Path(path).read_text())
+        return cls(data["intents"], data["bias"], data["weights"])
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        """
+        Compute intent probabilities
+
+        Args:
+            text: Raw user message
+
+        Returns:
+            Probability per intent
+        """
+        scores = dict(self.bias)
+        for feature in set(extract_features(text)):
+            for intent, weight in self.weights.get(feature, {}).items():
+                scores[intent] += weight
+
+        top = max(scores.values())
+        exp_scores = {intent: math.exp(score - top) for intent, score in scores.items()}
+        total = sum(exp_scores.values())
+        return {intent: value / total for intent, value in exp_scores.items()}
+
+
+class IntentClassifier:
+    """Tiered local classifier (keyword rules → bag-of-words model)"""
+
+    def __init__(self, model: Optional[BagOfWordsModel] = None, threshold: float = 0.9):
+        """
+        Initialize the classifier
+
+        Args:
+            model: Optional trained model for the second tier
+            threshold: Minimum model probability to skip the LLM
+        """
+        self.model = model
+        self.threshold = threshold
+
+    def _keyword_tier(self, text: str) -> Optional[IntentPrediction]:
+        started = time.perf_counter()
+        lowered = text.lower()
+        keywords = [intent for intent, pattern in KEYWORD_RULES.items() if pattern.search(lowered)]
+        phrases = [intent for intent, pattern in INTENT_PHRASES.items() if pattern.search(lowered)]
+
+        # Confident only for one unambiguous intent that is either stated as a
+        # request or comes with an order number; bare keywords fall through
+        candidates = set(keywords) | set(phrases)
+        confident = len(candidates) == 1 and (
+            bool(phrases) or order_number_recognizer.recognize(text) is not None
+        )
+        metrics.histogram("intent_tier_latency_seconds", tier="keyword").observe(time.perf_counter() - started)
+
+        if not candidates:
+            return None
+        return IntentPrediction(
+            intent=(phrases or keywords)[0],
+            confidence=1.0 if confident else 0.5 / len(candidates),
+            tier="keyword",
+            confident=confident
+        )
+
+    def _model_tier(self, text: str) -> Optional[IntentPrediction]:
+        if not self.model:
+            return None
+
+        started = time.perf_counter()
+        probabilities = self.model.predict_proba(text)
+        metrics.histogram("intent_tier_latency_seconds", tier="model").observe(time.perf_counter() - started)
+
+        intent, confidence = max(probabilities.items(), key=lambda item: item[1])
+        return IntentPrediction(
+            intent=intent,
+            confidence=confidence,
+            tier="model",
+            confident=confidence >= self.threshold
+        )
+
+    def predict(self, text: str) -> Optional[IntentPrediction]:
+        """
+        Run the local tiers in order, stopping at the first confident one
+
+        Args:
+            text: Raw user message
+
+        Returns:
+            Confident prediction, the best low-confidence guess, or None
+        """
+        best = None
+        for tier in (self._keyword_tier, self._model_tier):
+            prediction = tier(text)
+            if prediction is None:
+                continue
+            if prediction.confident:
+                metrics.counter("intent_classifications_total", tier=prediction.tier).inc()
+                return prediction
+            if best is None or prediction.confidence > best.confidence:
+                best = prediction
+        return best
+
+
+def record_llm_classification(
+    intent: str,
+    local_guess: Optional[IntentPrediction],
+    latency: float,
+    shadow: bool = False
+):
+    """
+    Record an LLM classification and its agreement with the local tiers
+
+    Args:
+        intent: Intent returned by the LLM
+        local_guess: Local prediction for the same message (if any)
+        latency: LLM round trip in seconds
+        shadow: True for background re-checks of fast-path hits (not counted as LLM classifications)
+    """
+    if not shadow:
+        metrics.counter("intent_classifications_total", tier="llm").inc()
+    metrics.histogram("intent_tier_latency_seconds", tier="llm").observe(latency)
+    if local_guess is not None:
+        result = "agree" if local_guess.intent == intent else "disagree"
+        metrics.counter("intent_llm_agreement_total", tier=local_guess.tier, result=result).inc()
+
+
+_classifier: Optional[IntentClassifier] = None
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """
+    Get the process-wide classifier, loading the trained model once if configured
+
+    Returns:
+        IntentClassifier instance
+    """
+    global _classifier
+
+    if _classifier is None:
+        model = None
+        if settings.intent_model_path and Path(settings.intent_model_path).exists():
+            model = BagOfWordsModel.load(settings.intent_model_path)
+            logger.info("Loaded bag-of-words model from %s", settings.intent_model_path)
+        _classifier = IntentClassifier(model, settings.intent_model_threshold)
+
+    return _classifier
@@ -0,0 +1,133 @@
+"""
+LLM Response Cache
+Caches deterministic (temperature=0) LLM answers keyed by prompt version and
+normalized message text: an in-process LRU tier plus an optional shared
+MongoDB tier expired by a TTL index
+"""
+import logging
+import hashlib
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+from app.core.database import db
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# Collection backing the shared tier (TTL index declared in app/core/indexes.py)
+LLM_CACHE_COLLECTION = "llm_cache"
+
+EDGE_PUNCTUATION = " \t\n.!?,;:"
+
+
+def normalize_message(text: str) -> str:
+    """
+    Normalize a user message for cache lookup
+
+    Args:
+        text: Raw user message
+
+    Returns:
+        Lower-cased text with collapsed whitespace and no surrounding punctuation
+    """
+    return re.sub(r"\s+", " ", text.lower()).strip(EDGE_PUNCTUATION)
+
+
+class LLMResponseCache:
+    """
+    Get-or-compute cache for one prompt
+
+    The prompt version is a hash of the prompt text and model name, so editing
+    a prompt (or switching models) changes every key and old answers are
+    never served.
+    """
+
+    def __init__(self, name: str, prompt: str):
+        """
+        Initialize the cache
+
+        Args:
+            name: Cache name (metrics label and key namespace)
+            prompt: Prompt template the cached answers were produced with
+        """
+        self.name = name
+        self.prompt_version = hashlib.sha256(f"{settings.openai_model}\n{prompt}".encode()).hexdigest()[:16]
+        self.local = TTLCache(f"llm_{name}", settings.llm_cache_max_entries, settings.llm_cache_ttl_seconds)
+
+    def key(self, message: str) -> str:
+        """
+        Build the cache key for a message
+
+        Args:
+            message: Raw user message
+
+        Returns:
+            Namespaced key
+        """
+        digest = hashlib.sha256(normalize_message(message).encode()).hexdigest()
+        return f"{self.name}:{self.prompt_version}:{digest}"
+
+    @staticmethod
+    def _shared_collection() -> Optional[AsyncIOMotorCollection]:
+        if not settings.llm_cache_shared or db.db is None:
+            return None
+        return db.db[LLM_CACHE_COLLECTION]
+
+    async def get_or_compute(self, message: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """
+        Return the cached answer for a message, calling the LLM on a miss
+
+        Args:
+            message: Raw user message
+            compute: Coroutine factory that calls the LLM
+
+        Returns:
+            LLM answer (cached or fresh)
+        """
+        if not settings.llm_cache_enabled:
+            return await compute()
+
+        key = self.key(message)
+        value = self.local.get(key)
+        if value is not MISSING:
+            return value
+
+        shared = self._shared_collection()
+        if shared is not None:
+            try:
+                doc = await shared.find_one({"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}})
+            except Exception as e:
+                logger.warning("Shared tier read failed: %s", e)
+                doc = None
+            if doc:
+                metrics.counter("cache_hits_total", cache=f"llm_{self.name}_shared").inc()
+                self.local.set(key, doc["value"])
+                return doc["value"]
+            metrics.counter("cache_misses_total", cache=f"llm_{self.name}_shared").inc()
+
+        value = await compute()
+        self.local.set(key, value)
+
+        if shared is not None:
+            try:
+                await shared.update_one(
+                    {"_id": key},
+                    {"$set": {
+                        "value": value,
+                        "cache": self.name,
+                        "prompt_version": self.prompt_version,
+                        "expires_at": datetime.now(timezone.utc) + timedelta(seconds=settings.llm_cache_ttl_seconds),
+                    }},
+                    upsert=True
+                )
+            except Exception as e:
+                logger.warning("Shared tier write failed: %s", e)
+
+        return value
+
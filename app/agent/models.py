@@ -24,6 +24,15 @@ class ActionTicket(BaseModel):
     status: Optional[Literal["created", "duplicate", "failed"]] = None
 
 
+class HistorySummary(BaseModel):
+    """Structured summary of messages folded out of the retention window (no LLM)"""
+    compacted_messages: int = 0
+    user_messages: int = 0
+    assistant_messages: int = 0
+    flows_completed: int = 0
+    recent_flows: list[dict] = Field(default_factory=list)  # [{intent, order_number, desired_action, ticket_id}]
+
+
 class Meta(BaseModel):
     """Metadata for the conversation"""
     session_id: str
@@ -38,10 +47,12 @@ class AgentState(TypedDict):
     """
     # Conversation history - MUST use add_messages reducer for checkpointing!
     # This tells LangGraph to APPEND new messages instead of replacing
+    # Bounded to the last N messages; older ones are folded into history_summary
     messages: Annotated[list, add_messages]
+    history_summary: dict  # HistorySummary model as dict
     
     # Intent classification
-    intent: Optional[Literal["return", "refund", "other"]]
+    intent: Optional[Literal["return", "refund", "order_status", "other"]]
     
     # Order information
     order_number: Optional[str]
@@ -54,15 +65,19 @@ class AgentState(TypedDict):
     
     # Action decision
     desired_action: Optional[Literal["return", "refund", "cancel"]]
+    action_preference: Optional[Literal["return", "refund"]]  # Stated by the user up front (joint NLU)
     
     # Processing
     action_ticket: dict  # ActionTicket model as dict
     
     # Communication
-    email_status: Optional[Literal["sent", "failed"]]
+    email_status: Optional[Literal["queued", "failed"]]  # Queuing outcome; delivery is tracked in the outbox
     
     # Conversation flow control
     conversation_complete: Optional[bool]  # Flag to allow new intent after conversation ends
+    phase: Optional[Literal["status_shown"]]  # Milestone set by workers, read by the routing table
+    awaiting_user: Optional[bool]  # Set when a worker asked the user something; cleared by each new turn
+    nlu_extracted: Optional[bool]  # Joint NLU already read slots from this turn's message; cleared by each new turn
     
     # Error handling
     error: Optional[dict]  # {code: str, message: str}
@@ -0,0 +1,210 @@
+"""
+Order Number Recognizer
+Compiled multi-format matcher with normalization, shape validation and fuzzy
+prefix correction, so slot filling only falls back to the LLM when nothing
+plausible is found in the message
+"""
+import re
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List, Optional, Tuple
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+
+# Unicode dashes / underscores users paste instead of "-"
+DASH_VARIANTS = re.compile(r"[‐-―−﹘﹣－_]")
+
+# Characters commonly confused with letters when typing the prefix
+CONFUSABLES = str.maketrans({"0": "O", "1": "I", "5": "S", "8": "B"})
+
+# Loose formats (legacy codes, long numbers) also look like phone numbers; they
+# only count when one of these words appears shortly before them
+ORDER_CONTEXT = re.compile(r"\b(ORDER|ORD|REFERENCE|REF|CONFIRMATION|INVOICE)\b")
+ORDER_CONTEXT_CHARS = 30
+
+# Widest "YYYY-YYYY" span read as a year range rather than a bare order number
+YEAR_RANGE_SPAN = 10
+
+
+def canonical_order_number(prefix: str, year: str, sequence: str) -> str:
+    """
+    Canonical form of a prefixed order number (sequence zero-padded to 3 digits)
+
+    Args:
+        prefix: Known prefix (e.g. "ORD")
+        year: Four-digit year
+        sequence: Sequence number as typed ("1", "001", "0001")
+
+    Returns:
+        Order number as stored, e.g. "ORD-2024-001"
+    """
+    return f"{prefix}-{year}-{int(sequence):03d}"
+
+
+class OrderNumberMatch(BaseModel):
+    """Recognized order number"""
+    order_number: str
+    format: str
+    corrected: bool = False
+
+
+class OrderNumberFormat:
+    """
+    A single recognizable order-number format
+
+    The pattern runs against normalized (upper-cased, dash-unified) text; the
+    builder turns a match into (canonical order number, prefix_corrected), or
+    None when the candidate fails shape validation. Formats with
+    needs_context only match after an order keyword (see ORDER_CONTEXT).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        pattern: str,
+        builder: Callable[[re.Match], Optional[Tuple[str, bool]]],
+        needs_context: bool = False
+    ):
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.builder = builder
+        self.needs_context = needs_context
+
+
+def _edit_distance(a: str, b: str) -> int:
+    """Damerau-Levenshtein distance (optimal string alignment) for short tokens"""
+    rows = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        rows[i][0] = i
+    for j in range(len(b) + 1):
+        rows[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            rows[i][j] = min(rows[i - 1][j] + 1, rows[i][j - 1] + 1, rows[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                rows[i][j] = min(rows[i][j], rows[i - 2][j - 2] + 1)
+    return rows[-1][-1]
+
+
+class OrderNumberRecognizer:
+    """Ordered set of compiled formats; the first valid match wins"""
+
+    def __init__(self, prefixes: Iterable[str], min_year: int = 2000):
+        """
+        Initialize the recognizer
+
+        Args:
+            prefixes: Known order-number prefixes (first is the default for bare numbers)
+            min_year: Oldest plausible order year
+        """
+        self.prefixes = [prefix.strip().upper() for prefix in prefixes if prefix.strip()]
+        self.min_year = min_year
+        self.formats: List[OrderNumberFormat] = [
+            # Canonical ORD-2024-001, tolerating spaces/missing dashes and a mistyped prefix
+            OrderNumberFormat(
+                "canonical",
+                r"\b([A-Z0-9]{2,4})\s?-?\s?((?:19|20)\d{2})\s?-?\s?(\d{1,6})\b",
+                self._build_canonical,
+            ),
+            # Bare 2024-001 (prefix omitted; year ranges like 2024-2025 are skipped)
+            OrderNumberFormat(
+                "bare",
+                r"(?<![\w-])((?:19|20)\d{2})-(\d{3,6})\b",
+                self._build_bare,
+            ),
+            # Legacy ABC-123456 / ABC123456 codes ("order ABC-123456")
+            OrderNumberFormat(
+                "legacy",
+                r"\b([A-Z0-9]{3}-?[0-9]{6,})\b",
+                lambda match: (match.group(1), False),
+                needs_context=True,
+            ),
+            # Long numeric references ("order #1234567890", not "call me at 5551234567")
+            OrderNumberFormat(
+                "numeric",
+                r"\b([0-9]{10,})\b",
+                lambda match: (match.group(1), False),
+                needs_context=True,
+            ),
+        ]
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize case, dash variants and whitespace
+
+        Args:
+            text: Raw user message
+
+        Returns:
+            Normalized text the format patterns run against
+        """
+        text = DASH_VARIANTS.sub("-", text.upper())
+        return re.sub(r"\s*-\s*", "-", re.sub(r"\s+", " ", text))
+
+    def correct_prefix(self, token: str) -> Optional[str]:
+        """
+        Map a candidate prefix to a known one
+
+        Args:
+            token: Prefix as typed (normalized)
+
+        Returns:
+            Known prefix, or None if the token is not close to any
+        """
+        if token in self.prefixes:
+            return token
+        candidate = token.translate(CONFUSABLES)
+        if candidate in self.prefixes:
+            return candidate
+        # Single typo (substitution, insertion, deletion or transposition)
+        close = [prefix for prefix in self.prefixes if len(prefix) >= 3 and _edit_distance(candidate, prefix) == 1]
+        return close[0] if len(close) == 1 else None
+
+    def _valid_year(self, year: str) -> bool:
+        return self.min_year <= int(year) <= datetime.now(timezone.utc).year + 1
+
+    def _build_canonical(self, match: re.Match) -> Optional[Tuple[str, bool]]:
+        token, year, sequence = match.groups()
+        prefix = self.correct_prefix(token)
+        if not prefix or not self._valid_year(year) or int(sequence) == 0:
+            return None
+        return canonical_order_number(prefix, year, sequence), prefix != token
+
+    def _build_bare(self, match: re.Match) -> Optional[Tuple[str, bool]]:
+        year, sequence = match.groups()
+        if not self.prefixes or not self._valid_year(year) or int(sequence) == 0:
+            return None
+        # "2024-2025" is a year range, not order 2025 of 2024
+        if len(sequence) == 4 and int(year) < int(sequence) <= int(year) + YEAR_RANGE_SPAN:
+            return None
+        return canonical_order_number(self.prefixes[0], year, sequence), False
+
+    def recognize(self, text: str) -> Optional[OrderNumberMatch]:
+        """
+        Find the first plausible order number in a message
+
+        Args:
+            text: Raw user message
+
+        Returns:
+            OrderNumberMatch, or None if no format matched
+        """
+        normalized = self.normalize(text)
+        for order_format in self.formats:
+            for match in order_format.pattern.finditer(normalized):
+                if order_format.needs_context and not ORDER_CONTEXT.search(
+                    normalized, max(0, match.start() - ORDER_CONTEXT_CHARS), match.start()
+                ):
+                    continue
+                built = order_format.builder(match)
+                if built:
+                    order_number, corrected = built
+                    return OrderNumberMatch(order_number=order_number, format=order_format.name, corrected=corrected)
+        return None
+
+
+# Global recognizer instance
+order_number_recognizer = OrderNumberRecognizer(settings.order_number_prefixes.split(","))
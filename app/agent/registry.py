@@ -0,0 +1,174 @@
+"""
+Worker Registry
+Declares every worker node once (name, dependencies, supervisor route key);
+the graph, its routing map and the node instrumentation are built from it
+"""
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, get_args
+
+from app.agent.models import AgentState
+from app.agent.supervisor import Route
+from app.agent.workers.classify_intent import classify_intent_worker
+from app.agent.workers.speculative_intake import speculative_intake_worker
+from app.agent.workers.joint_nlu import joint_nlu_worker
+from app.agent.workers.slot_filler import slot_filler_worker
+from app.agent.workers.order_lookup import order_lookup_worker
+from app.agent.workers.confirm_details import confirm_details_worker
+from app.agent.workers.policy_check import policy_check_worker
+from app.agent.workers.decide_action import decide_action_worker
+from app.agent.workers.process_return import process_return_worker
+from app.agent.workers.process_refund import process_refund_worker
+from app.agent.workers.email import email_worker
+from app.agent.workers.show_order_status import show_order_status_worker
+from app.agent.workers.finalize import finalize_worker
+
+logger = logging.getLogger(__name__)
+
+
+# Route value meaning "stop and wait for the user"
+END_ROUTE = "__end__"
+
+
+class WorkerSpec:
+    """Declaration of one worker node"""
+
+    def __init__(
+        self,
+        name: str,
+        worker: Callable[..., Awaitable[Dict[str, Any]]],
+        deps: Tuple[str, ...] = (),
+        route: Optional[str] = None,
+        terminal: bool = False
+    ):
+        """
+        Declare a worker
+
+        Args:
+            name: Graph node name (also used in stream events and metric labels)
+            worker: Async worker called as worker(state, *deps)
+            deps: Names of the dependencies passed after the state, in order
+                ("llm", "db", or an option given to create_agent_graph)
+            route: Value the supervisor router returns for this node (defaults to name)
+            terminal: Edge straight to END instead of back to the supervisor
+        """
+        self.name = name
+        self.worker = worker
+        self.deps = deps
+        self.route = route or name
+        self.terminal = terminal
+
+
+async def intake_worker(state: AgentState, llm, db, speculative: bool, joint_nlu: bool) -> Dict[str, Any]:
+    """
+    Classify intent (and, depending on the options, extract slots and prefetch the order)
+
+    Args:
+        state: Current agent state
+        llm: Language model instance
+        db: MongoDB database instance
+        speculative: Overlap classification with order extraction/prefetch
+        joint_nlu: Extract intent + slots with one structured LLM call when the
+            local tiers can't
+
+    Returns:
+        Updated state
+    """
+    async def intake(state: AgentState):
+        if speculative:
+            # May also commit slot_filler + order_lookup results; the supervisor
+            # then skips those nodes because their state is already set
+            return await speculative_intake_worker(state, llm, db)
+        return await classify_intent_worker(state, llm)
+
+    if joint_nlu:
+        return await joint_nlu_worker(state, llm, intake)
+    return await intake(state)
+
+
+# Entry node of every turn
+ENTRY_POINT = "classify_intent"
+
+WORKERS: Tuple[WorkerSpec, ...] = (
+    WorkerSpec("classify_intent", intake_worker, deps=("llm", "db", "speculative", "joint_nlu")),
+    WorkerSpec("slot_filler", slot_filler_worker, deps=("llm",)),
+    WorkerSpec("order_lookup", order_lookup_worker, deps=("db",)),
+    WorkerSpec("confirm_details", confirm_details_worker),
+    WorkerSpec("policy_check", policy_check_worker),
+    WorkerSpec("decide_action", decide_action_worker),
+    WorkerSpec("process_return", process_return_worker, deps=("db",)),
+    WorkerSpec("process_refund", process_refund_worker, deps=("db",)),
+    WorkerSpec("email", email_worker, deps=("db",), route="send_email"),
+    WorkerSpec("show_order_status", show_order_status_worker),
+    WorkerSpec("finalize", finalize_worker, terminal=True),
+)
+
+
+def validate_registry(workers: Iterable[WorkerSpec], routes: Iterable[str], deps: Dict[str, Any]):
+    """
+    Check the registry against the routes the supervisor can return
+
+    Args:
+        workers: Worker declarations
+        routes: Every route the supervisor can produce
+        deps: Dependencies available to workers
+
+    Raises:
+        ValueError: On duplicate names/routes, missing dependencies, routes
+            without a node, or nodes the supervisor never routes to
+    """
+    workers = list(workers)
+    routes = set(routes)
+    problems = []
+
+    names = [spec.name for spec in workers]
+    route_keys = [spec.route for spec in workers]
+    for label, values in (("node name", names), ("route", route_keys)):
+        duplicates = sorted({value for value in values if values.count(value) > 1})
+        if duplicates:
+            problems.append(f"duplicate {label}s: {duplicates}")
+
+    if ENTRY_POINT not in names:
+        problems.append(f"entry point {ENTRY_POINT!r} is not registered")
+
+    for spec in workers:
+        missing = [dep for dep in spec.deps if dep not in deps]
+        if missing:
+            problems.append(f"{spec.name} needs missing dependencies {missing}")
+
+    # The Route literal documents the router's outputs; both must resolve to a node
+    declared = set(get_args(Route))
+    mismatched = sorted((routes | declared) - set(route_keys) - {END_ROUTE})
+    if mismatched:
+        problems.append(f"routes without a registered node: {mismatched}")
+
+    unreachable = sorted(spec.name for spec in workers if spec.route not in routes and spec.name != ENTRY_POINT)
+    if unreachable:
+        problems.append(f"nodes the supervisor never routes to: {unreachable}")
+
+    if problems:
+        raise ValueError("Invalid worker registry: " + "; ".join(problems))
+
+
+def bind_worker(spec: WorkerSpec, deps: Dict[str, Any]) -> Callable[[AgentState], Awaitable[Dict[str, Any]]]:
+    """
+    Create the graph node for a worker, with its dependencies bound
+
+    Args:
+        spec: Worker declaration
+        deps: Dependencies available to workers
+
+    Returns:
+        Async node function taking the state
+    """
+    name = spec.name
+    worker = spec.worker
+    args = tuple(deps[dep] for dep in spec.deps)
+
+    async def node(state: AgentState):
+        logger.debug("Executing %s", name)
+        result = await worker(state, *args)
+        logger.debug("%s updated %s", name, result.keys())
+        return result
+
+    node.__name__ = f"{name}_node"
+    return node
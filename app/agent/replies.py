@@ -0,0 +1,48 @@
+"""
+Worker Reply Helpers
+Workers emit ONLY their new messages; the add_messages reducer appends them to history
+"""
+from datetime import datetime, timezone
+from typing import Dict, Any
+from langchain_core.messages import AIMessage
+
+
+def message_timestamp() -> Dict[str, str]:
+    """
+    Message kwargs recording when a message was created (shown in history)
+
+    Returns:
+        additional_kwargs for a LangChain message
+    """
+    return {"timestamp": datetime.now(timezone.utc).isoformat()}
+
+
+def reply(content: str) -> Dict[str, Any]:
+    """
+    Build the message delta for a worker update
+
+    Contract: never return `messages + [...]` from a worker. Returning the full
+    history makes add_messages re-match every existing message ID on each node,
+    so per-node cost grows with conversation length.
+
+    Args:
+        content: Assistant message text
+
+    Returns:
+        Partial state update with the single new message
+    """
+    return {"messages": [AIMessage(content=content, additional_kwargs=message_timestamp())]}
+
+
+def ask(content: str) -> Dict[str, Any]:
+    """
+    Build the message delta for a worker that asks the user something
+    Sets awaiting_user so the supervisor ends the turn without inspecting message text
+
+    Args:
+        content: Assistant question text
+
+    Returns:
+        Partial state update with the new message and awaiting_user flag
+    """
+    return {**reply(content), "awaiting_user": True}
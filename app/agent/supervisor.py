@@ -1,144 +1,193 @@
 """
 Supervisor
 Implements deterministic routing logic for the agent workflow
+
+Routing decisions are precomputed into a transition table when the graph is
+compiled. At runtime the router reduces the state to a small signature of
+flags (including the explicit `phase` / `awaiting_user` fields set by workers)
+and does a single dictionary lookup - no message text scanning.
 """
-from typing import Literal
-from langchain_core.messages import AIMessage
+import logging
+from itertools import product
+from typing import Dict, Literal, Optional, Tuple
 from app.agent.models import AgentState
 
+logger = logging.getLogger(__name__)
+
 
-def supervisor_router(state: AgentState) -> Literal[
+Route = Literal[
     "classify_intent", "slot_filler", "order_lookup", "confirm_details",
     "policy_check", "decide_action", "process_return", "process_refund",
     "send_email", "show_order_status", "finalize", "__end__"
-]:
+]
+
+# Signature used for error / conversation_complete states (always END)
+HALTED = ("halted",)
+
+# Value domains of each signature field, in signature order
+SIGNATURE_DOMAINS = (
+    (None, "return", "refund", "order_status", "other"),  # intent
+    (False, True),                                      # has order_number
+    (False, True),                                      # has order
+    (None, True, False),                                # user_confirmed_order
+    (False, True),                                      # has eligibility
+    (False, True),                                      # eligibility["eligible"]
+    (None, "return", "refund", "cancel"),               # desired_action
+    (False, True),                                      # has ticket id
+    (False, True),                                      # has email_status
+    (False, True),                                      # phase == "status_shown"
+    (False, True),                                      # awaiting_user
+)
+
+
+def routing_signature(state: AgentState) -> Tuple:
     """
-    Routes to the appropriate worker based on state
-    
+    Reduce state to the flags that determine routing
+
     Args:
         state: Current agent state
-        
+
+    Returns:
+        Hashable signature used as the routing table key
+    """
+    if state.get("error") or state.get("conversation_complete"):
+        return HALTED
+
+    eligibility = state.get("eligibility") or {}
+    confirmed = state.get("user_confirmed_order")
+
+    return (
+        state.get("intent"),
+        bool(state.get("order_number")),
+        bool(state.get("order")),
+        None if confirmed is None else bool(confirmed),
+        bool(eligibility),
+        bool(eligibility.get("eligible")),
+        state.get("desired_action"),
+        bool((state.get("action_ticket") or {}).get("id")),
+        bool(state.get("email_status")),
+        state.get("phase") == "status_shown",
+        bool(state.get("awaiting_user")),
+    )
+
+
+def decide_route(signature: Tuple) -> Route:
+    """
+    Reference routing rules, evaluated in priority order
+    Used to build the transition table; only called directly for signatures
+    outside the precomputed domains
+
+    Args:
+        signature: Output of routing_signature
+
     Returns:
         Name of next worker node to execute, or "__end__" to stop
     """
-    print("\n=== SUPERVISOR ROUTING ===")
-    print(f"Intent: {state.get('intent')}")
-    print(f"Order Number: {state.get('order_number')}")
-    print(f"Order: {state.get('order')}")
-    print(f"User Confirmed: {state.get('user_confirmed_order')}")
-    print(f"Eligibility: {state.get('eligibility')}")
-    print(f"Desired Action: {state.get('desired_action')}")
-    print(f"Action Ticket: {state.get('action_ticket')}")
-    print(f"Email Status: {state.get('email_status')}")
-    print(f"Error: {state.get('error')}")
-    print(f"Conversation Complete: {state.get('conversation_complete')}")
-    print(f"Messages count: {len(state.get('messages', []))}")
-    
-    # Check if there's an error - stop and wait for user to fix it
-    if state.get("error"):
-        print("→ Routing to: END (error occurred, waiting for user)")
+    # Error or completed conversation - stop and wait for the user
+    if signature == HALTED:
         return "__end__"
-    
-    # If conversation is complete, don't route anywhere - wait for new intent classification
-    if state.get("conversation_complete"):
-        print("→ Routing to: END (conversation complete, waiting for new request)")
+
+    (intent, has_order_number, has_order, confirmed, has_eligibility, eligible,
+     desired_action, has_ticket, has_email_status, status_shown, awaiting_user) = signature
+
+    # Order status: show it once, then finalize (before the awaiting check, as the
+    # status template may contain questions)
+    if intent == "order_status" and has_order:
+        return "finalize" if status_shown else "show_order_status"
+
+    # The last worker asked the user something - wait for the response
+    if awaiting_user:
         return "__end__"
-    
-    # Get references we'll need
-    messages = state.get("messages", [])
-    intent = state.get("intent")
-    
-    # Special check for order_status: if we just showed status, go to finalize next
-    # This must come BEFORE the generic "?" check because status messages might contain "?"
-    if intent == "order_status" and state.get("order"):
-        if messages and isinstance(messages[-1], AIMessage):
-            last_msg = messages[-1].content
-            print(f"[DEBUG] Last message content: {last_msg[:200]}...")
-            # Check for markers from show_order_status template
-            if "Order #" in last_msg or "• Status:" in last_msg or "• Delivery:" in last_msg:
-                print("→ Routing to: finalize (order status shown)")
-                return "finalize"
-            # Otherwise, need to show status
-            print("→ Routing to: show_order_status (order status check)")
-            return "show_order_status"
-    
-    # Check if last message is from assistant (we just asked user something)
-    if messages and isinstance(messages[-1], AIMessage):
-        last_content = messages[-1].content
-        # If we just asked a question, stop here and wait for user response
-        if "?" in last_content or "please" in last_content.lower():
-            print("→ Routing to: END (waiting for user response)")
-            return "__end__"
-    
+
     # 1. First classify intent if not set
-    if not state.get("intent"):
-        print("→ Routing to: classify_intent (no intent)")
+    if not intent:
         return "classify_intent"
-    
+
     # 2. Get order number if intent needs it (return/refund/order_status)
-    intent = state.get("intent")
-    if intent in ["return", "refund", "order_status"] and not state.get("order_number"):
-        print("→ Routing to: slot_filler (need order number)")
+    if intent in ("return", "refund", "order_status") and not has_order_number:
         return "slot_filler"
-    
+
     # 3. Look up order if we have order number but no order details
-    if state.get("order_number") and not state.get("order"):
-        print("→ Routing to: order_lookup (have order number, need order)")
+    if has_order_number and not has_order:
         return "order_lookup"
-    
+
     # 4. Confirm order details with user if not confirmed (for return/refund only)
-    if state.get("order") and state.get("user_confirmed_order") is None and intent in ["return", "refund"]:
-        print("→ Routing to: confirm_details (need confirmation)")
+    if has_order and confirmed is None and intent in ("return", "refund"):
         return "confirm_details"
-    
+
     # 5. If user declined, end conversation
-    if state.get("user_confirmed_order") is False:
-        print("→ Routing to: finalize (user declined)")
+    if confirmed is False:
         return "finalize"
-    
+
     # 6. Check policy eligibility if confirmed but not checked
-    if state.get("user_confirmed_order") and not state.get("eligibility"):
-        print("→ Routing to: policy_check (need eligibility check)")
+    if confirmed and not has_eligibility:
         return "policy_check"
-    
+
     # 7. Decide action if eligible but no decision made
-    eligibility = state.get("eligibility", {})
-    if eligibility.get("eligible") and not state.get("desired_action"):
-        print("→ Routing to: decide_action (eligible, need action)")
+    if eligible and not desired_action:
         return "decide_action"
-    
+
     # 8. If not eligible, finalize
-    if eligibility and not eligibility.get("eligible"):
-        print("→ Routing to: finalize (not eligible)")
+    if has_eligibility and not eligible:
         return "finalize"
-    
+
     # 9. Process return if that's the desired action
-    desired_action = state.get("desired_action")
-    action_ticket = state.get("action_ticket", {})
-    if desired_action == "return" and not action_ticket.get("id"):
-        print("→ Routing to: process_return (processing return)")
+    if desired_action == "return" and not has_ticket:
         return "process_return"
-    
+
     # 10. Process refund if that's the desired action
-    if desired_action == "refund" and not action_ticket.get("id"):
-        print("→ Routing to: process_refund (processing refund)")
+    if desired_action == "refund" and not has_ticket:
         return "process_refund"
-    
+
     # 11. Send email if we have a ticket but haven't sent email
-    if action_ticket.get("id") and not state.get("email_status"):
-        print("→ Routing to: send_email (have ticket, need email)")
+    if has_ticket and not has_email_status:
         return "send_email"
-    
-    # 12. Finalize if email sent
-    if state.get("email_status"):
-        print("→ Routing to: finalize (email sent, finalizing)")
-        return "finalize"
-    
-    # Default: if intent is "other", just finalize
-    if intent == "other":
-        print("→ Routing to: finalize (intent is other)")
-        return "finalize"
-    
-    # Fallback: shouldn't reach here, but finalize if we do
-    print("→ Routing to: finalize (fallback)")
+
+    # 12. Finalize if email sent, intent is "other", or as a fallback
     return "finalize"
+
+
+def build_routing_table() -> Dict[Tuple, Route]:
+    """
+    Precompute the route for every signature in the known domains
+
+    Returns:
+        Transition table keyed by routing signature
+    """
+    table = {HALTED: decide_route(HALTED)}
+    for signature in product(*SIGNATURE_DOMAINS):
+        table[signature] = decide_route(signature)
+    return table
+
+
+def create_supervisor_router(table: Optional[Dict[Tuple, Route]] = None):
+    """
+    Create the supervisor routing function bound to a transition table
+
+    Args:
+        table: Precomputed transition table (built if not given)
+
+    Returns:
+        Router function for add_conditional_edges
+    """
+    table = table if table is not None else build_routing_table()
+
+    def supervisor_router(state: AgentState) -> Route:
+        """
+        Routes to the appropriate worker based on state
+
+        Args:
+            state: Current agent state
+
+        Returns:
+            Name of next worker node to execute, or "__end__" to stop
+        """
+        signature = routing_signature(state)
+        route = table.get(signature)
+        if route is None:
+            # Value outside the precomputed domains (e.g. unexpected intent)
+            route = decide_route(signature)
+        logger.debug("Routing to %s", route)
+        return route
+
+    return supervisor_router
@@ -2,10 +2,23 @@
 ClassifyIntentWorker
 Classifies user intent from their message
 """
-from typing import Dict, Any
+import logging
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Any, List, Literal, Optional, Set
+from pydantic import BaseModel
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from app.agent.models import AgentState
+from app.agent.history import compact_history, summarize_flow
+from app.agent.intent_classifier import IntentPrediction, get_intent_classifier, record_llm_classification
+from app.agent.llm_cache import LLMResponseCache
+from app.core.batching import MicroBatcher
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
 
 
 SYSTEM_PROMPT = """You are a customer service intent classifier. 
@@ -30,6 +43,140 @@ User: "What's your phone number?" -> other
 """
 
 
+# Keys embed a hash of SYSTEM_PROMPT, so prompt edits invalidate cached answers
+intent_cache = LLMResponseCache("intent", SYSTEM_PROMPT)
+
+
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT.replace(
+    "Respond with ONLY ONE WORD: return, refund, order_status, or other.",
+    "You will receive several numbered messages. Classify each one independently "
+    "and return exactly one intent per message, in the same order."
+)
+
+VALID_INTENTS = ("return", "refund", "order_status", "other")
+
+
+class BatchClassification(BaseModel):
+    """Structured output of a batched classification call"""
+    intents: List[Literal["return", "refund", "order_status", "other"]]
+
+
+# One micro-batcher per LLM instance (the graph shares a single ChatOpenAI)
+_batchers: Dict[int, MicroBatcher] = {}
+
+# Background shadow checks (strong references so they aren't garbage-collected mid-flight)
+_shadow_tasks: Set[asyncio.Task] = set()
+
+
+async def _classify_one(message: str, llm: ChatOpenAI) -> str:
+    response = await llm.ainvoke([
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(content=message)
+    ])
+    
+    intent = response.content.strip().lower()
+    
+    # Validate intent
+    if intent not in VALID_INTENTS:
+        intent = "other"
+    
+    return intent
+
+
+async def _classify_batch(messages: List[str], llm: ChatOpenAI) -> List[str]:
+    """
+    Classify several messages with one multi-item structured prompt
+    Falls back to concurrent single calls if the model returns the wrong number of intents
+    """
+    if len(messages) == 1:
+        return [await _classify_one(messages[0], llm)]
+    
+    numbered = "\n".join(f"{i}. {json.dumps(message)}" for i, message in enumerate(messages, 1))
+    try:
+        result = await llm.with_structured_output(BatchClassification).ainvoke([
+            SystemMessage(content=BATCH_SYSTEM_PROMPT),
+            HumanMessage(content=numbered)
+        ])
+        if len(result.intents) == len(messages):
+            return list(result.intents)
+        logger.warning("Batch returned %d intents for %d messages, retrying singly", len(result.intents), len(messages))
+    except Exception as e:
+        logger.warning("Batch classification failed, retrying singly: %s", e)
+    
+    return list(await asyncio.gather(*(_classify_one(message, llm) for message in messages)))
+
+
+async def llm_classify(message: str, llm: ChatOpenAI) -> str:
+    """
+    Classify a message with the LLM
+    Concurrent calls are micro-batched into one request when INTENT_BATCH_MAX_SIZE > 1
+
+    Args:
+        message: User message
+        llm: Language model instance
+
+    Returns:
+        Validated intent
+    """
+    if settings.intent_batch_max_size <= 1:
+        return await _classify_one(message, llm)
+    
+    batcher = _batchers.get(id(llm))
+    if batcher is None:
+        batcher = _batchers[id(llm)] = MicroBatcher(
+            "intent",
+            lambda messages: _classify_batch(messages, llm),
+            settings.intent_batch_max_size,
+            settings.intent_batch_max_wait_ms / 1000
+        )
+    return await batcher.submit(message)
+
+
+async def _shadow_check(message: str, llm: ChatOpenAI, prediction: IntentPrediction):
+    """
+    Re-classify a fast-path hit with the LLM to measure agreement (off the critical path)
+    """
+    try:
+        started = time.perf_counter()
+        intent = await llm_classify(message, llm)
+        record_llm_classification(intent, prediction, time.perf_counter() - started, shadow=True)
+    except Exception as e:
+        logger.warning("Shadow check failed: %s", e)
+
+
+def new_flow_update(state: AgentState) -> Dict[str, Any]:
+    """
+    Reset per-flow fields after a completed conversation
+    Folds the finished flow (plus any overflow messages) into the history summary
+    
+    Args:
+        state: Current agent state (conversation_complete=True)
+        
+    Returns:
+        State update clearing the previous flow
+    """
+    return {
+        "intent": None,
+        "order_number": None,
+        "order": None,
+        "user_confirmed_order": None,
+        "eligibility": None,
+        "desired_action": None,
+        "action_preference": None,
+        "action_ticket": None,
+        "email_status": None,
+        "conversation_complete": False,
+        "phase": None,
+        "awaiting_user": False,
+        "error": None,
+        **compact_history(
+            state,
+            settings.message_history_window,
+            completed_flow=summarize_flow(state)
+        )
+    }
+
+
 async def classify_intent_worker(state: AgentState, llm: ChatOpenAI) -> Dict[str, Any]:
     """
     Classify the user's intent from their most recent message
@@ -47,29 +194,10 @@ async def classify_intent_worker(state: AgentState, llm: ChatOpenAI) -> Dict[str
     existing_intent = state.get("intent")
     conversation_complete = state.get("conversation_complete", False)
     
-    print(f"[CLASSIFY_INTENT] DEBUG - existing_intent: {existing_intent}")
-    print(f"[CLASSIFY_INTENT] DEBUG - conversation_complete: {conversation_complete}")
-    
     if existing_intent and not conversation_complete:
-        print(f"[CLASSIFY_INTENT] Intent already set to '{existing_intent}', skipping classification")
-        return {}  # Return empty dict - no changes needed
-    
-    # If conversation was complete, clear old state for fresh classification
-    if conversation_complete:
-        print(f"[CLASSIFY_INTENT] Previous conversation complete, classifying new intent")
-        # Reset state fields for new conversation
-        state_reset = {
-            "intent": None,
-            "order_number": None,
-            "order": None,
-            "user_confirmed_order": None,
-            "eligibility": None,
-            "desired_action": None,
-            "action_ticket": None,
-            "email_status": None,
-            "conversation_complete": False,
-            "error": None
-        }
+        logger.debug("Intent already set to %s, skipping classification", existing_intent)
+        # No classification needed - only keep the message history bounded
+        return compact_history(state, settings.message_history_window)
     
     # Get the last user message
     messages = state.get("messages", [])
@@ -86,29 +214,38 @@ async def classify_intent_worker(state: AgentState, llm: ChatOpenAI) -> Dict[str
     if not last_user_message:
         return {"intent": "other"}
     
-    # Call LLM to classify
+    # Local fast path first - the LLM is only called when no tier is confident
+    prediction: Optional[IntentPrediction] = None
+    if settings.intent_fast_path_enabled:
+        prediction = get_intent_classifier().predict(last_user_message)
+    
     try:
-        response = await llm.ainvoke([
-            SystemMessage(content=SYSTEM_PROMPT),
-            HumanMessage(content=last_user_message)
-        ])
-        
-        intent = response.content.strip().lower()
-        
-        # Validate intent
-        if intent not in ["return", "refund", "order_status", "other"]:
-            intent = "other"
-        
-        print(f"[CLASSIFY_INTENT] Classified as: {intent}")
+        if prediction and prediction.confident:
+            intent = prediction.intent
+            logger.debug("Fast path (%s) classified as %s", prediction.tier, intent)
+            if random.random() < settings.intent_shadow_rate:
+                task = asyncio.create_task(_shadow_check(last_user_message, llm, prediction))
+                _shadow_tasks.add(task)
+                task.add_done_callback(_shadow_tasks.discard)
+        else:
+            # Call LLM to classify (recurring utterances are served from the cache)
+            async def classify_with_llm() -> str:
+                started = time.perf_counter()
+                llm_intent = await llm_classify(last_user_message, llm)
+                record_llm_classification(llm_intent, prediction, time.perf_counter() - started)
+                return llm_intent
+            
+            intent = await intent_cache.get_or_compute(last_user_message, classify_with_llm)
+            logger.debug("Classified as %s", intent)
         
-        result = {"intent": intent}
+        # If the previous flow is complete, reset its fields and fold it into the history summary
+        result = new_flow_update(state) if conversation_complete else {}
         
-        # If we reset state due to conversation completion, include the reset
-        if conversation_complete:
-            result.update(state_reset)
+        # Set after the reset so the new intent is not cleared (which forced a second classification)
+        result["intent"] = intent
         
         return result
     
     except Exception as e:
-        print(f"Error in classify_intent_worker: {e}")
+        logger.exception("Intent classification failed")
         return {"intent": "other"}
@@ -7,6 +7,7 @@ from datetime import datetime
 import random
 from langchain_core.messages import HumanMessage, AIMessage
 from app.agent.models import AgentState
+from app.agent.replies import reply, ask
 
 
 # Template variations for natural variety (Zendesk pattern)
@@ -136,7 +137,7 @@ async def confirm_details_worker(state: AgentState) -> Dict[str, Any]:
         
         return {
             "user_confirmed_order": True,
-            "messages": messages + [AIMessage(content=confirmation_msg)]
+            **reply(confirmation_msg)
         }
     elif last_user_message and ("no" in last_user_message or "wrong" in last_user_message or "incorrect" in last_user_message):
         # Use template with random variation (Zendesk pattern)
@@ -146,7 +147,7 @@ async def confirm_details_worker(state: AgentState) -> Dict[str, Any]:
             "user_confirmed_order": False,
             "order_number": None,  # Reset to ask again
             "order": None,
-            "messages": messages + [AIMessage(content=apology_msg)]
+            **ask(apology_msg)
         }
     
     # First time - ask for confirmation using template
@@ -156,5 +157,5 @@ async def confirm_details_worker(state: AgentState) -> Dict[str, Any]:
     )
     
     return {
-        "messages": messages + [AIMessage(content=confirmation_request)]
+        **ask(confirmation_request)
     }
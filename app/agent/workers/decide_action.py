@@ -3,8 +3,9 @@ DecideActionWorker
 Determines which action (return/refund) to take based on eligibility and user preference
 """
 from typing import Dict, Any
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import HumanMessage
 from app.agent.models import AgentState
+from app.agent.replies import reply, ask
 from app.agent.policy import format_eligibility_message, Eligibility
 
 
@@ -29,7 +30,7 @@ async def decide_action_worker(state: AgentState) -> Dict[str, Any]:
         eligibility_msg = format_eligibility_message(eligibility)
         return {
             "desired_action": "cancel",
-            "messages": messages + [AIMessage(content=f"{eligibility_msg} If you need further assistance, please contact our support team.")]
+            **ask(f"{eligibility_msg} If you need further assistance, please contact our support team.")
         }
     
     # Get last user message to check for preference
@@ -43,30 +44,37 @@ async def decide_action_worker(state: AgentState) -> Dict[str, Any]:
     if eligibility.is_return_eligible and not eligibility.is_refund_eligible:
         return {
             "desired_action": "return",
-            "messages": messages + [AIMessage(content=f"{format_eligibility_message(eligibility)} I'll proceed with processing your return.")]
+            **reply(f"{format_eligibility_message(eligibility)} I'll proceed with processing your return.")
         }
     
     if eligibility.is_refund_eligible and not eligibility.is_return_eligible:
         return {
             "desired_action": "refund",
-            "messages": messages + [AIMessage(content=f"{format_eligibility_message(eligibility)} I'll proceed with processing your refund.")]
+            **reply(f"{format_eligibility_message(eligibility)} I'll proceed with processing your refund.")
         }
     
     # Both are eligible - check if user already indicated preference
+    action_preference = state.get("action_preference")
+    if action_preference in ("return", "refund"):
+        return {
+            "desired_action": action_preference,
+            **reply(f"Perfect! I'll process your {action_preference} request.")
+        }
+    
     if last_user_message:
         if "return" in last_user_message and "refund" not in last_user_message:
             return {
                 "desired_action": "return",
-                "messages": messages + [AIMessage(content="Perfect! I'll process your return request.")]
+                **reply("Perfect! I'll process your return request.")
             }
         elif "refund" in last_user_message and "return" not in last_user_message:
             return {
                 "desired_action": "refund",
-                "messages": messages + [AIMessage(content="Perfect! I'll process your refund request.")]
+                **reply("Perfect! I'll process your refund request.")
             }
     
     # Ask user to choose since both are eligible
     eligibility_msg = format_eligibility_message(eligibility)
     return {
-        "messages": messages + [AIMessage(content=f"{eligibility_msg} Which would you like to proceed with? Please reply with **return** or **refund**.")]
+        **ask(f"{eligibility_msg} Which would you like to proceed with? Please reply with **return** or **refund**.")
     }
@@ -1,27 +1,32 @@
 """
 EmailWorker
-Sends confirmation email (mock implementation)
+Queues the confirmation email in the outbox (delivered by the background dispatcher)
 """
+import logging
 from typing import Dict, Any
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.agent.models import AgentState
+from app.services.email_outbox import enqueue_email
 
+logger = logging.getLogger(__name__)
 
-async def email_worker(state: AgentState) -> Dict[str, Any]:
+
+async def email_worker(state: AgentState, db: AsyncIOMotorDatabase) -> Dict[str, Any]:
     """
-    Send confirmation email
-    In production, this would integrate with an email service
-    For now, it's a mock that always succeeds
-    
+    Queue confirmation email
+    Sending happens in app/services/email_outbox.py, so the turn never waits on SMTP
+
     Args:
         state: Current agent state
-        
+        db: MongoDB database instance
+
     Returns:
         Updated state with email_status
     """
     order = state.get("order")
     action_ticket = state.get("action_ticket", {})
     desired_action = state.get("desired_action")
-    
+
     if not order or not action_ticket.get("id"):
         return {
             "email_status": "failed",
@@ -30,29 +35,30 @@ async def email_worker(state: AgentState) -> Dict[str, Any]:
                 "message": "Missing order or ticket data for email"
             }
         }
-    
+
     customer_email = order.get("customer_email")
     ticket_id = action_ticket.get("id")
-    
+
     try:
-        # Mock email sending
-        # In production: await email_service.send(customer_email, template, data)
-        
-        print(f"[MOCK EMAIL] To: {customer_email}")
-        print(f"[MOCK EMAIL] Subject: Your {desired_action} request #{ticket_id}")
-        print(f"[MOCK EMAIL] Body: Your {desired_action} request has been created. Ticket ID: {ticket_id}")
-        
-        # Simulate success
+        # Keyed by ticket, so a re-run of this node never queues a second email
+        await enqueue_email(
+            db,
+            f"{ticket_id}:confirmation",
+            customer_email,
+            f"Your {desired_action} request #{ticket_id}",
+            f"Your {desired_action} request has been created. Ticket ID: {ticket_id}"
+        )
+
         return {
-            "email_status": "sent"
+            "email_status": "queued"
         }
-    
+
     except Exception as e:
-        print(f"Error in email_worker: {e}")
+        logger.exception("Queueing confirmation email failed")
         return {
             "email_status": "failed",
             "error": {
-                "code": "EMAIL_SEND_ERROR",
+                "code": "EMAIL_QUEUE_ERROR",
                 "message": str(e)
             }
         }
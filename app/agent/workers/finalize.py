@@ -4,8 +4,8 @@ Finalizes the conversation with templates (Zendesk-style)
 """
 from typing import Dict, Any
 import random
-from langchain_core.messages import AIMessage
 from app.agent.models import AgentState
+from app.agent.replies import reply
 
 
 # Template variations for different scenarios (Zendesk pattern)
@@ -61,13 +61,12 @@ async def finalize_worker(state: AgentState) -> Dict[str, Any]:
     action_ticket = state.get("action_ticket", {})
     desired_action = state.get("desired_action")
     email_status = state.get("email_status")
-    messages = state.get("messages", [])
     
     # Handle order_status intent - simple closing
     if intent == "order_status":
         final_message = random.choice(ORDER_STATUS_CLOSING)
         return {
-            "messages": messages + [AIMessage(content=final_message)],
+            **reply(final_message),
             "conversation_complete": True  # Flag to allow new intent classification
         }
     
@@ -107,8 +106,8 @@ async def finalize_worker(state: AgentState) -> Dict[str, Any]:
     else:
         # We have a desired action - use success templates
         email_note = ""
-        if email_status == "sent":
-            email_note = f" I've sent all the details to {masked_email}."
+        if email_status == "queued":
+            email_note = f" I'll email all the details to {masked_email} shortly."
         elif email_status == "failed":
             email_note = " Note: There was an issue sending the email, but your ticket has been created."
         
@@ -127,6 +126,6 @@ async def finalize_worker(state: AgentState) -> Dict[str, Any]:
             final_message = f"✅ Done! I've created ticket {ticket_id} for your {desired_action} request.{email_note}"
     
     return {
-        "messages": messages + [AIMessage(content=final_message)],
+        **reply(final_message),
         "conversation_complete": True  # Flag to allow new intent classification
     }
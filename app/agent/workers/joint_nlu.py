@@ -0,0 +1,119 @@
+"""
+JointNLUWorker
+Single structured-output LLM call for intent + order number + action preference,
+replacing the separate classify_intent and slot_filler LLM calls on a new flow
+"""
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Literal, Optional
+from pydantic import BaseModel, Field
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import SystemMessage, HumanMessage
+from app.agent.models import AgentState
+from app.agent.intent_classifier import get_intent_classifier, record_llm_classification
+from app.agent.order_numbers import order_number_recognizer
+from app.agent.workers.classify_intent import new_flow_update
+from app.agent.workers.slot_filler import order_number_found
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+SYSTEM_PROMPT = """You are a customer service assistant reading a customer message.
+Extract:
+- intent: "return" (return a product/order), "refund" (get money back),
+  "order_status" (check order status or tracking) or "other" (something else)
+- order_number: the order number if the message contains one (e.g. ORD-2024-001), otherwise null
+- action_preference: "return" or "refund" if the customer says which one they want, otherwise null
+"""
+
+
+class JointNLUResult(BaseModel):
+    """Structured output of the joint NLU call"""
+    intent: Literal["return", "refund", "order_status", "other"]
+    order_number: Optional[str] = Field(default=None, description="Order number mentioned in the message")
+    action_preference: Optional[Literal["return", "refund"]] = Field(
+        default=None, description="Action the customer explicitly prefers"
+    )
+
+
+async def joint_nlu_worker(
+    state: AgentState,
+    llm: ChatOpenAI,
+    intake: Callable[[AgentState], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    Fill intent, order_number and action_preference with one LLM call
+
+    Skipped (delegating to the regular intake) when no classification is
+    needed or the local tiers can resolve every slot without the LLM.
+
+    Args:
+        state: Current agent state
+        llm: Language model instance
+        intake: Regular classify_intent / speculative intake step
+
+    Returns:
+        Updated state; slot_filler becomes a no-op when order_number is filled
+    """
+    if state.get("intent") and not state.get("conversation_complete"):
+        return await intake(state)
+
+    last_user_message = None
+    for msg in reversed(state.get("messages", [])):
+        if isinstance(msg, HumanMessage):
+            last_user_message = msg.content
+            break
+
+    if not last_user_message:
+        return await intake(state)
+
+    # Fully resolvable locally - no LLM call at all
+    prediction = get_intent_classifier().predict(last_user_message) if settings.intent_fast_path_enabled else None
+    if prediction and prediction.confident and (
+        prediction.intent == "other" or order_number_recognizer.recognize(last_user_message)
+    ):
+        return await intake(state)
+
+    try:
+        started = time.perf_counter()
+        result: JointNLUResult = await llm.with_structured_output(JointNLUResult).ainvoke([
+            SystemMessage(content=SYSTEM_PROMPT),
+            HumanMessage(content=last_user_message)
+        ])
+        latency = time.perf_counter() - started
+    except Exception as e:
+        logger.warning("Structured call failed, falling back to separate workers: %s", e)
+        return await intake(state)
+
+    # A confident local intent was already counted; the call was only needed for the slots
+    record_llm_classification(result.intent, prediction, latency, shadow=bool(prediction and prediction.confident))
+    metrics.histogram("joint_nlu_latency_seconds").observe(latency)
+    logger.debug("intent=%s order_number=%s preference=%s", result.intent, result.order_number, result.action_preference)
+
+    update = new_flow_update(state) if state.get("conversation_complete") else {}
+    update["intent"] = result.intent
+    if result.action_preference:
+        update["action_preference"] = result.action_preference
+
+    if result.intent in ("return", "refund", "order_status"):
+        # Prefer a local match; otherwise canonicalize what the model returned
+        match = order_number_recognizer.recognize(last_user_message)
+        source = match.format if match else "joint_nlu"
+        if not match and result.order_number and len(result.order_number.strip()) >= 6:
+            match = order_number_recognizer.recognize(result.order_number)
+            order_number = match.order_number if match else result.order_number.strip().upper()
+        else:
+            order_number = match.order_number if match else None
+
+        if order_number:
+            metrics.counter("order_number_extractions_total", source=source).inc()
+            slot = order_number_found(order_number)
+            update["messages"] = update.get("messages", []) + slot["messages"]
+            update["order_number"] = order_number
+        else:
+            # The model already looked for an order number - slot_filler asks directly
+            update["nlu_extracted"] = True
+
+    return update
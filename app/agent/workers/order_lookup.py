@@ -2,10 +2,92 @@
 OrderLookupWorker
 Fetches order from MongoDB
 """
-from typing import Dict, Any
-from langchain_core.messages import AIMessage
+import logging
+from typing import Dict, Any, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.agent.models import AgentState
+from app.agent.replies import ask
+from app.services.order_cache import order_cache
+
+logger = logging.getLogger(__name__)
+
+
+async def fetch_order(db: AsyncIOMotorDatabase, order_number: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the raw order document
+    
+    Args:
+        db: MongoDB database instance
+        order_number: Order number to look up
+        
+    Returns:
+        Order document or None
+    """
+    # Read through the order cache (fixture data uses "order_number" field)
+    order = await order_cache.get(db, order_number)
+    logger.debug("Lookup %s found=%s", order_number, order is not None)
+    return order
+
+
+def lookup_result(order_number: str, order: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the state update for a completed lookup
+    
+    Args:
+        order_number: Order number that was looked up
+        order: Raw order document (None if not found)
+        
+    Returns:
+        Updated state with normalized order or not-found error
+    """
+    if not order:
+        logger.info("Order %s not found", order_number)
+        return {
+            "error": {
+                "code": "ORDER_NOT_FOUND",
+                "message": f"Order {order_number} not found"
+            },
+            **ask(f"I couldn't find order **{order_number}** in our system. Please check the order number and try again.")
+        }
+    
+    # Normalize order data from fixture format
+    normalized_order = {
+        "order_id": order.get("order_number"),  # Use order_number from fixtures
+        "customer_email": order.get("user_email"),  # Fixtures use user_email
+        "first_name": order.get("first_name"),
+        "last_name": order.get("last_name"),
+        "contact_number": order.get("user_contact_number"),  # Fixtures use user_contact_number
+        "items": order.get("items", []),
+        "order_date": order.get("order_date"),
+        "delivery_date": order.get("delivery_date"),
+        "total_amount": order.get("order_total"),  # Fixtures use order_total
+        "status": order.get("status", "unknown")
+    }
+    
+    return {
+        "order": normalized_order,
+        "order_match_confidence": 1.0
+    }
+
+
+def lookup_failed(e: Exception) -> Dict[str, Any]:
+    """
+    Build the state update for a failed lookup
+    
+    Args:
+        e: Database exception
+        
+    Returns:
+        Updated state with database error
+    """
+    logger.error("Order lookup failed: %s", e)
+    return {
+        "error": {
+            "code": "DATABASE_ERROR",
+            "message": str(e)
+        },
+        **ask("I'm having trouble accessing the order database. Please try again in a moment.")
+    }
 
 
 async def order_lookup_worker(state: AgentState, db: AsyncIOMotorDatabase) -> Dict[str, Any]:
@@ -29,52 +111,8 @@ async def order_lookup_worker(state: AgentState, db: AsyncIOMotorDatabase) -> Di
         }
     
     try:
-        # Query MongoDB for the order (fixture data uses "order_number" field)
-        print(f"[ORDER_LOOKUP] Searching for order: {order_number}")
-        order = await db.orders.find_one({"order_number": order_number})
-        
-        print(f"[ORDER_LOOKUP] Query result: {order}")
-        
-        if not order:
-            print(f"[ORDER_LOOKUP] ❌ Order {order_number} NOT FOUND in database")
-            messages = state.get("messages", [])
-            return {
-                "error": {
-                    "code": "ORDER_NOT_FOUND",
-                    "message": f"Order {order_number} not found"
-                },
-                "messages": messages + [AIMessage(content=f"I couldn't find order **{order_number}** in our system. Please check the order number and try again.")]
-            }
-        
-        # Normalize order data from fixture format
-        normalized_order = {
-            "order_id": order.get("order_number"),  # Use order_number from fixtures
-            "customer_email": order.get("user_email"),  # Fixtures use user_email
-            "first_name": order.get("first_name"),
-            "last_name": order.get("last_name"),
-            "contact_number": order.get("user_contact_number"),  # Fixtures use user_contact_number
-            "items": order.get("items", []),
-            "order_date": order.get("order_date"),
-            "delivery_date": order.get("delivery_date"),
-            "total_amount": order.get("order_total"),  # Fixtures use order_total
-            "status": order.get("status", "unknown")
-        }
-        
-        print(f"[ORDER_LOOKUP] ✅ Order found and normalized: {normalized_order['order_id']} for {normalized_order['first_name']} {normalized_order['last_name']}")
-        
-        return {
-            "order": normalized_order,
-            "order_match_confidence": 1.0
-        }
-    
+        order = await fetch_order(db, order_number)
     except Exception as e:
-        print(f"Error in order_lookup_worker: {e}")
-        messages = state.get("messages", [])
-        return {
-            "error": {
-                "code": "DATABASE_ERROR",
-                "message": str(e)
-            },
-            "messages": messages + [AIMessage(content="I'm having trouble accessing the order database. Please try again in a moment."
-            )]
-        }
+        return lookup_failed(e)
+    
+    return lookup_result(order_number, order)
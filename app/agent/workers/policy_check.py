@@ -2,11 +2,14 @@
 PolicyCheckWorker
 Checks return/refund eligibility using pure policy functions
 """
+import logging
 from typing import Dict, Any
 from langchain_core.messages import AIMessage
 from app.agent.models import AgentState
 from app.agent.policy import check_eligibility
 
+logger = logging.getLogger(__name__)
+
 
 async def policy_check_worker(state: AgentState) -> Dict[str, Any]:
     """
@@ -38,7 +41,7 @@ async def policy_check_worker(state: AgentState) -> Dict[str, Any]:
         }
     
     except Exception as e:
-        print(f"Error in policy_check_worker: {e}")
+        logger.exception("Policy check failed")
         return {
             "error": {
                 "code": "POLICY_CHECK_ERROR",
@@ -2,12 +2,15 @@
 ProcessReturnWorker
 Creates return ticket (RMA)
 """
-import hashlib
+import logging
 from typing import Dict, Any
-from langchain_core.messages import AIMessage
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.agent.models import AgentState
+from app.agent.replies import reply, ask
+from app.services.ticket_service import TicketService
+
+logger = logging.getLogger(__name__)
 
 
 async def process_return_worker(state: AgentState, db: AsyncIOMotorDatabase) -> Dict[str, Any]:
@@ -34,58 +37,39 @@ async def process_return_worker(state: AgentState, db: AsyncIOMotorDatabase) ->
     order_id = order.get("order_id")
     desired_action = state.get("desired_action")
     
-    # Generate idempotency key
-    idempotency_key = hashlib.sha256(f"{order_id}|{desired_action}".encode()).hexdigest()
-    
     try:
-        # Check if ticket already exists (idempotency)
-        existing_ticket = await db.action_tickets.find_one({
-            "idempotency_key": idempotency_key
-        })
+        ticket = await TicketService(db).create_or_get(
+            order_id=order_id,
+            action=desired_action,
+            ticket_id=f"RMA-{datetime.utcnow().strftime('%Y%m%d')}-{order_id}",
+            customer_email=order.get("customer_email")
+        )
         
-        if existing_ticket:
+        meta = {
+            **state.get("meta", {}),
+            "idempotency_key": ticket.idempotency_key
+        }
+        
+        if ticket.duplicate:
             return {
                 "action_ticket": {
-                    "id": existing_ticket.get("ticket_id"),
+                    "id": ticket.ticket_id,
                     "status": "duplicate"
                 },
-                "meta": {
-                    **state.get("meta", {}),
-                    "idempotency_key": idempotency_key
-                }
+                "meta": meta
             }
         
-        # Create new return ticket
-        ticket_id = f"RMA-{datetime.utcnow().strftime('%Y%m%d')}-{order_id}"
-        
-        ticket_doc = {
-            "ticket_id": ticket_id,
-            "idempotency_key": idempotency_key,
-            "order_id": order_id,
-            "action": desired_action,
-            "status": "created",
-            "created_at": datetime.utcnow(),
-            "customer_email": order.get("customer_email")
-        }
-        
-        await db.action_tickets.insert_one(ticket_doc)
-        
-        messages = state.get("messages", [])
         return {
             "action_ticket": {
-                "id": ticket_id,
+                "id": ticket.ticket_id,
                 "status": "created"
             },
-            "meta": {
-                **state.get("meta", {}),
-                "idempotency_key": idempotency_key
-            },
-            "messages": messages + [AIMessage(content=f"Great! I've created return ticket **{ticket_id}** for your order.")]
+            "meta": meta,
+            **reply(f"Great! I've created return ticket **{ticket.ticket_id}** for your order.")
         }
     
     except Exception as e:
-        print(f"Error in process_return_worker: {e}")
-        messages = state.get("messages", [])
+        logger.exception("Return ticket creation failed")
         return {
             "action_ticket": {
                 "id": None,
@@ -95,6 +79,5 @@ async def process_return_worker(state: AgentState, db: AsyncIOMotorDatabase) ->
                 "code": "RETURN_PROCESSING_ERROR",
                 "message": str(e)
             },
-            "messages": messages + [AIMessage(content="I encountered an error while creating your return ticket. Please try again."
-            )]
+            **ask("I encountered an error while creating your return ticket. Please try again.")
         }
@@ -5,8 +5,8 @@ Displays order status information using templates (Zendesk-style)
 from typing import Dict, Any
 from datetime import datetime
 import random
-from langchain_core.messages import AIMessage
 from app.agent.models import AgentState
+from app.agent.replies import reply
 
 
 # Status-specific message templates (Zendesk pattern)
@@ -109,9 +109,9 @@ async def show_order_status_worker(state: AgentState) -> Dict[str, Any]:
             }
         }
     
-    messages = state.get("messages", [])
     status_message = format_order_status(order)
     
     return {
-        "messages": messages + [AIMessage(content=status_message)]
+        **reply(status_message),
+        "phase": "status_shown"  # Supervisor routes to finalize next
     }
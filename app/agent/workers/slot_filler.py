@@ -2,19 +2,22 @@
 SlotFillerWorker (OrderNumberCollector)
 Extracts or asks for order number
 """
-import re
+import logging
+import time
 from typing import Dict, Any
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from app.agent.llm_cache import LLMResponseCache
 from app.agent.models import AgentState
+from app.agent.order_numbers import order_number_recognizer
+from app.agent.replies import reply, ask
+from app.core.metrics import metrics
 
-
-# Pattern for order numbers (e.g., ORD-123456, ABC123, etc.)
-ORDER_NUMBER_PATTERN = re.compile(r'\b([A-Z0-9]{3}[-]?[0-9]{6,}|[0-9]{10,})\b')
+logger = logging.getLogger(__name__)
 
 
 EXTRACTION_PROMPT = """You are helping extract an order number from a customer message.
-Order numbers typically look like: ORD-123456, ABC-123456, or similar alphanumeric codes.
+Order numbers typically look like: ORD-2024-001, ABC-123456, or similar alphanumeric codes.
 
 If you find an order number in the message, respond with ONLY the order number.
 If you don't find one, respond with ONLY the word "NONE".
@@ -22,6 +25,25 @@ If you don't find one, respond with ONLY the word "NONE".
 Message: {message}
 """
 
+# Keys embed a hash of EXTRACTION_PROMPT, so prompt edits invalidate cached answers
+extraction_cache = LLMResponseCache("order_number", EXTRACTION_PROMPT)
+
+
+def order_number_found(order_number: str) -> Dict[str, Any]:
+    """
+    Build the state update for a captured order number
+    
+    Args:
+        order_number: Canonical order number
+        
+    Returns:
+        Updated state with order_number and acknowledgement message
+    """
+    return {
+        "order_number": order_number,
+        **reply(f"Great! Let me look up order **{order_number}** for you...")
+    }
+
 
 async def slot_filler_worker(state: AgentState, llm: ChatOpenAI) -> Dict[str, Any]:
     """
@@ -52,7 +74,7 @@ async def slot_filler_worker(state: AgentState, llm: ChatOpenAI) -> Dict[str, An
     
     if not messages:
         return {
-            "messages": messages + [AIMessage(content="I can help with that. What's your **order number**? It usually looks like **ORD-123456**.")]
+            **ask("I can help with that. What's your **order number**? It usually looks like **ORD-2024-001**.")
         }
     
     # Try to extract from last user message (now HumanMessage objects)
@@ -64,36 +86,48 @@ async def slot_filler_worker(state: AgentState, llm: ChatOpenAI) -> Dict[str, An
     
     if not last_user_message:
         return {
-            "messages": messages + [AIMessage(content="I can help with that. What's your **order number**? It usually looks like **ORD-123456**.")]
+            **ask("I can help with that. What's your **order number**? It usually looks like **ORD-2024-001**.")
         }
     
-    # Try regex extraction first
-    match = ORDER_NUMBER_PATTERN.search(last_user_message)
+    # Try the compiled recognizer first
+    match = order_number_recognizer.recognize(last_user_message)
     if match:
-        order_number = match.group(1).upper()
+        metrics.counter("order_number_extractions_total", source=match.format).inc()
+        logger.debug("Recognized %s (format=%s corrected=%s)", match.order_number, match.format, match.corrected)
+        return order_number_found(match.order_number)
+    
+    # Joint NLU already asked the LLM about this message - don't ask again
+    if state.get("nlu_extracted"):
+        metrics.counter("order_number_extractions_total", source="none").inc()
         return {
-            "order_number": order_number,
-            "messages": messages + [AIMessage(content=f"Great! Let me look up order **{order_number}** for you...")]
+            **ask("I need your order number to help you. It usually looks like **ORD-2024-001** or a similar code. Can you provide it?")
         }
     
-    # Try LLM extraction
+    # Nothing plausible found - fall back to LLM extraction
     try:
-        response = await llm.ainvoke([
-            SystemMessage(content=EXTRACTION_PROMPT.format(message=last_user_message))
-        ])
+        async def extract_with_llm() -> str:
+            started = time.perf_counter()
+            response = await llm.ainvoke([
+                SystemMessage(content=EXTRACTION_PROMPT.format(message=last_user_message))
+            ])
+            metrics.histogram("order_number_llm_latency_seconds").observe(time.perf_counter() - started)
+            return response.content.strip().upper()
         
-        extracted = response.content.strip().upper()
+        extracted = await extraction_cache.get_or_compute(last_user_message, extract_with_llm)
         
         if extracted != "NONE" and len(extracted) >= 6:
-            return {
-                "order_number": extracted,
-                "messages": messages + [AIMessage(content=f"Great! Let me look up order **{extracted}** for you...")]
-            }
+            # Canonicalize the LLM's answer the same way as direct matches
+            normalized = order_number_recognizer.recognize(extracted)
+            order_number = normalized.order_number if normalized else extracted
+            metrics.counter("order_number_extractions_total", source="llm").inc()
+            return order_number_found(order_number)
     
     except Exception as e:
-        print(f"Error in slot_filler_worker LLM extraction: {e}")
+        logger.warning("LLM order number extraction failed: %s", e)
+    
+    metrics.counter("order_number_extractions_total", source="none").inc()
     
     # If we still don't have it, ask
     return {
-        "messages": messages + [AIMessage(content="I need your order number to help you. It usually looks like **ORD-123456** or a similar code. Can you provide it?")]
+        **ask("I need your order number to help you. It usually looks like **ORD-2024-001** or a similar code. Can you provide it?")
     }
@@ -0,0 +1,91 @@
+"""
+SpeculativeIntakeWorker
+Runs intent classification, order-number extraction and the order prefetch
+concurrently on the first turn of a flow, then commits the results in the
+sequential order (classify_intent → slot_filler → order_lookup)
+"""
+import logging
+import asyncio
+import time
+from typing import Dict, Any
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.agent.models import AgentState
+from app.agent.order_numbers import order_number_recognizer
+from app.agent.workers.classify_intent import classify_intent_worker
+from app.agent.workers.slot_filler import order_number_found
+from app.agent.workers.order_lookup import fetch_order, lookup_result, lookup_failed
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# Intents whose flow starts with slot_filler → order_lookup
+ORDER_INTENTS = ("return", "refund", "order_status")
+
+
+async def speculative_intake_worker(state: AgentState, llm: ChatOpenAI, db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """
+    Classify intent while prefetching the order mentioned in the same message
+
+    Only the local recognizer is used speculatively; messages without a
+    recognizable order number go through the normal slot_filler path (and
+    its LLM fallback) so no LLM call is wasted.
+
+    Args:
+        state: Current agent state
+        llm: Language model instance
+        db: MongoDB database instance
+
+    Returns:
+        Combined state update of classify_intent and, when the speculation
+        holds, slot_filler and order_lookup
+    """
+    # Mid-flow turns don't classify - nothing to overlap with
+    if state.get("intent") and not state.get("conversation_complete"):
+        return await classify_intent_worker(state, llm)
+
+    last_user_message = None
+    for msg in reversed(state.get("messages", [])):
+        if isinstance(msg, HumanMessage):
+            last_user_message = msg.content
+            break
+
+    match = order_number_recognizer.recognize(last_user_message) if last_user_message else None
+    if not match:
+        metrics.counter("speculative_intake_total", result="skipped").inc()
+        return await classify_intent_worker(state, llm)
+
+    started = time.perf_counter()
+    prefetch = asyncio.create_task(fetch_order(db, match.order_number))
+    classification = await classify_intent_worker(state, llm)
+
+    if classification.get("intent") not in ORDER_INTENTS:
+        # Speculation lost - discard the prefetch
+        prefetch.cancel()
+        prefetch.add_done_callback(lambda task: task.cancelled() or task.exception())
+        metrics.counter("speculative_intake_total", result="discarded").inc()
+        logger.debug("Intent %s needs no order, discarded prefetch", classification.get("intent"))
+        return classification
+
+    try:
+        order = await prefetch
+        lookup = lookup_result(match.order_number, order)
+    except Exception as e:
+        lookup = lookup_failed(e)
+
+    metrics.counter("speculative_intake_total", result="committed").inc()
+    metrics.counter("order_number_extractions_total", source=match.format).inc()
+    metrics.histogram("speculative_intake_latency_seconds").observe(time.perf_counter() - started)
+    logger.debug("Committed intent=%s order_number=%s", classification["intent"], match.order_number)
+
+    # Commit in the sequential order; message deltas are concatenated so the
+    # add_messages reducer applies them exactly as three separate nodes would
+    slot = order_number_found(match.order_number)
+    return {
+        **classification,
+        **slot,
+        **lookup,
+        "messages": classification.get("messages", []) + slot["messages"] + lookup.get("messages", []),
+    }
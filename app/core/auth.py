@@ -2,11 +2,15 @@
 Authentication utilities
 Password hashing, JWT token generation and verification
 """
+import hashlib
+import hmac
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status, Request, Cookie
+from fastapi.requests import HTTPConnection
 from fastapi.security import OAuth2PasswordBearer
 
 from app.core.config import settings
@@ -70,6 +74,51 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def _session_signature(session_key: str) -> str:
+    return hmac.new(settings.secret_key.encode(), session_key.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def issue_session_id() -> str:
+    """
+    Create a signed conversation session ID (no database write)
+    
+    Returns:
+        "<uuid>.<signature>"
+    """
+    session_key = uuid.uuid4().hex
+    return f"{session_key}.{_session_signature(session_key)}"
+
+
+def verify_session_id(session_id: str) -> bool:
+    """
+    Check that a session ID was issued by this server
+    
+    Args:
+        session_id: Session ID from the client
+        
+    Returns:
+        True if the signature is valid
+    """
+    session_key, _, signature = session_id.partition(".")
+    return bool(signature) and hmac.compare_digest(signature, _session_signature(session_key))
+
+
+def is_legacy_session_id(session_id: str) -> bool:
+    """
+    Check whether a session ID has the unsigned format issued before IDs were signed
+    
+    Args:
+        session_id: Session ID from the client
+        
+    Returns:
+        True for a canonical UUID string ("xxxxxxxx-xxxx-...")
+    """
+    try:
+        return str(uuid.UUID(session_id)) == session_id
+    except ValueError:
+        return False
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db = Depends(get_database)
@@ -128,16 +177,16 @@ async def get_current_active_user(current_user: dict = Depends(get_current_user)
 
 
 async def get_current_user_optional(
-    request: Request,
+    request: HTTPConnection,
     db = Depends(get_database)
 ):
     """
     Get the current authenticated user from JWT token (optional)
     Returns None if no token or invalid token instead of raising exception
-    Checks both Authorization header and cookies
+    Checks both Authorization header and cookies (works for HTTP and WebSocket routes)
     
     Args:
-        request: FastAPI request object
+        request: FastAPI request or WebSocket connection
         db: Database connection
         
     Returns:
@@ -0,0 +1,101 @@
+"""
+Micro-batching
+Collects concurrent requests for a short window and processes them as one batch
+"""
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+from app.core.metrics import metrics
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Async micro-batcher
+
+    Callers await submit(item); items are flushed as one batch when
+    max_batch_size is reached or max_wait_seconds after the first pending
+    item, whichever comes first. Results are fanned back out in order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process_batch: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch_size: int,
+        max_wait_seconds: float
+    ):
+        """
+        Initialize the batcher
+
+        Args:
+            name: Batcher name used as the metrics label
+            process_batch: Coroutine mapping a list of items to a list of results (same order)
+            max_batch_size: Flush as soon as this many items are pending
+            max_wait_seconds: Flush this long after the first pending item
+        """
+        self.name = name
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        """
+        Queue an item and wait for its result
+
+        Args:
+            item: Item to process
+
+        Returns:
+            Result for this item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._dispatch)
+
+        return await future
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]):
+        metrics.histogram("batch_size", buckets=BATCH_SIZE_BUCKETS, batcher=self.name).observe(len(batch))
+        metrics.counter("batches_total", batcher=self.name).inc()
+
+        try:
+            results = await self.process_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # Skip callers that were cancelled while waiting
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,101 @@
+"""
+Bloom filter
+Compact probabilistic set membership: no false negatives, tunable false positives
+"""
+import hashlib
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over a BLAKE2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float, bits: Optional[bytearray] = None, count: int = 0):
+        """
+        Initialize the filter
+
+        Args:
+            capacity: Expected number of items
+            error_rate: Target false-positive rate at capacity
+            bits: Existing bit array (when loading)
+            count: Number of items already added (when loading)
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        """
+        Add an item
+
+        Args:
+            item: Item to add
+        """
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def memory_bytes(self) -> int:
+        """Size of the bit array"""
+        return len(self.bits)
+
+    def estimated_false_positive_rate(self) -> float:
+        """
+        Expected false-positive rate for the current fill
+
+        Returns:
+            Probability that an absent item tests positive
+        """
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def save(self, path: Path, extra: Optional[Dict[str, Any]] = None):
+        """
+        Write the filter to disk (JSON header line + raw bits)
+
+        Args:
+            path: Destination file
+            extra: Additional header fields to persist
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = {"capacity": self.capacity, "error_rate": self.error_rate, "count": self.count, **(extra or {})}
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode() + b"\n")
+            f.write(self.bits)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> Tuple["BloomFilter", Dict[str, Any]]:
+        """
+        Read a filter written by save()
+
+        Args:
+            path: Source file
+
+        Returns:
+            Tuple of (filter, header)
+        """
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            bits = bytearray(f.read())
+        bloom = cls(header["capacity"], header["error_rate"], bits=bits, count=header["count"])
+        if len(bits) != (bloom.num_bits + 7) // 8:
+            raise ValueError(f"Corrupt Bloom filter file: {path}")
+        return bloom, header
@@ -0,0 +1,92 @@
+"""
+In-process cache
+LRU cache with per-entry TTL and hit/miss/eviction counters
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.core.metrics import metrics
+
+
+# Returned by TTLCache.get on a miss (None is a valid cached value)
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire after a TTL
+    Not thread-safe; meant for use from the event loop
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        """
+        Initialize the cache
+
+        Args:
+            name: Cache name used as the metrics label
+            max_entries: Maximum number of entries before LRU eviction
+            ttl_seconds: Entry lifetime
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Look up a key, refreshing its LRU position
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or MISSING
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            metrics.counter("cache_misses_total", cache=self.name).inc()
+            return MISSING
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            metrics.counter("cache_evictions_total", cache=self.name, reason="ttl").inc()
+            metrics.counter("cache_misses_total", cache=self.name).inc()
+            return MISSING
+
+        self._entries.move_to_end(key)
+        metrics.counter("cache_hits_total", cache=self.name).inc()
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """
+        Store a value, evicting the least recently used entries if full
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl_seconds: Override the default TTL for this entry
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            metrics.counter("cache_evictions_total", cache=self.name, reason="lru").inc()
+
+    def delete(self, key: Hashable):
+        """
+        Remove a key if present
+
+        Args:
+            key: Cache key
+        """
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all entries"""
+        self._entries.clear()
@@ -0,0 +1,387 @@
+"""
+Async MongoDB checkpointer
+LangGraph checkpoint saver backed by the pooled Motor client, so checkpoint
+reads and writes never block the event loop
+"""
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from app.core.tracing import record_checkpoint_bytes
+
+
+def _dumps_metadata(serde, metadata: Any) -> Any:
+    """
+    Serialize metadata values while keeping dict keys queryable
+
+    Args:
+        serde: Checkpoint serializer
+        metadata: Metadata dict or leaf value
+
+    Returns:
+        Document-friendly metadata
+    """
+    if isinstance(metadata, dict):
+        return {key: _dumps_metadata(serde, value) for key, value in metadata.items()}
+    return serde.dumps_typed(metadata)
+
+
+def _loads_metadata(serde, metadata: Any) -> Any:
+    """
+    Inverse of _dumps_metadata
+
+    Args:
+        serde: Checkpoint serializer
+        metadata: Stored metadata document
+
+    Returns:
+        Deserialized metadata
+    """
+    if isinstance(metadata, dict):
+        return {key: _loads_metadata(serde, value) for key, value in metadata.items()}
+    return serde.loads_typed(metadata)
+
+
+def _require_str(value: Any, name: str, optional: bool = False) -> Optional[str]:
+    """
+    Guard identifiers that end up in query documents against operator injection
+
+    Args:
+        value: Identifier value
+        name: Identifier name (for the error message)
+        optional: Whether None is accepted
+
+    Returns:
+        The identifier unchanged
+
+    Raises:
+        ValueError: If the identifier is not a string
+    """
+    if value is None and optional:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid {name}: expected a string, got {type(value).__name__}")
+    return value
+
+
+class AsyncMongoDBSaver(BaseCheckpointSaver):
+    """
+    Checkpoint saver using Motor for all I/O
+    Stores documents in the same layout as langgraph's MongoDBSaver, so existing
+    checkpoints remain readable after switching backends
+    """
+
+    def __init__(
+        self,
+        client: AsyncIOMotorClient,
+        db_name: str,
+        checkpoint_collection_name: str = "checkpoints",
+        writes_collection_name: str = "checkpoint_writes",
+    ):
+        """
+        Initialize the saver
+
+        Args:
+            client: Shared Motor client (connection pool is reused)
+            db_name: Database name
+            checkpoint_collection_name: Collection holding checkpoints
+            writes_collection_name: Collection holding pending writes
+        """
+        super().__init__()
+        self.client = client
+        self.db = client[db_name]
+        self.checkpoint_collection = self.db[checkpoint_collection_name]
+        self.writes_collection = self.db[writes_collection_name]
+
+    async def setup(self):
+        """
+        Create the compound indexes used by checkpoint and write lookups
+        """
+        await self.checkpoint_collection.create_index(
+            [("thread_id", ASCENDING), ("checkpoint_ns", ASCENDING), ("checkpoint_id", DESCENDING)],
+            unique=True
+        )
+        await self.writes_collection.create_index(
+            [
+                ("thread_id", ASCENDING),
+                ("checkpoint_ns", ASCENDING),
+                ("checkpoint_id", DESCENDING),
+                ("task_id", ASCENDING),
+                ("idx", ASCENDING),
+            ],
+            unique=True
+        )
+
+    async def _load_pending_writes(self, config_values: Dict[str, str]) -> list:
+        """
+        Load pending writes attached to a checkpoint
+
+        Args:
+            config_values: thread_id / checkpoint_ns / checkpoint_id
+
+        Returns:
+            List of (task_id, channel, value) tuples
+        """
+        cursor = self.writes_collection.find(config_values).sort("idx", ASCENDING)
+        return [
+            (doc["task_id"], doc["channel"], self.serde.loads_typed((doc["type"], doc["value"])))
+            async for doc in cursor
+        ]
+
+    async def _to_tuple(self, doc: Dict[str, Any]) -> CheckpointTuple:
+        """
+        Convert a checkpoint document into a CheckpointTuple
+
+        Args:
+            doc: Checkpoint document
+
+        Returns:
+            Checkpoint tuple with pending writes
+        """
+        config_values = {
+            "thread_id": doc["thread_id"],
+            "checkpoint_ns": doc["checkpoint_ns"],
+            "checkpoint_id": doc["checkpoint_id"],
+        }
+        parent_config = None
+        if doc.get("parent_checkpoint_id"):
+            parent_config = {
+                "configurable": {
+                    "thread_id": doc["thread_id"],
+                    "checkpoint_ns": doc["checkpoint_ns"],
+                    "checkpoint_id": doc["parent_checkpoint_id"],
+                }
+            }
+
+        return CheckpointTuple(
+            config={"configurable": config_values},
+            checkpoint=self.serde.loads_typed((doc["type"], doc["checkpoint"])),
+            metadata=_loads_metadata(self.serde, doc["metadata"]),
+            parent_config=parent_config,
+            pending_writes=await self._load_pending_writes(config_values),
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        Fetch a checkpoint tuple (latest for the thread unless checkpoint_id is given)
+
+        Args:
+            config: Runnable config with thread_id
+
+        Returns:
+            Checkpoint tuple or None if the thread has no checkpoints
+        """
+        configurable = config["configurable"]
+        query = {
+            "thread_id": _require_str(configurable["thread_id"], "thread_id"),
+            "checkpoint_ns": _require_str(configurable.get("checkpoint_ns", ""), "checkpoint_ns"),
+        }
+        checkpoint_id = _require_str(get_checkpoint_id(config), "checkpoint_id", optional=True)
+        if checkpoint_id:
+            query["checkpoint_id"] = checkpoint_id
+
+        doc = await self.checkpoint_collection.find_one(query, sort=[("checkpoint_id", DESCENDING)])
+        if not doc:
+            return None
+
+        return await self._to_tuple(doc)
+
+    async def aget_channel_values(self, thread_id: str, checkpoint_ns: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Read the channel values of the latest checkpoint only
+        Skips metadata and pending writes (cheaper than aget_tuple for read-only views)
+
+        Args:
+            thread_id: Thread ID
+            checkpoint_ns: Checkpoint namespace
+
+        Returns:
+            Channel values or None if the thread has no checkpoints
+        """
+        doc = await self.checkpoint_collection.find_one(
+            {
+                "thread_id": _require_str(thread_id, "thread_id"),
+                "checkpoint_ns": _require_str(checkpoint_ns, "checkpoint_ns"),
+            },
+            {"type": 1, "checkpoint": 1},
+            sort=[("checkpoint_id", DESCENDING)]
+        )
+        if not doc:
+            return None
+
+        return self.serde.loads_typed((doc["type"], doc["checkpoint"])).get("channel_values", {})
+
+    async def ahas_thread(self, thread_id: str) -> bool:
+        """
+        Check whether a thread has any checkpoint (index-only lookup)
+
+        Args:
+            thread_id: Thread ID
+
+        Returns:
+            True if at least one checkpoint exists
+        """
+        doc = await self.checkpoint_collection.find_one(
+            {"thread_id": _require_str(thread_id, "thread_id")},
+            {"_id": 1}
+        )
+        return doc is not None
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """
+        List checkpoints, newest first
+
+        Args:
+            config: Runnable config (thread_id / checkpoint_ns filters)
+            filter: Metadata filters
+            before: Only return checkpoints older than this one
+            limit: Maximum number of checkpoints
+
+        Yields:
+            Checkpoint tuples
+        """
+        query: Dict[str, Any] = {}
+        if config is not None:
+            configurable = config["configurable"]
+            if "thread_id" in configurable:
+                query["thread_id"] = _require_str(configurable["thread_id"], "thread_id")
+            if "checkpoint_ns" in configurable:
+                query["checkpoint_ns"] = _require_str(configurable["checkpoint_ns"], "checkpoint_ns")
+
+        for key, value in (filter or {}).items():
+            if not isinstance(key, str) or key.startswith("$"):
+                raise ValueError(f"Invalid filter key '{key}'")
+            query[f"metadata.{key}"] = _dumps_metadata(self.serde, value)
+
+        if before is not None:
+            before_id = _require_str(before["configurable"]["checkpoint_id"], "before checkpoint_id")
+            query["checkpoint_id"] = {"$lt": before_id}
+
+        cursor = self.checkpoint_collection.find(query).sort("checkpoint_id", DESCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        async for doc in cursor:
+            yield await self._to_tuple(doc)
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """
+        Save a checkpoint
+
+        Args:
+            config: Config of the parent checkpoint
+            checkpoint: Checkpoint to store
+            metadata: Checkpoint metadata
+            new_versions: New channel versions (unused, kept for the interface)
+
+        Returns:
+            Config pointing at the stored checkpoint
+        """
+        configurable = config["configurable"]
+        thread_id = _require_str(configurable["thread_id"], "thread_id")
+        checkpoint_ns = _require_str(configurable.get("checkpoint_ns", ""), "checkpoint_ns")
+        checkpoint_id = _require_str(checkpoint["id"], "checkpoint id")
+        parent_checkpoint_id = _require_str(configurable.get("checkpoint_id"), "checkpoint_id", optional=True)
+
+        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        record_checkpoint_bytes("checkpoint", len(serialized_checkpoint))
+        doc = {
+            "parent_checkpoint_id": parent_checkpoint_id,
+            "type": type_,
+            "checkpoint": serialized_checkpoint,
+            "metadata": _dumps_metadata(self.serde, get_checkpoint_metadata(config, metadata)),
+        }
+
+        await self.checkpoint_collection.update_one(
+            {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id},
+            {"$set": doc},
+            upsert=True
+        )
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        }
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """
+        Store intermediate writes linked to a checkpoint in a single bulk write
+
+        Args:
+            config: Config of the related checkpoint
+            writes: (channel, value) pairs
+            task_id: Task that produced the writes
+            task_path: Path of that task
+        """
+        if not writes:
+            return
+
+        configurable = config["configurable"]
+        base_query = {
+            "thread_id": _require_str(configurable["thread_id"], "thread_id"),
+            "checkpoint_ns": _require_str(configurable.get("checkpoint_ns", ""), "checkpoint_ns"),
+            "checkpoint_id": _require_str(configurable["checkpoint_id"], "checkpoint_id"),
+            "task_id": _require_str(task_id, "task_id"),
+            "task_path": _require_str(task_path, "task_path"),
+        }
+        # Special channels (errors, interrupts) may overwrite; regular writes are insert-once
+        set_method = "$set" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "$setOnInsert"
+
+        operations = []
+        written = 0
+        for idx, (channel, value) in enumerate(writes):
+            type_, serialized_value = self.serde.dumps_typed(value)
+            written += len(serialized_value)
+            operations.append(UpdateOne(
+                {**base_query, "idx": WRITES_IDX_MAP.get(channel, idx)},
+                {set_method: {"channel": channel, "type": type_, "value": serialized_value}},
+                upsert=True
+            ))
+
+        record_checkpoint_bytes("writes", written)
+        await self.writes_collection.bulk_write(operations, ordered=False)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """
+        Delete all checkpoints and writes of a thread
+
+        Args:
+            thread_id: Thread ID (session ID)
+        """
+        _require_str(thread_id, "thread_id")
+        await self.checkpoint_collection.delete_many({"thread_id": thread_id})
+        await self.writes_collection.delete_many({"thread_id": thread_id})
@@ -18,6 +18,11 @@ class Settings(BaseSettings):
     port: int = 8000
     reload: bool = True
     
+    # Logging (LOG_LEVEL=DEBUG adds per-node routing traces)
+    log_level: str = "INFO"
+    log_format: str = "text"  # "text" or "json"
+    otel_enabled: bool = False  # Emit OpenTelemetry spans per turn/node (needs opentelemetry-api)
+    
     # MongoDB settings
     mongodb_url: str = "mongodb://localhost:27017"
     mongodb_db_name: str = "chatbot"
@@ -31,6 +36,80 @@ class Settings(BaseSettings):
     openai_api_key: str = "your-openai-api-key-here"
     openai_model: str = "gpt-4o-mini"
     
+    # Agent settings
+    # "exit" persists one checkpoint per turn (when the graph ends or waits for the user);
+    # "async"/"sync" persist after every superstep
+    checkpoint_durability: str = "exit"
+    # Messages kept verbatim in state; older ones are folded into a structured summary (0 = unbounded)
+    message_history_window: int = 20
+    # Run classification, order-number extraction and the order prefetch concurrently on the first turn
+    speculative_intake: bool = True
+    # One structured LLM call for intent + order number + action preference when local tiers miss
+    joint_nlu_enabled: bool = False
+    
+    # Intent fast path (keyword rules + optional offline-trained model before the LLM)
+    intent_fast_path_enabled: bool = True
+    intent_model_path: str = ""  # JSON weights from scripts/train_intent_model.py
+    intent_model_threshold: float = 0.9
+    intent_shadow_rate: float = 0.02  # Fraction of fast-path hits re-checked by the LLM in the background
+    # Concurrent LLM classifications are sent as one multi-item prompt (1 = no batching)
+    intent_batch_max_size: int = 16
+    intent_batch_max_wait_ms: float = 5.0
+    
+    # LLM response cache (intent classification / order number extraction)
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 10000
+    llm_cache_ttl_seconds: int = 86400
+    llm_cache_shared: bool = False  # Also share answers across workers via a MongoDB TTL collection
+    
+    # Order lookup cache (in-process, read-through)
+    order_cache_enabled: bool = True
+    order_cache_max_entries: int = 5000
+    order_cache_ttl_seconds: int = 300
+    order_cache_negative_ttl_seconds: int = 30  # Recent not-found order numbers
+    
+    # Bloom filter over all order numbers (definite misses skip MongoDB)
+    order_filter_enabled: bool = True
+    order_filter_capacity: int = 1_000_000
+    order_filter_error_rate: float = 0.001
+    order_filter_path: str = ".cache/order_filter.bin"  # Persisted across restarts ("" = memory only)
+    order_filter_refresh_seconds: int = 60  # Pick up orders inserted by other writers
+    
+    # Confirmation emails (outbox + background dispatcher)
+    smtp_host: str = ""  # Empty = log emails instead of sending them
+    smtp_port: int = 25
+    smtp_sender: str = "support@example.com"
+    smtp_username: str = ""
+    smtp_password: str = ""
+    smtp_use_tls: bool = False
+    email_batch_size: int = 50
+    email_concurrency: int = 10
+    email_max_attempts: int = 5
+    email_backoff_seconds: float = 5.0  # Doubles per failed attempt (with jitter)
+    email_poll_seconds: float = 5.0
+    
+    # Session metadata (append-only conversation_sessions records, written in bulk)
+    session_metadata_enabled: bool = True
+    session_metadata_batch_size: int = 100
+    session_metadata_flush_seconds: float = 5.0
+    # Keep resuming unsigned UUID session IDs issued before IDs were signed, if they
+    # already have a checkpoint (turn off once those conversations have aged out)
+    legacy_session_ids_enabled: bool = True
+    
+    # Per-session turn serialization
+    session_lock_backend: str = "local"  # "local" (single worker) or "mongo" (lease shared by all workers)
+    session_lease_seconds: float = 30.0  # Renewed while a turn runs; expires if the worker dies
+    session_lock_timeout_seconds: float = 60.0
+    
+    # WebSocket chat (/ws/chat)
+    ws_heartbeat_seconds: float = 20.0
+    ws_idle_timeout_seconds: float = 60.0  # Close when no frame (not even a pong) arrives for this long
+    ws_max_pending_messages: int = 4  # Queued messages per connection while a turn runs
+    ws_send_timeout_seconds: float = 10.0  # Disconnect clients that stop reading
+    
+    # Order number recognition
+    order_number_prefixes: str = "ORD"  # Comma-separated known prefixes (first is used for bare numbers)
+    
     # Paths
     base_dir: Path = Path(__file__).resolve().parent.parent.parent
     templates_dir: Path = base_dir / "templates"
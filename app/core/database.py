@@ -1,17 +1,24 @@
 """
 Database connection and utilities
 """
+import logging
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from pymongo import MongoClient
-from langgraph.checkpoint.mongodb import MongoDBSaver
+from app.core.checkpointer import AsyncMongoDBSaver
 from app.core.config import settings
+from app.core.indexes import ensure_indexes
+from app.core.tracing import mongo_command_counter
 from app.fixtures.orders import SAMPLE_ORDERS
+from app.services.email_outbox import create_email_sender, email_dispatcher
+from app.services.order_filter import order_filter
+from app.services.session_metadata import session_metadata
+
+logger = logging.getLogger(__name__)
 
 
 class Database:
     client: AsyncIOMotorClient = None
     db: AsyncIOMotorDatabase = None
-    checkpointer: MongoDBSaver = None  # Global checkpointer instance
+    checkpointer: AsyncMongoDBSaver = None  # Global checkpointer instance
 
 
 db = Database()
@@ -24,7 +31,7 @@ async def get_database() -> AsyncIOMotorDatabase:
     return db.db
 
 
-def get_checkpointer() -> MongoDBSaver:
+def get_checkpointer() -> AsyncMongoDBSaver:
     """
     Get the global checkpointer instance
     """
@@ -39,30 +46,21 @@ async def load_sample_data():
     try:
         # Check if orders collection already has data
         count = await db.db.orders.count_documents({})
-        print(f"[DATABASE] Orders collection currently has {count} documents")
+        logger.info("Orders collection currently has %d documents", count)
         
         if count == 0:
             # Insert sample orders
             result = await db.db.orders.insert_many(SAMPLE_ORDERS)
-            print(f"✅ Loaded {len(SAMPLE_ORDERS)} sample orders into database")
-            print(f"[DATABASE] Inserted order IDs: {result.inserted_ids[:3]}... (showing first 3)")
+            logger.info("Loaded %d sample orders into database", len(result.inserted_ids))
             
             # Verify by checking a sample order
             sample = await db.db.orders.find_one({"order_number": "ORD-2024-001"})
-            if sample:
-                print(f"[DATABASE] ✅ Verification: Found order ORD-2024-001 for {sample.get('first_name')} {sample.get('last_name')}")
-            else:
-                print(f"[DATABASE] ⚠️  Verification failed: Could not find ORD-2024-001")
+            if not sample:
+                logger.warning("Verification failed: could not find ORD-2024-001")
         else:
-            print(f"ℹ️  Database already has {count} orders, skipping sample data load")
-            # Still verify we can read an order
-            sample = await db.db.orders.find_one({})
-            if sample:
-                print(f"[DATABASE] Sample order from DB: {sample.get('order_number', 'unknown')}")
+            logger.info("Database already has %d orders, skipping sample data load", count)
     except Exception as e:
-        print(f"⚠️  Error loading sample data: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error loading sample data")
 
 
 async def connect_to_mongo():
@@ -70,23 +68,42 @@ async def connect_to_mongo():
     Create database connection, checkpointer, and load sample data
     """
     # Async client for database operations
-    db.client = AsyncIOMotorClient(settings.mongodb_url)
+    # The command listener counts MongoDB round trips per turn (see app/core/tracing.py)
+    db.client = AsyncIOMotorClient(settings.mongodb_url, event_listeners=[mongo_command_counter])
     db.db = db.client[settings.mongodb_db_name]
-    print(f"✅ Connected to MongoDB: {settings.mongodb_db_name}")
+    logger.info("Connected to MongoDB: %s", settings.mongodb_db_name)
+    
+    # Async checkpointer sharing the Motor connection pool (never blocks the event loop)
+    db.checkpointer = AsyncMongoDBSaver(db.client, settings.mongodb_db_name, "checkpoints")
+    await db.checkpointer.setup()
+    logger.info("Checkpointer initialized")
     
-    # Sync client for checkpointer (LangGraph requirement)
-    print(f"[DATABASE] Creating global checkpointer instance")
-    sync_client = MongoClient(settings.mongodb_url)
-    db.checkpointer = MongoDBSaver(sync_client, settings.mongodb_db_name, "checkpoints")
-    print(f"✅ Checkpointer initialized")
+    # Indexes for every hot query (orders, tickets, sessions, users, LLM cache TTL)
+    await ensure_indexes(db.db)
+    logger.info("Indexes ensured")
     
     # Load sample data on startup
     await load_sample_data()
+    
+    # Bloom filter over order numbers (answers definite misses without a query)
+    if settings.order_filter_enabled:
+        await order_filter.load_or_build(db.db)
+        order_filter.start_refresh(db.db, settings.order_filter_refresh_seconds)
+    
+    # Deliver queued confirmation emails in the background
+    email_dispatcher.start(db.db, create_email_sender())
+    
+    # Session records are buffered and written in bulk
+    if settings.session_metadata_enabled:
+        session_metadata.start(db.db)
 
 
 async def close_mongo_connection():
     """
     Close database connection
     """
+    order_filter.stop_refresh()
+    await email_dispatcher.stop()
+    await session_metadata.stop()
     db.client.close()
-    print("✅ Closed MongoDB connection")
+    logger.info("Closed MongoDB connection")
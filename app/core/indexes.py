@@ -0,0 +1,147 @@
+"""
+Index registry
+Declares the indexes every hot query relies on, ensures them at startup and
+verifies the query plans (scripts/check_indexes.py)
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from pymongo import ASCENDING, DESCENDING
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+logger = logging.getLogger(__name__)
+
+
+class IndexSpec(BaseModel):
+    """A required index"""
+    keys: List[Tuple[str, int]]
+    unique: bool = False
+    expire_after_seconds: Optional[int] = None
+
+
+class HotQuery(BaseModel):
+    """A query on a hot path that must be served by an index"""
+    name: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: Optional[List[Tuple[str, int]]] = None
+
+
+# Required indexes per collection (checkpoint collections are managed by AsyncMongoDBSaver.setup)
+REQUIRED_INDEXES: Dict[str, List[IndexSpec]] = {
+    "orders": [
+        IndexSpec(keys=[("order_number", ASCENDING)], unique=True),
+        IndexSpec(keys=[("user_email", ASCENDING)]),
+        IndexSpec(keys=[("status", ASCENDING)]),
+        IndexSpec(keys=[("order_date", ASCENDING)]),
+    ],
+    "action_tickets": [
+        IndexSpec(keys=[("idempotency_key", ASCENDING)], unique=True),
+    ],
+    "conversation_sessions": [
+        IndexSpec(keys=[("session_id", ASCENDING)], unique=True),
+    ],
+    "users": [
+        IndexSpec(keys=[("email", ASCENDING)], unique=True),
+    ],
+    "email_outbox": [
+        IndexSpec(keys=[("status", ASCENDING), ("next_attempt_at", ASCENDING)]),
+        IndexSpec(keys=[("claim_id", ASCENDING)]),
+    ],
+    "session_leases": [
+        IndexSpec(keys=[("expires_at", ASCENDING)], expire_after_seconds=0),
+    ],
+    "llm_cache": [
+        IndexSpec(keys=[("expires_at", ASCENDING)], expire_after_seconds=0),
+    ],
+}
+
+# Hot-path queries whose plans must not be collection scans
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery(name="order_lookup", collection="orders", filter={"order_number": "ORD-2024-001"}),
+    HotQuery(name="ticket_idempotency", collection="action_tickets", filter={"idempotency_key": "0" * 64}),
+    HotQuery(name="current_user", collection="users", filter={"email": "self-check@example.com"}),
+    HotQuery(
+        name="email_outbox_claim",
+        collection="email_outbox",
+        filter={"status": "queued", "next_attempt_at": {"$lte": datetime(2024, 1, 1)}},
+        sort=[("next_attempt_at", ASCENDING)],
+    ),
+    HotQuery(name="email_outbox_claimed", collection="email_outbox", filter={"claim_id": "0" * 32}),
+    HotQuery(
+        name="latest_checkpoint",
+        collection="checkpoints",
+        filter={"thread_id": "self-check", "checkpoint_ns": ""},
+        sort=[("checkpoint_id", DESCENDING)],
+    ),
+    HotQuery(
+        name="checkpoint_writes",
+        collection="checkpoint_writes",
+        filter={"thread_id": "self-check", "checkpoint_ns": "", "checkpoint_id": "self-check"},
+    ),
+]
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    """
+    Create every registered index (no-op for indexes that already exist)
+
+    A missing secondary index only costs speed, so it is logged. A missing
+    unique index breaks correctness (idempotent ticket upserts would create
+    duplicates again), so it aborts startup.
+
+    Args:
+        db: MongoDB database instance
+
+    Raises:
+        RuntimeError: If a unique index cannot be created (usually existing duplicates)
+    """
+    for collection, specs in REQUIRED_INDEXES.items():
+        for spec in specs:
+            options: Dict[str, Any] = {"unique": spec.unique}
+            if spec.expire_after_seconds is not None:
+                options["expireAfterSeconds"] = spec.expire_after_seconds
+            try:
+                await db[collection].create_index(spec.keys, **options)
+            except Exception as e:
+                if spec.unique:
+                    raise RuntimeError(
+                        f"Could not create unique index {spec.keys} on {collection}: {e}. "
+                        f"Remove the duplicate documents and restart."
+                    ) from e
+                logger.warning("Could not create index %s on %s: %s", spec.keys, collection, e)
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Collect every stage name in an explain() plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def verify_query_plans(db: AsyncIOMotorDatabase) -> Dict[str, List[str]]:
+    """
+    Explain every hot query and report its winning-plan stages
+
+    Args:
+        db: MongoDB database instance
+
+    Returns:
+        Stages per hot query name
+    """
+    plans = {}
+    for query in HOT_QUERIES:
+        cursor = db[query.collection].find(query.filter)
+        if query.sort:
+            cursor = cursor.sort(query.sort)
+        explanation = await cursor.limit(1).explain()
+        plans[query.name] = _plan_stages(explanation.get("queryPlanner", {}).get("winningPlan", {}))
+    return plans
@@ -0,0 +1,206 @@
+"""
+In-process metrics
+Lightweight counters, gauges and histograms shared by the agent, caches and services
+"""
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, Any, List, Tuple
+
+
+# Default latency buckets (seconds)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    """Monotonically increasing counter"""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        """
+        Increment the counter
+
+        Args:
+            amount: Amount to add
+        """
+        self.value += amount
+
+
+class Gauge:
+    """Value that can go up and down"""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        """
+        Set the current value
+
+        Args:
+            value: New value
+        """
+        self.value = value
+
+
+class Histogram:
+    """Bucketed distribution of observed values"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """
+        Record an observation
+
+        Args:
+            value: Observed value
+        """
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Registry of named metrics with optional labels
+    Metrics are created on first use and live for the process lifetime
+    """
+
+    def __init__(self):
+        self._counters: Dict[Tuple, Counter] = {}
+        self._gauges: Dict[Tuple, Gauge] = {}
+        self._histograms: Dict[Tuple, Histogram] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> Tuple:
+        return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+    def counter(self, name: str, **labels) -> Counter:
+        """
+        Get or create a counter
+
+        Args:
+            name: Metric name
+            **labels: Label values
+
+        Returns:
+            Counter instance
+        """
+        key = self._key(name, labels)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = Counter()
+        return counter
+
+    def gauge(self, name: str, **labels) -> Gauge:
+        """
+        Get or create a gauge
+
+        Args:
+            name: Metric name
+            **labels: Label values
+
+        Returns:
+            Gauge instance
+        """
+        key = self._key(name, labels)
+        gauge = self._gauges.get(key)
+        if gauge is None:
+            gauge = self._gauges[key] = Gauge()
+        return gauge
+
+    def histogram(self, name: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels) -> Histogram:
+        """
+        Get or create a histogram
+
+        Args:
+            name: Metric name
+            buckets: Bucket upper bounds (only used on creation)
+            **labels: Label values
+
+        Returns:
+            Histogram instance
+        """
+        key = self._key(name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(buckets)
+        return histogram
+
+    def snapshot(self) -> Dict[str, list]:
+        """
+        Export all metrics as plain data
+
+        Returns:
+            Dict with counters, gauges and histograms
+        """
+        return {
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": counter.value}
+                for (name, labels), counter in sorted(self._counters.items())
+            ],
+            "gauges": [
+                {"name": name, "labels": dict(labels), "value": gauge.value}
+                for (name, labels), gauge in sorted(self._gauges.items())
+            ],
+            "histograms": [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": dict(zip([*map(str, histogram.buckets), "+Inf"], histogram.bucket_counts)),
+                }
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ],
+        }
+
+    @staticmethod
+    def _labels(labels: Tuple, **extra: str) -> str:
+        pairs = [*labels, *extra.items()]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+    def render_prometheus(self) -> str:
+        """
+        Export all metrics in the Prometheus text exposition format
+
+        Returns:
+            Exposition text (one TYPE line per metric name)
+        """
+        lines: List[str] = []
+        typed = set()
+
+        def type_line(name: str, kind: str):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), counter in sorted(self._counters.items()):
+            type_line(name, "counter")
+            lines.append(f"{name}{self._labels(labels)} {counter.value}")
+        for (name, labels), gauge in sorted(self._gauges.items()):
+            type_line(name, "gauge")
+            lines.append(f"{name}{self._labels(labels)} {gauge.value}")
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            type_line(name, "histogram")
+            # Prometheus buckets are cumulative
+            for bound, count in zip([*map(str, histogram.buckets), "+Inf"], accumulate(histogram.bucket_counts)):
+                lines.append(f"{name}_bucket{self._labels(labels, le=bound)} {count}")
+            lines.append(f"{name}_sum{self._labels(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{self._labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
@@ -0,0 +1,263 @@
+"""
+Turn tracing
+Per-turn accounting of node time, supervisor hops, LLM tokens, MongoDB commands
+and checkpoint bytes, exported through the metrics registry and (optionally)
+as OpenTelemetry spans keyed by thread_id
+"""
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # Optional dependency (pip install opentelemetry-api)
+    otel_trace = None
+
+
+# Buckets for per-turn counts (hops, Mongo commands)
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+# Buckets for per-turn checkpoint bytes
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Buckets for per-turn LLM tokens (prompt + completion)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+class TurnStats:
+    """Counters for the turn running in the current context"""
+
+    __slots__ = ("thread_id", "hops", "mongo_ops", "llm_calls", "llm_tokens", "checkpoint_bytes", "span")
+
+    def __init__(self, thread_id: str):
+        self.thread_id = thread_id
+        self.hops = 0
+        self.mongo_ops = 0
+        self.llm_calls = 0
+        self.llm_tokens = 0
+        self.checkpoint_bytes = 0
+        self.span = None
+
+
+# Set for the duration of a turn; nodes, LLM callbacks and Mongo command events
+# (Motor copies the context into its executor threads) all see the same object
+_current_turn: ContextVar[Optional[TurnStats]] = ContextVar("current_turn", default=None)
+
+
+def current_turn() -> Optional[TurnStats]:
+    """
+    Stats of the turn running in this context
+
+    Returns:
+        TurnStats, or None outside a turn
+    """
+    return _current_turn.get()
+
+
+def _tracer():
+    if not settings.otel_enabled:
+        return None
+    if otel_trace is None:
+        logger.warning("OTEL_ENABLED is set but opentelemetry-api is not installed")
+        return None
+    return otel_trace.get_tracer("app.agent")
+
+
+# Resolved once; spans go to whatever tracer provider the deployment configures
+tracer = _tracer()
+
+
+@asynccontextmanager
+async def trace_turn(thread_id: str) -> AsyncIterator[TurnStats]:
+    """
+    Account one turn
+
+    Args:
+        thread_id: Conversation (thread) ID
+
+    Yields:
+        The turn's TurnStats
+    """
+    stats = TurnStats(thread_id)
+    token = _current_turn.set(stats)
+    span_context = tracer.start_as_current_span("agent.turn", attributes={"thread_id": thread_id}) if tracer else None
+    if span_context is not None:
+        stats.span = span_context.__enter__()
+    started = time.perf_counter()
+
+    try:
+        yield stats
+    finally:
+        metrics.histogram("turn_duration_seconds").observe(time.perf_counter() - started)
+        metrics.histogram("turn_supervisor_hops", COUNT_BUCKETS).observe(stats.hops)
+        metrics.histogram("turn_mongo_ops", COUNT_BUCKETS).observe(stats.mongo_ops)
+        metrics.histogram("turn_checkpoint_bytes", BYTES_BUCKETS).observe(stats.checkpoint_bytes)
+        if stats.llm_calls:
+            metrics.histogram("turn_llm_tokens", TOKEN_BUCKETS).observe(stats.llm_tokens)
+        if span_context is not None:
+            stats.span.set_attributes({
+                "agent.hops": stats.hops,
+                "agent.mongo_ops": stats.mongo_ops,
+                "agent.llm_calls": stats.llm_calls,
+                "agent.llm_tokens": stats.llm_tokens,
+                "agent.checkpoint_bytes": stats.checkpoint_bytes,
+            })
+            span_context.__exit__(None, None, None)
+        try:
+            # Restores an enclosing turn instead of clearing it
+            _current_turn.reset(token)
+        except ValueError:
+            # Generator finalized in another context (e.g. abandoned stream)
+            _current_turn.set(None)
+
+
+def instrument_node(name: str, node: Callable[[Any], Awaitable[Dict[str, Any]]]) -> Callable[[Any], Awaitable[Dict[str, Any]]]:
+    """
+    Wrap a graph node with duration and error accounting
+
+    Args:
+        name: Node name
+        node: Async node function taking the state
+
+    Returns:
+        Wrapped node
+    """
+    # Looked up once here, not per call
+    duration = metrics.histogram("node_duration_seconds", node=name)
+    errors = metrics.counter("node_errors_total", node=name)
+
+    @wraps(node)
+    async def instrumented(state):
+        span_context = None
+        if tracer is not None:
+            stats = _current_turn.get()
+            span_context = tracer.start_as_current_span(
+                f"agent.node.{name}",
+                attributes={"thread_id": stats.thread_id if stats else "", "node": name}
+            )
+            span_context.__enter__()
+        started = time.perf_counter()
+        try:
+            return await node(state)
+        except BaseException:
+            errors.inc()
+            raise
+        finally:
+            duration.observe(time.perf_counter() - started)
+            if span_context is not None:
+                span_context.__exit__(None, None, None)
+
+    return instrumented
+
+
+def instrument_router(router: Callable[[Any], str]) -> Callable[[Any], str]:
+    """
+    Count supervisor routing decisions (one hop per call)
+
+    Args:
+        router: Supervisor routing function
+
+    Returns:
+        Wrapped router
+    """
+    @wraps(router)
+    def instrumented(state):
+        route = router(state)
+        stats = _current_turn.get()
+        if stats is not None:
+            stats.hops += 1
+        metrics.counter("supervisor_routes_total", route=route).inc()
+        return route
+
+    return instrumented
+
+
+def record_checkpoint_bytes(kind: str, size: int):
+    """
+    Account serialized checkpoint data written to MongoDB
+
+    Args:
+        kind: "checkpoint" or "writes"
+        size: Serialized size in bytes
+    """
+    metrics.counter("checkpoint_bytes_written_total", kind=kind).inc(size)
+    stats = _current_turn.get()
+    if stats is not None:
+        stats.checkpoint_bytes += size
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """
+    LangChain callback recording LLM latency and token usage
+
+    Attached to the chat model itself, so only model calls (including
+    with_structured_output) reach it, not every graph step.
+    """
+
+    run_inline = True  # Cheap bookkeeping; don't hop to an executor thread
+    ignore_chain = True
+    ignore_agent = True
+    ignore_retriever = True
+
+    def __init__(self):
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            metrics.histogram("llm_latency_seconds").observe(time.perf_counter() - started)
+
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        metrics.counter("llm_calls_total").inc()
+        metrics.counter("llm_tokens_total", kind="prompt").inc(prompt_tokens)
+        metrics.counter("llm_tokens_total", kind="completion").inc(completion_tokens)
+
+        stats = _current_turn.get()
+        if stats is not None:
+            stats.llm_calls += 1
+            stats.llm_tokens += prompt_tokens + completion_tokens
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._started.pop(run_id, None)
+        metrics.counter("llm_errors_total").inc()
+
+
+class MongoCommandCounter(monitoring.CommandListener):
+    """PyMongo command listener counting commands per turn and per command name"""
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        metrics.counter("mongo_commands_total", command=event.command_name).inc()
+        stats = _current_turn.get()
+        if stats is not None:
+            stats.mongo_ops += 1
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        metrics.counter("mongo_command_failures_total", command=event.command_name).inc()
+
+
+# Shared instances (registered on the chat model and the Motor client)
+llm_metrics_handler = LLMMetricsHandler()
+mongo_command_counter = MongoCommandCounter()
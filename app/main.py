@@ -1,12 +1,16 @@
 """
 FastAPI Application Main Module
 """
+import logging
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
 from app.core.database import connect_to_mongo, close_mongo_connection
-from app.routers import api, pages, auth
+from app.core.logging import configure_logging, shutdown_logging
+from app.routers import api, pages, auth, ws, metrics
+
+logger = logging.getLogger(__name__)
 
 
 def create_application() -> FastAPI:
@@ -17,6 +21,8 @@ def create_application() -> FastAPI:
     Returns:
         Configured FastAPI application instance
     """
+    configure_logging(settings.log_level, settings.log_format)
+
     app = FastAPI(
         title=settings.app_name,
         description=settings.app_description,
@@ -36,6 +42,8 @@ def create_application() -> FastAPI:
     app.include_router(pages.router)
     app.include_router(auth.router)
     app.include_router(api.router)
+    app.include_router(ws.router)
+    app.include_router(metrics.router)
     
     return app
 
@@ -49,9 +57,9 @@ async def startup_event():
     """
     Actions to perform on application startup
     """
-    print(f"🚀 {settings.app_name} v{settings.app_version} is starting...")
+    logger.info("%s v%s is starting...", settings.app_name, settings.app_version)
     await connect_to_mongo()
-    print(f"📚 API Documentation: http://{settings.host}:{settings.port}/docs")
+    logger.info("API Documentation: http://%s:%s/docs", settings.host, settings.port)
 
 
 @app.on_event("shutdown")
@@ -60,4 +68,5 @@ async def shutdown_event():
     Actions to perform on application shutdown
     """
     await close_mongo_connection()
-    print(f"👋 {settings.app_name} is shutting down...")
+    logger.info("%s is shutting down...", settings.app_name)
+    shutdown_logging()
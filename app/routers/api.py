@@ -2,13 +2,20 @@
 API Router
 Handles all JSON API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+import json
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Literal, Optional
 
 from app.core.database import get_database
+from app.core.metrics import metrics
 from app.services.agent_service import AgentService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api", tags=["api"])
 
 
@@ -41,6 +48,17 @@ async def health_check() -> Dict[str, str]:
     }
 
 
+@router.get("/metrics", summary="Metrics Snapshot")
+async def get_metrics() -> Dict[str, Any]:
+    """
+    In-process metrics (intent classifier tiers, latencies, agreement rates)
+    
+    Returns:
+        Snapshot of all counters and histograms
+    """
+    return metrics.snapshot()
+
+
 @router.get("/data", summary="Get Sample Data")
 async def get_data() -> Dict[str, List[Dict[str, Any]]]:
     """
@@ -71,18 +89,20 @@ async def chat(request: ChatRequest, db = Depends(get_database)) -> ChatResponse
     Returns:
         Bot's response message(s) and session info
     """
+    started = time.perf_counter()
     try:
         # Initialize agent service
         agent_service = AgentService(db)
         
-        # Get or create session
-        session_id = request.session_id
-        if not session_id:
-            session_id = await agent_service.create_session()
+        # Reuse the client's session or issue a new one (no database write)
+        session_id = await agent_service.resolve_session(request.session_id)
         
         # Process the message
         result = await agent_service.process_message(session_id, request.message)
         
+        # Nothing reaches the client before the whole graph has run
+        metrics.histogram("chat_first_message_seconds", endpoint="chat").observe(time.perf_counter() - started)
+        
         return ChatResponse(
             messages=result.get("messages", []),
             session_id=session_id,
@@ -92,34 +112,103 @@ async def chat(request: ChatRequest, db = Depends(get_database)) -> ChatResponse
         )
     
     except Exception as e:
-        print(f"Error in chat endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in chat endpoint")
         
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat/stream", summary="Streaming Chat Endpoint")
+async def chat_stream(request: ChatRequest, db = Depends(get_database)) -> StreamingResponse:
+    """
+    Chat endpoint streaming Server-Sent Events as the agent runs
+    
+    Event types: `session` (first, with session_id), `node` (a worker finished),
+    `message` (an assistant message), `done` (with state summary) and `error`.
+    
+    Args:
+        request: Chat request with message and optional session_id
+        db: Database connection
+        
+    Returns:
+        text/event-stream response
+    """
+    agent_service = AgentService(db)
+    session_id = await agent_service.resolve_session(request.session_id)
+    
+    async def events() -> AsyncIterator[str]:
+        started = time.perf_counter()
+        first_message = True
+        yield _sse("session", {"session_id": session_id})
+        
+        async for event in agent_service.stream_message(session_id, request.message):
+            if event["event"] == "message" and first_message:
+                first_message = False
+                metrics.histogram("chat_first_message_seconds", endpoint="stream").observe(time.perf_counter() - started)
+            yield _sse(event["event"], event["data"])
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/session/{session_id}/history", summary="Get Conversation History")
-async def get_history(session_id: str, db = Depends(get_database)) -> Dict[str, Any]:
+async def get_history(
+    session_id: str,
+    before: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    format: Literal["json", "ndjson"] = "json",
+    db = Depends(get_database)
+):
     """
-    Get conversation history for a session
+    Get conversation history for a session (served from the latest checkpoint)
+    
+    Only the checkpoint's window (MESSAGE_HISTORY_WINDOW messages) can be
+    paged; older messages survive only as the compacted summary.
     
     Args:
         session_id: Session ID
+        before: Cursor - return messages older than this message ID
+        limit: Page size
+        format: "json" (one object) or "ndjson" (one message per line, cursor in X-Next-Before)
         db: Database connection
         
     Returns:
-        Conversation history
+        Page of messages (id, role, content, timestamp) with next_before cursor
+    
+    Raises:
+        HTTPException: 404 for a session ID this server didn't issue (or a legacy ID without a conversation), 400 for an unknown cursor
     """
-    try:
-        agent_service = AgentService(db)
-        messages = await agent_service.get_conversation_history(session_id)
-        
-        return {
-            "session_id": session_id,
-            "messages": messages
-        }
+    agent_service = AgentService(db)
+    if not await agent_service.is_known_session(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
     
+    try:
+        page = await agent_service.get_conversation_history(session_id, before, limit)
+    except ValueError as e:
+        # Cursor from another session, or compacted out of the window since it was issued
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-
+    
+    if format == "ndjson":
+        async def lines() -> AsyncIterator[str]:
+            for message in page["messages"]:
+                yield json.dumps(message) + "\n"
+        
+        headers = {"X-Compacted-Messages": str(page["compacted_messages"])}
+        if page["next_before"]:
+            headers["X-Next-Before"] = page["next_before"]
+        return StreamingResponse(lines(), media_type="application/x-ndjson", headers=headers)
+    
+    return {
+        "session_id": session_id,
+        **page
+    }
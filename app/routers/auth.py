@@ -94,9 +94,6 @@ async def register(
     result = await db.users.insert_one(user_doc)
     user_doc["id"] = str(result.inserted_id)
     
-    # Create indexes on email field
-    await db.users.create_index("email", unique=True)
-    
     # Create access token
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
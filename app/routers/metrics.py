@@ -0,0 +1,22 @@
+"""
+Metrics Router
+Prometheus scrape endpoint for the in-process metrics registry
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, summary="Prometheus Metrics")
+async def prometheus_metrics() -> PlainTextResponse:
+    """
+    All counters, gauges and histograms in the Prometheus text format
+    (the JSON view of the same data is /api/metrics)
+    
+    Returns:
+        Text exposition response
+    """
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
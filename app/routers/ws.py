@@ -0,0 +1,42 @@
+"""
+WebSocket Router
+Persistent chat connections (one socket per conversation)
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, WebSocket
+
+from app.core.auth import get_current_user_optional
+from app.core.database import get_database
+from app.services.agent_service import AgentService
+from app.services.chat_connection import ChatConnection
+
+router = APIRouter(tags=["websocket"])
+
+
+@router.websocket("/ws/chat")
+async def chat_socket(
+    websocket: WebSocket,
+    session_id: Optional[str] = None,
+    db = Depends(get_database),
+    current_user: Optional[dict] = Depends(get_current_user_optional)
+):
+    """
+    Chat over a WebSocket
+    The session, agent service and user are resolved once when the socket
+    opens and reused for every turn on it (see ChatConnection for the protocol)
+    
+    Args:
+        websocket: Incoming WebSocket
+        session_id: Conversation to resume (a new one is issued if omitted or invalid)
+        db: Database connection
+        current_user: Authenticated user from the cookie/Authorization header, if any
+    """
+    await websocket.accept()
+    
+    agent_service = AgentService(db)
+    session_id = await agent_service.resolve_session(
+        session_id,
+        user_id=current_user.get("email") if current_user else None
+    )
+    
+    await ChatConnection(websocket, agent_service, session_id, current_user).run()
@@ -2,24 +2,38 @@
 Agent Service
 Handles graph execution and session management
 """
-import uuid
-from typing import Dict, List, Optional
-from datetime import datetime
+import logging
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage
-from langgraph.checkpoint.base import CheckpointTuple
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.agent.models import AgentState, Meta, Eligibility, ActionTicket
 from app.agent.graph import create_agent_graph
+from app.agent.replies import message_timestamp
+from app.core.auth import is_legacy_session_id, issue_session_id, verify_session_id
 from app.core.config import settings
 from app.core.database import get_checkpointer
+from app.core.metrics import metrics
+from app.core.tracing import llm_metrics_handler, trace_turn
+from app.services.session_lock import coalesce_messages, session_locks
+from app.services.session_metadata import session_metadata
+
+logger = logging.getLogger(__name__)
 
 
 # Global singleton graph instance (Zendesk pattern)
 _graph_instance = None
 _graph_initialized = False
 
+# Messages waiting for their session's lock, with the future that receives their turn's result
+_pending_turns: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+
+# Streamed turns (strong references so a turn outlives a disconnected client)
+_streamed_turns: Set[asyncio.Task] = set()
+
+BUSY_MESSAGE = "I'm still working on your previous message. Please try again in a moment."
+
 
 def get_or_create_graph(db: AsyncIOMotorDatabase):
     """
@@ -29,16 +43,17 @@ def get_or_create_graph(db: AsyncIOMotorDatabase):
     global _graph_instance, _graph_initialized
     
     if not _graph_initialized:
-        print("[AGENT_SERVICE] Creating singleton graph instance (Zendesk pattern)")
+        logger.info("Creating singleton graph instance")
         llm = ChatOpenAI(
             model=settings.openai_model,
             temperature=0.0,
-            api_key=settings.openai_api_key
+            api_key=settings.openai_api_key,
+            callbacks=[llm_metrics_handler]
         )
         checkpointer = get_checkpointer()
         _graph_instance = create_agent_graph(llm, db, checkpointer)
         _graph_initialized = True
-        print("[AGENT_SERVICE] ✅ Singleton graph created and cached for all requests")
+        logger.info("Singleton graph created and cached for all requests")
     
     return _graph_instance
 
@@ -60,96 +75,86 @@ class AgentService:
         # Get the singleton graph instance (created once, reused forever)
         self.graph = get_or_create_graph(db)
     
-    async def create_session(self, user_id: Optional[str] = None) -> str:
+    def create_session(self, user_id: Optional[str] = None) -> str:
         """
         Create a new conversation session
         
+        Stateless: the ID is signed rather than stored, and the conversation
+        only materializes with its first checkpoint. A metadata record is
+        buffered and written in bulk (see SessionMetadataWriter).
+        
         Args:
             user_id: Optional user ID
             
         Returns:
             Session ID
         """
-        session_id = str(uuid.uuid4())
-        
-        # Initialize session in database
-        session_doc = {
-            "session_id": session_id,
-            "user_id": user_id,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-            "state": self._get_initial_state(session_id)
-        }
-        
-        await self.db.conversation_sessions.insert_one(session_doc)
-        
+        session_id = issue_session_id()
+        session_metadata.record(session_id, user_id)
         return session_id
     
-    def _get_initial_state(self, session_id: str) -> AgentState:
+    async def is_known_session(self, session_id: str) -> bool:
         """
-        Get initial state for a new session
+        Check that a session ID may be resumed
+        
+        Signed IDs are checked without a database read. Unsigned UUIDs from
+        before IDs were signed are accepted while legacy_session_ids_enabled
+        is set, but only if their conversation already has a checkpoint, so
+        clients can't open new unsigned sessions.
         
         Args:
-            session_id: Session ID
+            session_id: Session ID sent by the client
             
         Returns:
-            Initial agent state
+            True if the session can be resumed
         """
-        return {
-            "messages": [],
-            "intent": None,
-            "order_number": None,
-            "order_match_confidence": None,
-            "order": None,
-            "user_confirmed_order": None,
-            "eligibility": {},
-            "desired_action": None,
-            "action_ticket": {},
-            "email_status": None,
-            "error": None,
-            "meta": {
-                "session_id": session_id,
-                "idempotency_key": None,
-                "locale": "en"
-            }
-        }
+        if verify_session_id(session_id):
+            return True
+        if not settings.legacy_session_ids_enabled or not is_legacy_session_id(session_id):
+            return False
+        if not await get_checkpointer().ahas_thread(session_id):
+            return False
+        metrics.counter("legacy_sessions_resumed_total").inc()
+        return True
     
-    async def get_session_state(self, session_id: str) -> Optional[AgentState]:
+    async def resolve_session(self, session_id: Optional[str], user_id: Optional[str] = None) -> str:
         """
-        Retrieve session state from database
+        Return the client's session ID if it is valid, otherwise start a new session
         
         Args:
-            session_id: Session ID
+            session_id: Session ID sent by the client, if any
+            user_id: Optional user ID for a new session
             
         Returns:
-            Agent state or None if not found
+            Session ID to use
         """
-        session = await self.db.conversation_sessions.find_one({
-            "session_id": session_id
-        })
-        
-        if not session:
-            return None
-        
-        return session.get("state")
+        if session_id and await self.is_known_session(session_id):
+            return session_id
+        return self.create_session(user_id)
     
-    async def save_session_state(self, session_id: str, state: AgentState):
-        """
-        Save session state to database
-        
-        Args:
-            session_id: Session ID
-            state: Agent state to save
-        """
-        await self.db.conversation_sessions.update_one(
-            {"session_id": session_id},
-            {
-                "$set": {
-                    "state": state,
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
+    @staticmethod
+    def _run_config(session_id: str) -> Dict[str, Any]:
+        """The thread_id tells the checkpointer which conversation to resume"""
+        return {
+            "configurable": {"thread_id": session_id},
+            "recursion_limit": 50
+        }
+    
+    @staticmethod
+    def _turn_input(input_message: HumanMessage) -> Dict[str, Any]:
+        """A new user message always clears the turn-scoped flags from the previous turn"""
+        return {"messages": [input_message], "awaiting_user": False, "nlu_extracted": False}
+    
+    @staticmethod
+    def _state_summary(state: Dict[str, Any]) -> Dict[str, Any]:
+        """Client-facing subset of the agent state"""
+        return {
+            "intent": state.get("intent"),
+            "order_number": state.get("order_number"),
+            "has_order": state.get("order") is not None,
+            "desired_action": state.get("desired_action"),
+            "ticket_id": (state.get("action_ticket") or {}).get("id")
+        }
     
     async def process_message(
         self,
@@ -165,68 +170,121 @@ class AgentService:
             
         Returns:
             Response with assistant messages
+        
+        Turns on the same session never run concurrently (double-submits, two
+        tabs): they wait for the session lock, and messages that queued up
+        behind a running turn are coalesced into a single turn whose result
+        every caller receives.
         """
-        print(f"[AGENT_SERVICE] Processing message for session: {session_id}")
+        future = asyncio.get_running_loop().create_future()
+        _pending_turns.setdefault(session_id, []).append((message, future))
+        
+        try:
+            async with session_locks.hold(session_id):
+                if not future.done():
+                    batch = _pending_turns.pop(session_id, [])
+                    try:
+                        if len(batch) > 1:
+                            metrics.counter("turns_coalesced_total").inc(len(batch) - 1)
+                        result = await self._run_turn(session_id, coalesce_messages([m for m, _ in batch]))
+                        for _, waiter in batch:
+                            if not waiter.done():
+                                waiter.set_result(result)
+                    finally:
+                        # If this turn was cancelled, hand the other callers' messages to the next lock holder
+                        unserved = [entry for entry in batch if entry[1] is not future and not entry[1].done()]
+                        if unserved:
+                            _pending_turns[session_id] = unserved + _pending_turns.get(session_id, [])
+        except TimeoutError as e:
+            pending = _pending_turns.get(session_id, [])
+            if (message, future) in pending:
+                pending.remove((message, future))
+            if not future.done():
+                return {"success": False, "messages": [BUSY_MESSAGE], "error": str(e)}
         
+        return future.result()
+    
+    async def _turn_events(self, session_id: str, message: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run one turn through the graph, yielding what each worker produced
+        (caller holds the session lock)
+        
+        New assistant messages are taken from the per-node updates, so extracting
+        a turn's replies never scans the conversation history.
+        
+        Args:
+            session_id: Session ID (used as thread_id for checkpointer)
+            message: User message
+            
+        Yields:
+            {"event": "node", "data": {"node": ...}} per worker,
+            {"event": "message", "data": {"content": ...}} per assistant message,
+            then {"event": "done", "data": {"state": ...}}
+        """
         # Create a LangChain message object (required for checkpointer to work!)
         # The checkpointer needs proper LangChain message types to append to state
-        input_message = HumanMessage(content=message)
+        input_message = HumanMessage(content=message, additional_kwargs=message_timestamp())
         
-        print(f"[AGENT_SERVICE] Invoking graph with checkpointing (thread_id={session_id})")
-        print(f"[AGENT_SERVICE] Input: new message only (checkpointer will load rest)")
+        # Stream with ONLY the new message - checkpointer handles state loading
+        # Messages in input are APPENDED to existing messages from checkpoint
+        # All other state fields should be loaded from checkpoint automatically
+        # Durability "exit" keeps intermediate node outputs in memory and flushes a single
+        # checkpoint per turn; a crash mid-turn simply replays the turn from the last one
+        final_state: Dict[str, Any] = {}
+        async with trace_turn(session_id):
+            async for mode, chunk in self.graph.astream(
+                self._turn_input(input_message),
+                config=self._run_config(session_id),
+                stream_mode=["updates", "values"],
+                durability=settings.checkpoint_durability
+            ):
+                if mode == "values":
+                    final_state = chunk
+                    continue
+                
+                for node, update in chunk.items():
+                    yield {"event": "node", "data": {"node": node}}
+                    for msg in (update or {}).get("messages", []):
+                        if isinstance(msg, AIMessage):
+                            yield {"event": "message", "data": {"content": msg.content}}
         
-        # Run the graph with checkpointing config
-        try:
-            # The config with thread_id tells the checkpointer which conversation to resume
-            config = {
-                "configurable": {"thread_id": session_id},
-                "recursion_limit": 50
-            }
-            
-            # Invoke with ONLY the new message - checkpointer handles state loading
-            # Messages in input are APPENDED to existing messages from checkpoint
-            # All other state fields should be loaded from checkpoint automatically
-            result = await self.graph.ainvoke(
-                {"messages": [input_message]},
-                config=config
-            )
-            
-            print(f"[AGENT_SERVICE] Graph execution complete")
-            print(f"[AGENT_SERVICE] Result state: intent={result.get('intent')}, order_number={result.get('order_number')}, has_order={result.get('order') is not None}")
-            print(f"[AGENT_SERVICE] Total messages in state: {len(result.get('messages', []))}")
+        logger.debug(
+            "Turn complete session=%s intent=%s order_number=%s",
+            session_id, final_state.get("intent"), final_state.get("order_number")
+        )
+        
+        yield {"event": "done", "data": {"state": self._state_summary(final_state)}}
+    
+    async def _run_turn(self, session_id: str, message: str) -> Dict[str, Any]:
+        """
+        Run one turn and collect its replies (caller holds the session lock)
+        
+        Args:
+            session_id: Session ID (used as thread_id for checkpointer)
+            message: User message
             
-            # Extract assistant messages that came after the user message
-            all_messages = result.get("messages", [])
+        Returns:
+            Response with assistant messages
+        """
+        logger.debug("Processing message for session %s", session_id)
+        
+        try:
             assistant_messages = []
-            
-            # Find messages after our HumanMessage
-            found_our_message = False
-            for msg in all_messages:
-                # Check if this is our HumanMessage
-                if isinstance(msg, HumanMessage) and msg.content == message:
-                    found_our_message = True
-                    continue
-                
-                # Collect AIMessages that come after our message
-                if found_our_message and isinstance(msg, AIMessage):
-                    assistant_messages.append(msg.content)
+            state = {}
+            async for event in self._turn_events(session_id, message):
+                if event["event"] == "message":
+                    assistant_messages.append(event["data"]["content"])
+                elif event["event"] == "done":
+                    state = event["data"]["state"]
             
             return {
                 "success": True,
                 "messages": assistant_messages,
-                "state": {
-                    "intent": result.get("intent"),
-                    "order_number": result.get("order_number"),
-                    "has_order": result.get("order") is not None,
-                    "desired_action": result.get("desired_action"),
-                    "ticket_id": (result.get("action_ticket") or {}).get("id")
-                }
+                "state": state
             }
         
         except Exception as e:
-            print(f"Error processing message: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error processing message for session %s", session_id)
             
             return {
                 "success": False,
@@ -234,22 +292,117 @@ class AgentService:
                 "error": str(e)
             }
     
+    async def stream_message(
+        self,
+        session_id: str,
+        message: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user message, yielding progress as each worker finishes
+        
+        Same checkpointing semantics as process_message, but the events are
+        passed on as they happen so a worker's reply reaches the client before
+        the following workers run.
+        
+        The turn runs in its own task: if the consumer goes away (client
+        disconnect closes this generator), the turn still completes and its
+        checkpoint - including the user's message - is persisted.
+        
+        Args:
+            session_id: Session ID (used as thread_id for checkpointer)
+            message: User message
+            
+        Yields:
+            The events of _turn_events, or a final {"event": "error", ...}
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        turn = asyncio.create_task(self._relay_turn(session_id, message, events))
+        _streamed_turns.add(turn)
+        turn.add_done_callback(_streamed_turns.discard)
+        
+        while (event := await events.get()) is not None:
+            yield event
+    
+    async def _relay_turn(self, session_id: str, message: str, events: asyncio.Queue):
+        """
+        Run one streamed turn, putting its events on the queue (None when finished)
+        
+        Args:
+            session_id: Session ID (used as thread_id for checkpointer)
+            message: User message
+            events: Queue read by stream_message
+        """
+        logger.debug("Streaming message for session %s", session_id)
+        
+        try:
+            # Serialized with every other turn on this session
+            async with session_locks.hold(session_id):
+                async for event in self._turn_events(session_id, message):
+                    events.put_nowait(event)
+        
+        except TimeoutError as e:
+            events.put_nowait({"event": "error", "data": {"content": BUSY_MESSAGE, "error": str(e)}})
+        
+        except Exception as e:
+            logger.exception("Error streaming message for session %s", session_id)
+            
+            events.put_nowait({
+                "event": "error",
+                "data": {
+                    "content": "I encountered an error processing your request. Please try again.",
+                    "error": str(e)
+                }
+            })
+        
+        finally:
+            events.put_nowait(None)
+    
+    @staticmethod
+    def _history_entry(msg: BaseMessage) -> Dict[str, Any]:
+        """Client-facing projection of a stored message"""
+        return {
+            "id": msg.id,
+            "role": "user" if isinstance(msg, HumanMessage) else "assistant",
+            "content": msg.content,
+            "timestamp": msg.additional_kwargs.get("timestamp")
+        }
+    
     async def get_conversation_history(
         self,
-        session_id: str
-    ) -> List[Dict[str, str]]:
+        session_id: str,
+        before: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict[str, Any]:
         """
-        Get conversation history for a session
+        Get a page of conversation history from the latest checkpoint
+        
+        Messages older than the checkpoint's window were folded into
+        history_summary by compaction; their count is reported as
+        compacted_messages.
         
         Args:
             session_id: Session ID
+            before: Return messages older than this message ID (newest page if omitted)
+            limit: Maximum number of messages to return
             
         Returns:
-            List of messages
+            messages (oldest first), next_before cursor (None on the first page) and compacted_messages
+        
+        Raises:
+            ValueError: If before is not the ID of a message in the window
         """
-        state = await self.get_session_state(session_id)
+        values = await get_checkpointer().aget_channel_values(session_id) or {}
+        messages = [m for m in values.get("messages", []) if isinstance(m, (HumanMessage, AIMessage))]
         
-        if not state:
-            return []
+        end = len(messages)
+        if before is not None:
+            end = next((i for i, m in enumerate(messages) if m.id == before), None)
+            if end is None:
+                raise ValueError(f"Unknown cursor {before}")
+        start = max(end - limit, 0)
         
-        return state.get("messages", [])
+        return {
+            "messages": [self._history_entry(m) for m in messages[start:end]],
+            "next_before": messages[start].id if start > 0 else None,
+            "compacted_messages": (values.get("history_summary") or {}).get("compacted_messages", 0)
+        }
@@ -0,0 +1,171 @@
+"""
+Chat Connection
+One WebSocket bound to one conversation: session, agent service and user are
+resolved once per connection, turns are streamed with heartbeat and backpressure
+"""
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.agent_service import AgentService
+from app.services.session_lock import coalesce_messages
+
+
+# Open connections (exported as the ws_connections gauge)
+_open_connections = 0
+
+
+class ChatConnection:
+    """
+    Serves chat turns over a single WebSocket
+
+    Protocol (JSON frames):
+        client → {"type": "message", "message": "..."} | {"type": "ping"} | {"type": "pong"}
+        server → {"type": "session", "session_id": ...} once, then per turn the
+                 same events as /api/chat/stream ("node", "message", "done",
+                 "error") plus {"type": "ping"} heartbeats and {"type": "pong"}
+
+    Backpressure: turns run one at a time; at most ws_max_pending_messages
+    further messages are queued (and coalesced into the next turn), extra
+    ones are rejected with a "busy" error. A client that stops reading is disconnected once a send takes
+    longer than ws_send_timeout_seconds.
+    """
+
+    def __init__(self, websocket: WebSocket, agent_service: AgentService, session_id: str, user: Optional[dict] = None):
+        """
+        Initialize the connection
+
+        Args:
+            websocket: Accepted WebSocket
+            agent_service: Agent service reused for every turn
+            session_id: Conversation (thread) the connection is bound to
+            user: Authenticated user, if any
+        """
+        self.websocket = websocket
+        self.agent_service = agent_service
+        self.session_id = session_id
+        self.user = user
+        self.inbox: asyncio.Queue = asyncio.Queue(maxsize=settings.ws_max_pending_messages)
+        self.last_seen = time.monotonic()
+        self._send_lock = asyncio.Lock()
+        self._closed = asyncio.Event()
+        self._in_turn = False
+        self._close_code: Optional[int] = None  # Set when the server closes the socket
+
+    async def send(self, payload: Dict[str, Any]):
+        """
+        Send a frame, disconnecting clients that don't keep up
+
+        Args:
+            payload: JSON-serializable frame
+        """
+        if self._closed.is_set():
+            return
+        async with self._send_lock:
+            try:
+                await asyncio.wait_for(self.websocket.send_json(payload), settings.ws_send_timeout_seconds)
+            except asyncio.TimeoutError:
+                metrics.counter("ws_disconnects_total", reason="slow_consumer").inc()
+                self.close(1008)
+            except (WebSocketDisconnect, RuntimeError):
+                # Socket already gone - the read loop records the disconnect
+                self._closed.set()
+
+    def close(self, code: int = 1000):
+        """
+        Ask the connection to shut down; run() sends the close frame
+
+        Args:
+            code: WebSocket close code
+        """
+        if self._close_code is None:
+            self._close_code = code
+        self._closed.set()
+
+    async def _read_loop(self):
+        try:
+            while True:
+                raw = await self.websocket.receive_text()
+                self.last_seen = time.monotonic()
+
+                try:
+                    frame = json.loads(raw)
+                except ValueError:
+                    await self.send({"type": "error", "error": "invalid_json"})
+                    continue
+
+                kind = frame.get("type")
+                if kind == "message" and isinstance(frame.get("message"), str) and frame["message"].strip():
+                    try:
+                        self.inbox.put_nowait(frame["message"])
+                    except asyncio.QueueFull:
+                        metrics.counter("ws_messages_rejected_total").inc()
+                        await self.send({"type": "error", "error": "busy", "content": "Please wait for my reply before sending more messages."})
+                elif kind == "ping":
+                    await self.send({"type": "pong"})
+                elif kind != "pong":
+                    await self.send({"type": "error", "error": "unknown_frame"})
+        except (WebSocketDisconnect, RuntimeError):
+            metrics.counter("ws_disconnects_total", reason="client").inc()
+        finally:
+            self._closed.set()
+
+    async def _heartbeat_loop(self):
+        while not self._closed.is_set():
+            await asyncio.sleep(settings.ws_heartbeat_seconds)
+            if time.monotonic() - self.last_seen > settings.ws_idle_timeout_seconds:
+                # No frames (not even pongs) - the client is gone
+                metrics.counter("ws_disconnects_total", reason="heartbeat_timeout").inc()
+                self.close(1001)
+                return
+            await self.send({"type": "ping"})
+
+    async def _turn_loop(self):
+        while not self._closed.is_set():
+            messages = [await self.inbox.get()]
+            # Messages that arrived while the previous turn ran become one turn
+            while not self.inbox.empty():
+                messages.append(self.inbox.get_nowait())
+            if len(messages) > 1:
+                metrics.counter("turns_coalesced_total").inc(len(messages) - 1)
+            message = coalesce_messages(messages)
+            self._in_turn = True
+            try:
+                # Sends are skipped once the client is gone, but the turn still runs to
+                # completion so its checkpoint (and the user's message) is persisted
+                async for event in self.agent_service.stream_message(self.session_id, message):
+                    await self.send({"type": event["event"], **event["data"]})
+            finally:
+                self._in_turn = False
+
+    async def run(self):
+        """Serve the connection until either side closes it"""
+        global _open_connections
+        _open_connections += 1
+        metrics.gauge("ws_connections").set(_open_connections)
+
+        reader = asyncio.create_task(self._read_loop())
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        turns = asyncio.create_task(self._turn_loop())
+        try:
+            await self.send({"type": "session", "session_id": self.session_id})
+            await self._closed.wait()
+        finally:
+            reader.cancel()
+            heartbeat.cancel()
+            if not self._in_turn:
+                turns.cancel()
+            # wait(), not gather(): a cancellation arriving here must stay attributable to
+            # the caller's cancel scope instead of surfacing as a child task's CancelledError
+            await asyncio.wait((reader, heartbeat, turns))
+            if self._close_code is not None:
+                try:
+                    await asyncio.wait_for(self.websocket.close(self._close_code), settings.ws_send_timeout_seconds)
+                except Exception:
+                    pass
+            _open_connections -= 1
+            metrics.gauge("ws_connections").set(_open_connections)
@@ -0,0 +1,285 @@
+"""
+Email Outbox
+Confirmation emails are written to the email_outbox collection by EmailWorker
+and delivered by a background dispatcher with batching, retry/backoff and a
+concurrency limit
+"""
+import logging
+import asyncio
+import random
+import smtplib
+import time
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional
+from pymongo import ReturnDocument
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+OUTBOX_COLLECTION = "email_outbox"
+
+# Set by enqueue_email so the dispatcher wakes up without waiting for the poll interval
+_wakeup = asyncio.Event()
+
+
+async def enqueue_email(db: AsyncIOMotorDatabase, outbox_id: str, to: str, subject: str, body: str) -> bool:
+    """
+    Queue an email (idempotent per outbox_id)
+
+    Args:
+        db: MongoDB database instance
+        outbox_id: Stable ID (e.g. derived from the ticket) so retries don't queue twice
+        to: Recipient
+        subject: Subject line
+        body: Plain-text body
+
+    Returns:
+        True if newly queued, False if it was already in the outbox
+    """
+    now = datetime.utcnow()
+    existing = await db[OUTBOX_COLLECTION].find_one_and_update(
+        {"_id": outbox_id},
+        {"$setOnInsert": {
+            "to": to,
+            "subject": subject,
+            "body": body,
+            "status": "queued",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        }},
+        upsert=True,
+        projection={"_id": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    _wakeup.set()
+    return existing is None
+
+
+class MockEmailSender:
+    """Logs emails instead of sending them (no SMTP_HOST configured)"""
+
+    async def send(self, to: str, subject: str, body: str):
+        logger.info("[MOCK EMAIL] To: %s Subject: %s Body: %s", to, subject, body)
+
+
+class SMTPEmailSender:
+    """
+    Sends through an SMTP server
+    For local testing run a stand-in server, e.g. `python -m aiosmtpd -n -l localhost:1025`
+    """
+
+    def __init__(self, host: str, port: int, sender: str, username: str = "", password: str = "", use_tls: bool = False):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+
+    def _send_sync(self, message: EmailMessage):
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(message)
+
+    async def send(self, to: str, subject: str, body: str):
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = to
+        message["Subject"] = subject
+        message.set_content(body)
+        # smtplib is blocking - keep it off the event loop
+        await asyncio.to_thread(self._send_sync, message)
+
+
+class EmailDispatcher:
+    """
+    Background delivery loop for the outbox
+
+    Claims are atomic per document (queued → sending, stamped with a claim ID),
+    so several app processes can run a dispatcher against the same collection. Claims abandoned by a crashed
+    process are retried after claim_timeout_seconds.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 50,
+        concurrency: int = 10,
+        max_attempts: int = 5,
+        backoff_seconds: float = 5.0,
+        poll_interval_seconds: float = 5.0,
+        claim_timeout_seconds: float = 300.0
+    ):
+        """
+        Initialize the dispatcher
+
+        Args:
+            batch_size: Maximum emails claimed per batch
+            concurrency: Maximum sends in flight
+            max_attempts: Attempts before an email is marked failed
+            backoff_seconds: Base delay for exponential backoff
+            poll_interval_seconds: Idle wait between outbox scans
+            claim_timeout_seconds: Age after which a "sending" claim is considered abandoned
+        """
+        self.collection = None
+        self.sender = None
+        self.batch_size = batch_size
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.claim_timeout_seconds = claim_timeout_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, db: AsyncIOMotorDatabase, sender: Any):
+        """
+        Start the delivery loop
+
+        Args:
+            db: MongoDB database instance
+            sender: Object with `async send(to, subject, body)`
+        """
+        self.collection = db[OUTBOX_COLLECTION]
+        self.sender = sender
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the delivery loop (in-flight claims are retried after the claim timeout)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            # Cleared before claiming: mail queued while the batch is out sets it again,
+            # so it is picked up right away instead of after the poll interval
+            _wakeup.clear()
+            try:
+                delivered = await self.dispatch_batch()
+            except Exception as e:
+                logger.exception("Email dispatch failed")
+                delivered = 0
+
+            if delivered < self.batch_size:
+                # Outbox drained - sleep until new mail is queued or the poll interval passes
+                try:
+                    await asyncio.wait_for(_wakeup.wait(), self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _claim(self) -> List[Dict[str, Any]]:
+        """
+        Claim up to batch_size due emails in three round trips
+
+        Candidates are read first; the update re-checks the claimable filter, so a
+        document another dispatcher claimed in between is skipped, and the batch
+        is read back by this claim's ID.
+        """
+        now = datetime.utcnow()
+        claimable = {"$or": [
+            {"status": "queued", "next_attempt_at": {"$lte": now}},
+            {"status": "sending", "claimed_at": {"$lt": now - timedelta(seconds=self.claim_timeout_seconds)}},
+        ]}
+        candidates = await self.collection.find(
+            claimable, projection={"_id": 1}, sort=[("next_attempt_at", 1)], limit=self.batch_size
+        ).to_list(self.batch_size)
+        if not candidates:
+            return []
+
+        claim_id = uuid.uuid4().hex
+        await self.collection.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in candidates]}, **claimable},
+            {"$set": {"status": "sending", "claimed_at": now, "claim_id": claim_id}}
+        )
+        return await self.collection.find({"claim_id": claim_id}).to_list(self.batch_size)
+
+    async def _deliver(self, doc: Dict[str, Any]) -> bool:
+        async with self.semaphore:
+            started = time.perf_counter()
+            try:
+                await self.sender.send(doc["to"], doc["subject"], doc["body"])
+            except Exception as e:
+                attempts = doc.get("attempts", 0) + 1
+                if attempts >= self.max_attempts:
+                    update = {"status": "failed", "attempts": attempts, "last_error": str(e)}
+                    metrics.counter("emails_total", result="failed").inc()
+                else:
+                    delay = self.backoff_seconds * 2 ** (attempts - 1) * random.uniform(0.8, 1.2)
+                    update = {
+                        "status": "queued",
+                        "attempts": attempts,
+                        "last_error": str(e),
+                        "next_attempt_at": datetime.utcnow() + timedelta(seconds=delay),
+                    }
+                    metrics.counter("emails_total", result="retry").inc()
+                logger.warning("Send to %s failed (attempt %d): %s", doc["to"], attempts, e)
+                await self.collection.update_one({"_id": doc["_id"]}, {"$set": update})
+                return False
+
+            metrics.histogram("email_send_latency_seconds").observe(time.perf_counter() - started)
+            metrics.counter("emails_total", result="sent").inc()
+            await self.collection.update_one(
+                {"_id": doc["_id"]},
+                {"$set": {"status": "sent", "sent_at": datetime.utcnow(), "attempts": doc.get("attempts", 0) + 1}}
+            )
+            return True
+
+    async def dispatch_batch(self) -> int:
+        """
+        Claim and send one batch
+
+        Returns:
+            Number of emails claimed
+        """
+        batch = await self._claim()
+        if not batch:
+            return 0
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self._deliver(doc) for doc in batch))
+        elapsed = time.perf_counter() - started
+        sent = sum(results)
+        metrics.gauge("email_dispatch_throughput_per_second").set(sent / elapsed if elapsed > 0 else 0.0)
+        logger.info("Sent %d/%d emails in %.2fs", sent, len(batch), elapsed)
+        return len(batch)
+
+
+def create_email_sender():
+    """
+    Build the configured sender
+
+    Returns:
+        SMTPEmailSender if SMTP_HOST is set, otherwise MockEmailSender
+    """
+    if settings.smtp_host:
+        return SMTPEmailSender(
+            settings.smtp_host,
+            settings.smtp_port,
+            settings.smtp_sender,
+            settings.smtp_username,
+            settings.smtp_password,
+            settings.smtp_use_tls
+        )
+    return MockEmailSender()
+
+
+email_dispatcher = EmailDispatcher(
+    batch_size=settings.email_batch_size,
+    concurrency=settings.email_concurrency,
+    max_attempts=settings.email_max_attempts,
+    backoff_seconds=settings.email_backoff_seconds,
+    poll_interval_seconds=settings.email_poll_seconds
+)
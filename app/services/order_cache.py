@@ -0,0 +1,146 @@
+"""
+Order Cache
+Read-through cache in front of the orders collection with singleflight
+de-duplication of concurrent lookups, a Bloom filter for definite misses and
+a short-lived negative cache
+"""
+import asyncio
+from typing import Any, Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.order_filter import order_filter
+
+
+# Only the fields order_lookup normalizes
+ORDER_PROJECTION = {
+    "_id": 0,
+    "order_number": 1,
+    "user_email": 1,
+    "first_name": 1,
+    "last_name": 1,
+    "user_contact_number": 1,
+    "items": 1,
+    "order_date": 1,
+    "delivery_date": 1,
+    "order_total": 1,
+    "status": 1,
+}
+
+
+class OrderCache:
+    """
+    In-process LRU/TTL cache of order documents keyed by order number
+
+    Concurrent misses for the same order share one query. The query runs in
+    its own task, so a cancelled caller (e.g. a discarded speculative
+    prefetch) doesn't fail the others.
+
+    Recent not-found results and Bloom filter negatives are answered with
+    None without querying. The filter only learns about orders inserted by
+    other processes on its next refresh (ORDER_FILTER_REFRESH_SECONDS), so
+    such an order reads as not found until then.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, negative_ttl_seconds: float):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum cached orders (and cached misses)
+            ttl_seconds: How long an order may be served from memory
+            negative_ttl_seconds: How long a not-found result is remembered
+        """
+        self.cache = TTLCache("orders", max_entries, ttl_seconds)
+        self.negative = TTLCache("orders_negative", max_entries, negative_ttl_seconds)
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get(self, db: AsyncIOMotorDatabase, order_number: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an order, querying MongoDB only on a miss
+
+        Args:
+            db: MongoDB database instance
+            order_number: Order number
+
+        Returns:
+            Projected order document or None
+        """
+        if not settings.order_cache_enabled:
+            return await self._query(db, order_number)
+
+        if self.negative.get(order_number) is not MISSING:
+            metrics.counter("order_cache_round_trips_saved_total", reason="negative").inc()
+            return None
+
+        order = self.cache.get(order_number)
+        if order is not MISSING:
+            metrics.counter("order_cache_round_trips_saved_total", reason="hit").inc()
+            return order
+
+        if not order_filter.might_contain(order_number):
+            # Definitely absent as of the last filter refresh
+            metrics.counter("order_cache_round_trips_saved_total", reason="bloom").inc()
+            return None
+
+        task = self._inflight.get(order_number)
+        if task is None:
+            task = asyncio.create_task(self._load(db, order_number))
+            self._inflight[order_number] = task
+            task.add_done_callback(lambda done: self._finish(order_number, done))
+        else:
+            metrics.counter("order_cache_round_trips_saved_total", reason="singleflight").inc()
+
+        return await asyncio.shield(task)
+
+    def invalidate(self, order_number: str):
+        """
+        Drop a cached order (and detach any in-flight load from the cache)
+
+        Args:
+            order_number: Order number
+        """
+        self.cache.delete(order_number)
+        self.negative.delete(order_number)
+        self._inflight.pop(order_number, None)
+
+    @staticmethod
+    async def _query(db: AsyncIOMotorDatabase, order_number: str) -> Optional[Dict[str, Any]]:
+        maybe_present = order_filter.might_contain(order_number)
+        metrics.counter("order_queries_total").inc()
+        order = await db.orders.find_one({"order_number": order_number}, ORDER_PROJECTION)
+        if order is None and maybe_present and order_filter.ready:
+            # The filter said "maybe" but the order doesn't exist
+            metrics.counter("order_filter_false_positives_total").inc()
+        elif order is not None and not maybe_present:
+            # Inserted by another process since the last refresh (only reached with the cache disabled)
+            metrics.counter("order_filter_stale_negatives_total").inc()
+            order_filter.add(order_number)
+        return order
+
+    async def _load(self, db: AsyncIOMotorDatabase, order_number: str) -> Optional[Dict[str, Any]]:
+        order = await self._query(db, order_number)
+        # An invalidation during the query discards the result
+        if self._inflight.get(order_number) is asyncio.current_task():
+            if order is None:
+                self.negative.set(order_number, True)
+            else:
+                self.cache.set(order_number, order)
+        return order
+
+    def _finish(self, order_number: str, task: asyncio.Task):
+        if self._inflight.get(order_number) is task:
+            del self._inflight[order_number]
+        # Mark the exception retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+# Global order cache
+order_cache = OrderCache(
+    settings.order_cache_max_entries,
+    settings.order_cache_ttl_seconds,
+    settings.order_cache_negative_ttl_seconds
+)
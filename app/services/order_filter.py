@@ -0,0 +1,229 @@
+"""
+Order Number Filter
+Bloom filter over every order_number; OrderCache answers lookups the filter
+rules out without querying MongoDB
+"""
+import logging
+import asyncio
+import hashlib
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# Orders inserted by other writers may carry slightly older ObjectIds; re-scan this window on refresh
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+class OrderNumberFilter:
+    """
+    Membership filter for order numbers
+
+    Loaded from disk (then caught up with newer orders) or built from the
+    orders collection at startup, refreshed periodically, and persisted after
+    every change. The persisted file is only reused for the database it was
+    built from, and only if that database still holds the same orders up to
+    the recorded last _id. Until it is ready every order number is treated as
+    possibly present. Orders inserted by other processes are only in the
+    filter after the next refresh; until then OrderCache reports them as
+    not found.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, path: Optional[Path] = None):
+        """
+        Initialize the filter
+
+        Args:
+            capacity: Expected number of orders (the filter is rebuilt larger when exceeded)
+            error_rate: Target false-positive rate
+            path: File used to persist the filter across restarts
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.path = path
+        self.bloom: Optional[BloomFilter] = None
+        self.last_id: Optional[ObjectId] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.bloom is not None
+
+    @staticmethod
+    def _source(db: AsyncIOMotorDatabase) -> str:
+        # Hashed so credentials in the URL never end up on disk
+        return hashlib.sha256(f"{settings.mongodb_url}/{db.name}".encode()).hexdigest()[:16]
+
+    @staticmethod
+    async def _orders_through(db: AsyncIOMotorDatabase, last_id: Optional[ObjectId]) -> int:
+        """Number of orders up to and including last_id"""
+        if last_id is None:
+            return 0
+        return await db.orders.count_documents({"_id": {"$lte": last_id}})
+
+    def add(self, order_number: str):
+        """
+        Record an order found in MongoDB that the filter didn't know about yet
+
+        Args:
+            order_number: Order number
+        """
+        if self.bloom is not None:
+            self.bloom.add(order_number)
+
+    def might_contain(self, order_number: str) -> bool:
+        """
+        Check whether an order may exist
+
+        Args:
+            order_number: Order number
+
+        Returns:
+            False only if the order definitely does not exist
+        """
+        return self.bloom is None or order_number in self.bloom
+
+    async def load_or_build(self, db: AsyncIOMotorDatabase):
+        """
+        Load the persisted filter and catch up, or build it from scratch
+
+        Args:
+            db: MongoDB database instance
+        """
+        if self.path and self.path.exists():
+            try:
+                bloom, header = await asyncio.to_thread(BloomFilter.load, self.path)
+                last_id = ObjectId(header["last_id"]) if header.get("last_id") else None
+                if bloom.capacity < self.capacity or bloom.error_rate != self.error_rate:
+                    logger.info("Filter settings changed, rebuilding %s", self.path)
+                elif header.get("source") != self._source(db):
+                    logger.info("%s was built from another database, rebuilding", self.path)
+                elif header.get("orders") != await self._orders_through(db, last_id):
+                    # Restored or rewritten collection: orders older than last_id changed
+                    logger.info("Orders changed since %s was written, rebuilding", self.path)
+                else:
+                    self.bloom, self.last_id = bloom, last_id
+                    logger.info("Loaded %d order numbers from %s", bloom.count, self.path)
+            except Exception as e:
+                logger.warning("Could not load %s, rebuilding: %s", self.path, e)
+
+        if self.bloom is None:
+            await self.rebuild(db)
+        else:
+            await self.refresh(db)
+
+    async def rebuild(self, db: AsyncIOMotorDatabase):
+        """
+        Build the filter from the full orders collection
+
+        Args:
+            db: MongoDB database instance
+        """
+        async with self._lock:
+            total = await db.orders.estimated_document_count()
+            self.capacity = max(self.capacity, total * 2)
+            bloom = BloomFilter(self.capacity, self.error_rate)
+            last_id = None
+            async for order in db.orders.find({}, {"order_number": 1}).sort("_id", 1):
+                if order.get("order_number"):
+                    bloom.add(order["order_number"])
+                last_id = order["_id"]
+
+            self.bloom, self.last_id = bloom, last_id
+            logger.info("Built filter over %d order numbers (%d bytes)", bloom.count, bloom.memory_bytes)
+            await self._persist(db)
+
+    async def refresh(self, db: AsyncIOMotorDatabase):
+        """
+        Add orders inserted since the last build/refresh
+
+        Args:
+            db: MongoDB database instance
+        """
+        if self.bloom is None:
+            return await self.rebuild(db)
+
+        async with self._lock:
+            query = {}
+            if isinstance(self.last_id, ObjectId):
+                since = ObjectId.from_datetime(self.last_id.generation_time - REFRESH_OVERLAP)
+                query = {"_id": {"$gt": since}}
+
+            added = 0
+            async for order in db.orders.find(query, {"order_number": 1}).sort("_id", 1):
+                order_number = order.get("order_number")
+                if order_number and order_number not in self.bloom:
+                    self.bloom.add(order_number)
+                    added += 1
+                self.last_id = order["_id"]
+
+            if added and self.bloom.count <= self.capacity:
+                logger.debug("Added %d new order numbers", added)
+                await self._persist(db)
+
+        if self.bloom.count > self.capacity:
+            logger.info("%d orders exceed capacity %d, rebuilding", self.bloom.count, self.capacity)
+            return await self.rebuild(db)
+        self._report()
+
+    def start_refresh(self, db: AsyncIOMotorDatabase, interval_seconds: float):
+        """
+        Periodically pick up orders inserted by other writers (e.g. scripts/load_fixtures.py)
+
+        Args:
+            db: MongoDB database instance
+            interval_seconds: Delay between refreshes
+        """
+        self._refresh_task = asyncio.create_task(self._refresh_loop(db, interval_seconds))
+
+    def stop_refresh(self):
+        """Stop the periodic refresh"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def _refresh_loop(self, db: AsyncIOMotorDatabase, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.refresh(db)
+            except Exception as e:
+                logger.warning("Refresh failed: %s", e)
+
+    async def _persist(self, db: AsyncIOMotorDatabase):
+        """Write the filter to disk (caller holds the lock)"""
+        self._report()
+        if not self.path:
+            return
+        try:
+            last_id = self.last_id if isinstance(self.last_id, ObjectId) else None
+            header = {
+                "last_id": str(last_id) if last_id else None,
+                "source": self._source(db),
+                "orders": await self._orders_through(db, last_id),
+            }
+            await asyncio.to_thread(self.bloom.save, self.path, header)
+        except Exception as e:
+            logger.warning("Could not persist filter: %s", e)
+
+    def _report(self):
+        metrics.gauge("order_filter_items").set(self.bloom.count)
+        metrics.gauge("order_filter_memory_bytes").set(self.bloom.memory_bytes)
+        metrics.gauge("order_filter_estimated_false_positive_rate").set(self.bloom.estimated_false_positive_rate())
+
+
+# Global order number filter
+order_filter = OrderNumberFilter(
+    settings.order_filter_capacity,
+    settings.order_filter_error_rate,
+    Path(settings.order_filter_path) if settings.order_filter_path else None
+)
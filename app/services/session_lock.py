@@ -0,0 +1,180 @@
+"""
+Session Locks
+Serializes turns on the same conversation thread: an in-process asyncio lock
+per session, plus an optional MongoDB lease for multi-worker deployments
+"""
+import logging
+import asyncio
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional
+from pymongo.errors import DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.core.config import settings
+from app.core.database import db
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# Lease documents (TTL index declared in app/core/indexes.py)
+SESSION_LEASE_COLLECTION = "session_leases"
+
+
+def coalesce_messages(messages: List[str]) -> str:
+    """
+    Merge user messages queued behind a running turn into one turn
+
+    Workers read the latest user message, so queued messages are joined into
+    a single one; exact repeats (double-submits) are dropped.
+
+    Args:
+        messages: Queued messages, oldest first
+
+    Returns:
+        Combined message text
+    """
+    merged: List[str] = []
+    for message in messages:
+        if message not in merged:
+            merged.append(message)
+    return "\n".join(merged)
+
+
+class SessionLocks:
+    """
+    Per-session mutual exclusion
+
+    The local lock always applies, so within one process only a single
+    coroutine per session ever contends for the MongoDB lease. The lease is
+    renewed while held and expires on its own if the holder dies.
+    """
+
+    def __init__(self, backend: str, lease_seconds: float, timeout_seconds: float):
+        """
+        Initialize the lock table
+
+        Args:
+            backend: "local" (single worker) or "mongo" (lease shared by all workers)
+            lease_seconds: Lease duration (renewed every third of it while held)
+            timeout_seconds: Maximum wait before giving up with TimeoutError
+        """
+        self.backend = backend
+        self.lease_seconds = lease_seconds
+        self.timeout_seconds = timeout_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._waiters: Dict[str, int] = {}
+
+    @staticmethod
+    def _lease_collection() -> Optional[AsyncIOMotorCollection]:
+        if db.db is None:
+            return None
+        return db.db[SESSION_LEASE_COLLECTION]
+
+    async def _try_lease(self, collection: AsyncIOMotorCollection, session_id: str) -> bool:
+        now = datetime.utcnow()
+        try:
+            # Matches only a free (expired) or own lease; otherwise the upsert's insert
+            # collides with the holder's _id
+            await collection.update_one(
+                {"_id": session_id, "$or": [{"expires_at": {"$lte": now}}, {"owner": self.owner}]},
+                {"$set": {"owner": self.owner, "expires_at": now + timedelta(seconds=self.lease_seconds)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def _acquire_lease(self, collection: AsyncIOMotorCollection, session_id: str, deadline: float) -> bool:
+        """Poll for the lease with backoff; returns True if it had to wait"""
+        delay = 0.02
+        waited = False
+        while not await self._try_lease(collection, session_id):
+            waited = True
+            if time.monotonic() + delay > deadline:
+                raise TimeoutError(f"Session {session_id} is busy")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+        return waited
+
+    async def _renew_lease(self, collection: AsyncIOMotorCollection, session_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await collection.update_one(
+                    {"_id": session_id, "owner": self.owner},
+                    {"$set": {"expires_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}}
+                )
+            except Exception as e:
+                logger.warning("Lease renewal failed for %s: %s", session_id, e)
+
+    @asynccontextmanager
+    async def hold(self, session_id: str) -> AsyncIterator[None]:
+        """
+        Hold the session for the duration of a turn
+
+        Args:
+            session_id: Session (thread) ID
+
+        Raises:
+            TimeoutError: If the session stays busy for timeout_seconds
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout_seconds
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._waiters[session_id] = self._waiters.get(session_id, 0) + 1
+        contended = lock.locked()
+
+        try:
+            try:
+                await asyncio.wait_for(lock.acquire(), self.timeout_seconds)
+            except asyncio.TimeoutError:
+                metrics.counter("session_lock_timeouts_total", backend=self.backend).inc()
+                raise TimeoutError(f"Session {session_id} is busy")
+
+            try:
+                collection = self._lease_collection() if self.backend == "mongo" else None
+                renewal = None
+                if collection is not None:
+                    try:
+                        contended = await self._acquire_lease(collection, session_id, deadline) or contended
+                    except TimeoutError:
+                        metrics.counter("session_lock_timeouts_total", backend=self.backend).inc()
+                        raise
+                    renewal = asyncio.create_task(self._renew_lease(collection, session_id))
+
+                metrics.histogram("session_lock_wait_seconds", backend=self.backend).observe(time.monotonic() - started)
+                if contended:
+                    metrics.counter("session_lock_contended_total", backend=self.backend).inc()
+
+                try:
+                    yield
+                finally:
+                    if renewal is not None:
+                        renewal.cancel()
+                        try:
+                            await collection.delete_one({"_id": session_id, "owner": self.owner})
+                        except Exception as e:
+                            # The lease expires on its own
+                            logger.warning("Lease release failed for %s: %s", session_id, e)
+            finally:
+                lock.release()
+        finally:
+            self._waiters[session_id] -= 1
+            if not self._waiters[session_id]:
+                # Last user of this session - don't keep a lock per session forever
+                del self._waiters[session_id]
+                del self._locks[session_id]
+
+
+session_locks = SessionLocks(
+    settings.session_lock_backend,
+    settings.session_lease_seconds,
+    settings.session_lock_timeout_seconds
+)
@@ -0,0 +1,113 @@
+"""
+Session Metadata
+Append-only conversation_sessions records (who started which session, when),
+buffered in memory and written in bulk off the request path
+"""
+import logging
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pymongo.errors import BulkWriteError
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+SESSION_COLLECTION = "conversation_sessions"
+
+
+class SessionMetadataWriter:
+    """
+    Buffers session records and flushes them with one insert_many
+
+    Conversation state lives in the checkpointer; these records are purely
+    informational, so a record lost in a crash only loses bookkeeping.
+    """
+
+    def __init__(self, batch_size: int = 100, flush_interval_seconds: float = 5.0):
+        """
+        Initialize the writer
+
+        Args:
+            batch_size: Buffered records that trigger an early flush
+            flush_interval_seconds: Maximum time a record stays buffered
+        """
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.collection = None
+        self._buffer: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, session_id: str, user_id: Optional[str] = None):
+        """
+        Queue the record for a newly issued session (no I/O)
+
+        Args:
+            session_id: Signed session ID
+            user_id: Optional user ID
+        """
+        if self._task is None:
+            return
+        self._buffer.append({
+            "session_id": session_id,
+            "user_id": user_id,
+            "created_at": datetime.utcnow(),
+        })
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Write all buffered records"""
+        if not self._buffer or self.collection is None:
+            return
+        batch, self._buffer = self._buffer, []
+        try:
+            # Unordered: one bad record (e.g. duplicate session_id) doesn't drop the rest
+            await self.collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            logger.warning("%d of %d records rejected", len(e.details.get("writeErrors", [])), len(batch))
+        except Exception as e:
+            logger.warning("Flush of %d records failed: %s", len(batch), e)
+            return
+        metrics.counter("session_metadata_flushes_total").inc()
+        metrics.counter("session_metadata_records_total").inc(len(batch))
+
+    def start(self, db: AsyncIOMotorDatabase):
+        """
+        Start the flush loop
+
+        Args:
+            db: MongoDB database instance
+        """
+        self.collection = db[SESSION_COLLECTION]
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write what is still buffered"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+session_metadata = SessionMetadataWriter(
+    settings.session_metadata_batch_size,
+    settings.session_metadata_flush_seconds
+)
@@ -0,0 +1,96 @@
+"""
+Ticket Service
+Idempotent return/refund ticket creation in a single round trip
+"""
+import hashlib
+from datetime import datetime
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.metrics import metrics
+from app.services.order_cache import order_cache
+
+
+class TicketResult(BaseModel):
+    """Outcome of a create-or-get"""
+    ticket_id: str
+    idempotency_key: str
+    duplicate: bool
+
+
+def idempotency_key_for(order_id: str, action: str) -> str:
+    """
+    Build the idempotency key for an order action
+
+    Args:
+        order_id: Order number
+        action: "return" or "refund"
+
+    Returns:
+        SHA-256 hex digest
+    """
+    return hashlib.sha256(f"{order_id}|{action}".encode()).hexdigest()
+
+
+class TicketService:
+    """
+    Creates action tickets atomically
+
+    Relies on the unique action_tickets.idempotency_key index (app/core/indexes.py):
+    an upsert with $setOnInsert either inserts the ticket or returns the
+    existing one, so concurrent duplicate requests can never create two.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+
+    async def create_or_get(self, order_id: str, action: str, ticket_id: str, **fields) -> TicketResult:
+        """
+        Create a ticket, or return the existing one for the same order and action
+
+        Args:
+            order_id: Order number
+            action: "return" or "refund"
+            ticket_id: Ticket ID to use if a new ticket is created
+            **fields: Additional ticket fields (customer_email, refund_amount, ...)
+
+        Returns:
+            TicketResult with duplicate=True if the ticket already existed
+        """
+        idempotency_key = idempotency_key_for(order_id, action)
+        # idempotency_key comes from the upsert filter
+        ticket_doc = {
+            "ticket_id": ticket_id,
+            "order_id": order_id,
+            "action": action,
+            "status": "created",
+            "created_at": datetime.utcnow(),
+            **fields
+        }
+
+        try:
+            # BEFORE + upsert: None means this call inserted the ticket
+            existing = await self.db.action_tickets.find_one_and_update(
+                {"idempotency_key": idempotency_key},
+                {"$setOnInsert": ticket_doc},
+                upsert=True,
+                projection={"ticket_id": 1},
+                return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            # Two upserts raced on the unique index; the other one won
+            existing = await self.db.action_tickets.find_one(
+                {"idempotency_key": idempotency_key},
+                {"ticket_id": 1}
+            )
+
+        if existing:
+            metrics.counter("tickets_total", action=action, result="duplicate").inc()
+            return TicketResult(ticket_id=existing["ticket_id"], idempotency_key=idempotency_key, duplicate=True)
+
+        # The order now has an open ticket - don't serve it from the cache
+        order_cache.invalidate(order_id)
+        metrics.counter("tickets_total", action=action, result="created").inc()
+        return TicketResult(ticket_id=ticket_id, idempotency_key=idempotency_key, duplicate=False)
@@ -0,0 +1,164 @@
+"""
+Intent micro-batching load test
+Runs concurrent first turns through the real ChatOpenAI client against a
+local fake OpenAI-compatible server, with and without micro-batching, and
+reports throughput, requests and tokens (cost) per turn
+
+The fake server answers after --base-latency-ms plus --item-latency-ms per
+classified message, and bills roughly one token per 4 characters. The
+intent fast path and the LLM cache are turned off so every turn reaches the
+model.
+
+    python scripts/bench_batching.py --in-memory
+"""
+import argparse
+import asyncio
+import json
+import re
+import socket
+import threading
+import time
+from typing import Any, Dict, List
+
+import uvicorn
+from bench_support import (
+    _guess_intent, add_common_arguments, close_database, install_agent, open_database, quiet_logging, summarize
+)
+from fastapi import FastAPI, Request
+from langchain_openai import ChatOpenAI
+
+from app.agent.workers import classify_intent
+from app.core.config import settings
+
+
+class FakeOpenAI:
+    """Minimal /v1/chat/completions with configurable latency and token accounting"""
+
+    def __init__(self, base_latency: float, item_latency: float):
+        self.base_latency = base_latency
+        self.item_latency = item_latency
+        self.reset()
+        self.app = FastAPI()
+        self.app.post("/v1/chat/completions")(self.completions)
+
+    def reset(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    async def completions(self, request: Request) -> Dict[str, Any]:
+        body = await request.json()
+        system, user = body["messages"][0]["content"], body["messages"][-1]["content"]
+
+        if body.get("response_format"):
+            # Batched classification: one numbered JSON string per line
+            items = [json.loads(line.split(". ", 1)[1]) for line in user.splitlines() if line.strip()]
+            content = json.dumps({"intents": [_guess_intent(item) for item in items]})
+        elif "intent classifier" in system:
+            items = [user]
+            content = _guess_intent(user)
+        else:
+            items = [user]
+            match = re.search(r"ORD-\d{4}-\d{3}", user.split("Message:")[-1], re.IGNORECASE)
+            content = match.group(0).upper() if match else "NONE"
+        await asyncio.sleep(self.base_latency + self.item_latency * len(items))
+
+        prompt_tokens = sum(len(message["content"]) for message in body["messages"]) // 4 + 1
+        completion_tokens = len(content) // 4 + 1
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        return {
+            "id": f"chatcmpl-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def serve(self) -> str:
+        """Start the server on a free local port in a background thread; returns its base URL"""
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.01)
+        return f"http://127.0.0.1:{port}/v1"
+
+
+# First messages; intent must come from the model (numbered so no two hit the same cache entry)
+OPENERS = ("I'd like to send back order {i}", "Can I get my money back for purchase {i}?", "Where's package {i}?", "Question {i} about my purchase")
+
+
+async def run_turns(service, sessions: int) -> List[float]:
+    durations: List[float] = []
+
+    async def first_turn(i: int):
+        started = time.perf_counter()
+        result = await service.process_message(service.create_session(), OPENERS[i % len(OPENERS)].format(i=i))
+        durations.append(time.perf_counter() - started)
+        if not result["success"]:
+            raise RuntimeError(result)
+
+    await asyncio.gather(*(first_turn(i) for i in range(sessions)))
+    return durations
+
+
+async def bench(args, fake: FakeOpenAI, base_url: str) -> List[Dict[str, Any]]:
+    rows = []
+    llm = ChatOpenAI(model=settings.openai_model, temperature=0.0, api_key="bench", base_url=base_url, max_retries=0)
+    for batch_size in args.batch_sizes:
+        settings.intent_batch_max_size = batch_size
+        classify_intent._batchers.clear()
+        client, db = await open_database(args.in_memory)
+        service = await install_agent(client, db, llm)
+        fake.reset()
+
+        started = time.perf_counter()
+        durations = await run_turns(service, args.sessions)
+        elapsed = time.perf_counter() - started
+        await close_database(client, db)
+
+        cost = (fake.prompt_tokens * args.input_price + fake.completion_tokens * args.output_price) / 1e6
+        rows.append({
+            "batch": batch_size,
+            "turns/s": args.sessions / elapsed,
+            "requests/turn": fake.requests / args.sessions,
+            "tokens/turn": (fake.prompt_tokens + fake.completion_tokens) / args.sessions,
+            "usd/1k turns": cost / args.sessions * 1000,
+            **summarize(durations),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_arguments(parser)
+    parser.add_argument("--sessions", type=int, default=500, help="concurrent first turns")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--base-latency-ms", type=float, default=300.0)
+    parser.add_argument("--item-latency-ms", type=float, default=5.0)
+    parser.add_argument("--input-price", type=float, default=0.15, help="USD per 1M prompt tokens")
+    parser.add_argument("--output-price", type=float, default=0.60, help="USD per 1M completion tokens")
+    args = parser.parse_args()
+    quiet_logging()
+
+    settings.intent_fast_path_enabled = False
+    settings.llm_cache_enabled = False
+    fake = FakeOpenAI(args.base_latency_ms / 1000, args.item_latency_ms / 1000)
+    base_url = fake.serve()
+
+    print(f"{args.sessions} concurrent first turns, model latency {args.base_latency_ms:.0f}ms + {args.item_latency_ms:.0f}ms/item")
+    print(f"{'batch':>5} {'turns/s':>8} {'req/turn':>9} {'tok/turn':>9} {'$/1k turns':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    for row in asyncio.run(bench(args, fake, base_url)):
+        print(
+            f"{row['batch']:>5} {row['turns/s']:>8.0f} {row['requests/turn']:>9.2f} {row['tokens/turn']:>9.0f} "
+            f"{row['usd/1k turns']:>11.4f} {row['p50']:>8.0f} {row['p99']:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Checkpointer concurrency benchmark
+Per-turn latency percentiles with N sessions talking at once, comparing the
+async Motor checkpointer with the sync MongoDBSaver (whose async methods run
+each checkpoint read/write in the default thread pool)
+
+Against MONGODB_URL the two real savers are compared. With --in-memory both
+store checkpoints in LangGraph's InMemorySaver (mongomock has no indexes, so
+its scans would dominate) and each round trip is simulated with
+--mongo-latency-ms: a blocking sleep in the thread pool for "sync", an
+awaited sleep for "async".
+
+    python scripts/bench_checkpointer.py --in-memory --mongo-latency-ms 2
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from bench_support import (
+    CONVERSATION, ScriptedLLM, add_common_arguments, close_database, install_agent,
+    open_database, quiet_logging, summarize
+)
+
+from langchain_core.runnables.config import run_in_executor
+from langgraph.checkpoint.memory import InMemorySaver
+
+from app.core.checkpointer import AsyncMongoDBSaver
+from app.core.config import settings
+
+
+class _ThreadPoolSaver(InMemorySaver):
+    """In-memory stand-in for MongoDBSaver: blocking round trips in the default thread pool"""
+
+    def __init__(self, latency_seconds: float):
+        super().__init__()
+        self.latency_seconds = latency_seconds
+
+    def _blocking(self, method, *args):
+        time.sleep(self.latency_seconds)
+        return method(*args)
+
+    async def aget_tuple(self, config):
+        return await run_in_executor(None, self._blocking, self.get_tuple, config)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await run_in_executor(None, self._blocking, self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await run_in_executor(None, self._blocking, self.put_writes, config, writes, task_id, task_path)
+
+
+class _CoroutineSaver(InMemorySaver):
+    """In-memory stand-in for AsyncMongoDBSaver: awaited round trips"""
+
+    def __init__(self, latency_seconds: float):
+        super().__init__()
+        self.latency_seconds = latency_seconds
+
+    async def aget_tuple(self, config):
+        await asyncio.sleep(self.latency_seconds)
+        return await super().aget_tuple(config)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        await asyncio.sleep(self.latency_seconds)
+        return await super().aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        await asyncio.sleep(self.latency_seconds)
+        return await super().aput_writes(config, writes, task_id, task_path)
+
+
+async def _saver(name: str, args, client: Any, db: Any):
+    latency = args.mongo_latency_ms / 1000
+    if args.in_memory:
+        return _ThreadPoolSaver(latency) if name == "sync" else _CoroutineSaver(latency)
+    if name == "sync":
+        from langgraph.checkpoint.mongodb import MongoDBSaver
+        from pymongo import MongoClient
+        return MongoDBSaver(MongoClient(settings.mongodb_url), db.name)
+    saver = AsyncMongoDBSaver(client, db.name)
+    await saver.setup()
+    return saver
+
+
+async def run_sessions(service, concurrency: int) -> List[float]:
+    """
+    Run `concurrency` conversations at once
+
+    Args:
+        service: AgentService
+        concurrency: Concurrent sessions
+
+    Returns:
+        Duration of every turn, in seconds
+    """
+    durations: List[float] = []
+
+    async def converse():
+        session_id = service.create_session()
+        for message in CONVERSATION:
+            started = time.perf_counter()
+            result = await service.process_message(session_id, message)
+            durations.append(time.perf_counter() - started)
+            if not result["success"]:
+                raise RuntimeError(result)
+
+    await asyncio.gather(*(converse() for _ in range(concurrency)))
+    return durations
+
+
+async def bench(args) -> List[Dict[str, Any]]:
+    rows = []
+    for saver_name in args.savers:
+        for concurrency in args.concurrency:
+            client, db = await open_database(args.in_memory)
+            saver = await _saver(saver_name, args, client, db)
+            service = await install_agent(client, db, ScriptedLLM(args.llm_latency_ms / 1000), checkpointer=saver)
+            started = time.perf_counter()
+            durations = await run_sessions(service, concurrency)
+            elapsed = time.perf_counter() - started
+            await close_database(client, db)
+
+            rows.append({"saver": saver_name, "sessions": concurrency, "turns/s": len(durations) / elapsed, **summarize(durations)})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_arguments(parser)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--savers", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    parser.add_argument("--mongo-latency-ms", type=float, default=2.0, help="simulated checkpoint round trip (--in-memory only)")
+    parser.add_argument("--durability", choices=["exit", "async", "sync"], default=settings.checkpoint_durability)
+    args = parser.parse_args()
+    settings.checkpoint_durability = args.durability
+    quiet_logging()
+
+    print(f"durability={settings.checkpoint_durability} mongo latency={args.mongo_latency_ms}ms llm latency={args.llm_latency_ms}ms")
+    print(f"{'saver':<6} {'sessions':>8} {'turns/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for row in asyncio.run(bench(args)):
+        print(f"{row['saver']:<6} {row['sessions']:>8} {row['turns/s']:>8.0f} {row['p50']:>8.1f} {row['p99']:>8.1f} {row['max']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Conversation history benchmark
+Builds a conversation of --messages messages and measures response size and
+latency of GET /api/session/{id}/history (newest page, full window as JSON
+and as NDJSON), with the default compaction window and with compaction off
+
+    python scripts/bench_history.py --in-memory --messages 1000
+"""
+import argparse
+import asyncio
+import socket
+import time
+from typing import Any, Dict, List
+
+import httpx
+import uvicorn
+from bench_support import (
+    ScriptedLLM, add_common_arguments, close_database, install_agent, open_database, quiet_logging, summarize
+)
+
+import app.core.database as database
+from app.core.config import settings
+from app.main import app
+
+TURNS = ("where is my order", "ORD-2024-001", "thanks")
+
+REQUESTS = (
+    ("newest 50 (json)", {"limit": 50}),
+    ("up to 1000 (json)", {"limit": 1000}),
+    ("up to 1000 (ndjson)", {"limit": 1000, "format": "ndjson"}),
+)
+
+
+async def _serve():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    # No lifespan: the benchmark has already wired the database and graph
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, serving, f"http://127.0.0.1:{port}"
+
+
+async def bench(args, window: int) -> List[Dict[str, Any]]:
+    settings.message_history_window = window
+    client, db = await open_database(args.in_memory)
+    service = await install_agent(client, db, ScriptedLLM(args.llm_latency_ms / 1000))
+    session_id = service.create_session()
+
+    sent = 0
+    while await _conversation_length(session_id) < args.messages:
+        await service.process_message(session_id, TURNS[sent % len(TURNS)])
+        sent += 1
+
+    server, serving, base_url = await _serve()
+    rows = []
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as http:
+            for name, params in REQUESTS:
+                durations, size, returned = [], 0, 0
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    response = await http.get(f"/api/session/{session_id}/history", params=params)
+                    durations.append(time.perf_counter() - started)
+                    size = len(response.content)
+                    returned = len(response.text.splitlines()) if "ndjson" in response.headers["content-type"] else len(response.json()["messages"])
+                rows.append({"window": window or "off", "request": name, "messages": returned, "bytes": size, **summarize(durations)})
+    finally:
+        server.should_exit = True
+        await serving
+        await close_database(client, db)
+    return rows
+
+
+async def _conversation_length(session_id: str) -> int:
+    """Messages in the checkpoint plus those compacted out of it"""
+    values = await database.db.checkpointer.aget_channel_values(session_id) or {}
+    return len(values.get("messages", [])) + (values.get("history_summary") or {}).get("compacted_messages", 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_arguments(parser)
+    parser.add_argument("--messages", type=int, default=1000, help="conversation length (including compacted messages)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    quiet_logging()
+
+    print(f"{args.messages}-message conversation, {args.repeat} requests each")
+    print(f"{'window':>6} {'request':<20} {'messages':>8} {'bytes':>8} {'p50 ms':>7} {'p99 ms':>7}")
+    for window in (settings.message_history_window, 0):
+        for row in asyncio.run(bench(args, window)):
+            print(f"{row['window']:>6} {row['request']:<20} {row['messages']:>8} {row['bytes']:>8} {row['p50']:>7.1f} {row['p99']:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
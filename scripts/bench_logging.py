@@ -0,0 +1,146 @@
+"""
+Logging overhead benchmark
+Runs the same conversations under each logging setup and reports records
+and turn time per turn, and the overhead against logging off:
+
+- off: the app logger at WARNING (nothing per turn is emitted)
+- INFO / DEBUG queued: configure_logging, as the app runs it; records are
+  rendered in the turn and formatted and written by the listener thread
+- DEBUG sync: a plain StreamHandler, formatting and writing on the event
+  loop, as the old print() traces did
+
+Setups take turns, one conversation each. Records go to --output (the null
+device by default, so this is the cost of logging itself, not of a slow
+terminal). --write-latency-ms blocks each write, like a full pipe or a slow
+log collector.
+
+    python scripts/bench_logging.py --in-memory
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List
+
+from bench_support import (
+    CONVERSATION, ScriptedLLM, add_common_arguments, close_database, install_agent, open_database,
+    quiet_logging, summarize
+)
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+import app.core.logging as app_logging
+
+SETUPS = ("off", "INFO queued", "DEBUG queued", "DEBUG sync")
+
+
+class _Counter(logging.Filter):
+    """Counts the records that pass the level check"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        self.records += 1
+        return True
+
+
+class _SlowStream:
+    """File wrapper whose writes block for a fixed time"""
+
+    def __init__(self, stream, latency_seconds: float):
+        self.stream = stream
+        self.latency_seconds = latency_seconds
+
+    def write(self, text: str) -> int:
+        time.sleep(self.latency_seconds)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _apply(setup: str, output, counter: _Counter):
+    app_logging.shutdown_logging()
+    logger = logging.getLogger("app")
+    logger.propagate = False
+    if setup == "off":
+        logger.handlers = []
+        logger.setLevel(logging.WARNING)
+    elif setup.endswith("queued"):
+        app_logging.configure_logging(setup.split()[0])
+        app_logging._listener.handlers[0].setStream(output)
+    else:
+        handler = logging.StreamHandler(output)
+        handler.setFormatter(app_logging.TextFormatter())
+        logger.handlers = [handler]
+        logger.setLevel(logging.DEBUG)
+    for handler in logger.handlers:
+        handler.addFilter(counter)
+
+
+async def bench(args, output) -> Dict[str, Dict[str, float]]:
+    client, db = await open_database(args.in_memory)
+    # mongomock has no indexes, so its checkpoint reads slow down as sessions accumulate
+    service = await install_agent(
+        client, db, ScriptedLLM(args.llm_latency_ms / 1000), InMemorySaver() if args.in_memory else None
+    )
+    counter = _Counter()
+
+    durations: Dict[str, List[float]] = {setup: [] for setup in SETUPS}
+    records = dict.fromkeys(SETUPS, 0)
+    for number in range(args.warmup + args.conversations):
+        # One conversation per setup, in rotating order, so drift affects them equally
+        for setup in SETUPS[number % len(SETUPS):] + SETUPS[:number % len(SETUPS)]:
+            _apply(setup, output, counter)
+            counter.records = 0
+            turns: List[float] = []
+            session_id = service.create_session()
+            for message in CONVERSATION:
+                started = time.perf_counter()
+                await service.process_message(session_id, message)
+                turns.append(time.perf_counter() - started)
+            if number >= args.warmup:
+                durations[setup] += turns
+                records[setup] += counter.records
+
+    app_logging.shutdown_logging()
+    await close_database(client, db)
+    return {
+        setup: {"records/turn": records[setup] / len(durations[setup]), **summarize(durations[setup])}
+        for setup in SETUPS
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_arguments(parser)
+    parser.add_argument("--conversations", type=int, default=300, help="conversations per setup")
+    parser.add_argument("--warmup", type=int, default=10, help="conversations per setup left out of the results")
+    parser.add_argument("--output", default=os.devnull, help="where records are written")
+    parser.add_argument("--write-latency-ms", type=float, default=0.0, help="time each write blocks")
+    args = parser.parse_args()
+    quiet_logging()
+
+    with open(args.output, "w") as output:
+        if args.write_latency_ms:
+            output = _SlowStream(output, args.write_latency_ms / 1000)
+        results = asyncio.run(bench(args, output))
+    baseline = results["off"]["mean"]
+    print(
+        f"{args.conversations} x {len(CONVERSATION)} turns per setup, "
+        f"records to {args.output} ({args.write_latency_ms:.1f}ms per write)"
+    )
+    print(f"{'setup':<13} {'records/turn':>12} {'p50 ms':>7} {'p99 ms':>7} {'mean ms':>8} {'overhead':>9}")
+    for setup, row in results.items():
+        overhead = (row["mean"] - baseline) / baseline * 100
+        print(
+            f"{setup:<13} {row['records/turn']:>12.1f} {row['p50']:>7.2f} {row['p99']:>7.2f} "
+            f"{row['mean']:>8.3f} {overhead:>+8.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Order-number recognizer benchmark
+Hit rate on a corpus of phrasing variants: how often slot filling resolves
+the order number locally instead of calling the LLM, compared with the
+single regex it replaced, plus false positives on messages without one
+
+    python scripts/bench_order_numbers.py
+"""
+import re
+import timeit
+from typing import List, Optional, Tuple
+
+import bench_support  # noqa: F401  (puts the project root on sys.path)
+
+from app.agent.order_numbers import OrderNumberRecognizer
+
+# Pattern slot_filler used before the recognizer (case-sensitive, no ORD-YYYY-NNN)
+LEGACY_PATTERN = re.compile(r'\b([A-Z0-9]{3}[-]?[0-9]{6,}|[0-9]{10,})\b')
+
+# (message, order number the user meant, or None)
+CORPUS: List[Tuple[str, Optional[str]]] = [
+    ("ORD-2024-001", "ORD-2024-001"),
+    ("my order is ORD-2024-001", "ORD-2024-001"),
+    ("ord-2024-001", "ORD-2024-001"),
+    ("Ord 2024 001", "ORD-2024-001"),
+    ("ORD2024001", "ORD-2024-001"),
+    ("ORD 2024-001 please", "ORD-2024-001"),
+    ("ORD–2024–001", "ORD-2024-001"),
+    ("ORD_2024_001", "ORD-2024-001"),
+    ("ORD-2024-1", "ORD-2024-001"),
+    ("ORD-2024-0001", "ORD-2024-001"),
+    ("0RD-2024-002", "ORD-2024-002"),
+    ("ODR-2024-002", "ORD-2024-002"),
+    ("OD-2024-002", "ORD-2024-002"),
+    ("ORDD-2024-002", "ORD-2024-002"),
+    ("it's 2024-003", "ORD-2024-003"),
+    ("order number 2024-003", "ORD-2024-003"),
+    ("number is ord-2024-004, thanks", "ORD-2024-004"),
+    ("Hi, I need help with ORD-2024-005.", "ORD-2024-005"),
+    ("(ORD-2024-005)", "ORD-2024-005"),
+    ("#ORD-2024-005", "ORD-2024-005"),
+    ("ORD-2024-005?", "ORD-2024-005"),
+    ("can you check ORD - 2024 - 006", "ORD-2024-006"),
+    ("order ABC-123456", "ABC-123456"),
+    ("my order ABC123456 hasn't arrived", "ABC123456"),
+    ("order #1234567890", "1234567890"),
+    ("reference 9876543210", "9876543210"),
+    ("I want to return my order", None),
+    ("where is my refund?", None),
+    ("call me at 5551234567", None),
+    ("my phone is 555-1234567", None),
+    ("we ordered for the 2024-2025 season", None),
+    ("it arrived on 2024-10-15", None),
+    ("I paid $1999 for it", None),
+    ("yes", None),
+    ("ORD-2099-001", None),
+]
+
+
+def _legacy(message: str) -> Optional[str]:
+    match = LEGACY_PATTERN.search(message)
+    return match.group(1) if match else None
+
+
+def main():
+    recognizer = OrderNumberRecognizer(["ORD"])
+
+    def recognize(message: str) -> Optional[str]:
+        match = recognizer.recognize(message)
+        return match.order_number if match else None
+
+    positives = [(message, expected) for message, expected in CORPUS if expected]
+    negatives = [message for message, expected in CORPUS if not expected]
+
+    print(f"{'matcher':<11} {'hit rate':>9} {'wrong':>6} {'false pos':>10} {'us/message':>11}")
+    for name, matcher in (("old regex", _legacy), ("recognizer", recognize)):
+        hits = sum(matcher(message) == expected for message, expected in positives)
+        wrong = sum(matcher(message) not in (None, expected) for message, expected in positives)
+        false_positives = sum(matcher(message) is not None for message in negatives)
+        seconds = min(timeit.repeat(lambda: [matcher(message) for message, _ in CORPUS], number=200, repeat=5))
+        print(
+            f"{name:<11} {hits:>4}/{len(positives):<4} {wrong:>6} {false_positives:>5}/{len(negatives):<4} "
+            f"{seconds / 200 / len(CORPUS) * 1e6:>11.1f}"
+        )
+
+    misses = [message for message, expected in positives if recognize(message) != expected]
+    if misses:
+        print("\nFalls through to the LLM:", *misses, sep="\n  ")
+
+
+if __name__ == "__main__":
+    main()
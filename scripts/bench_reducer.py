@@ -0,0 +1,67 @@
+"""
+Message reducer micro-benchmark
+Cost of one worker update through add_messages as the conversation grows:
+returning the full history plus the reply (the old worker contract) versus
+returning only the reply (app/agent/replies.py)
+
+    python scripts/bench_reducer.py
+"""
+import argparse
+import timeit
+from typing import List
+
+import bench_support  # noqa: F401  (puts the project root on sys.path)
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.graph.message import add_messages
+
+from app.agent.replies import reply
+
+
+def _history(length: int) -> List[BaseMessage]:
+    messages = [
+        HumanMessage(content=f"user message {i}") if i % 2 == 0 else AIMessage(content=f"assistant message {i}")
+        for i in range(length)
+    ]
+    # Checkpointed messages already carry IDs
+    return add_messages([], messages)
+
+
+def per_update_microseconds(length: int, delta: bool, number: int) -> float:
+    """
+    Time one node's message update against a history of `length` messages
+
+    Args:
+        length: Messages already in state
+        delta: Use the reply() contract instead of returning messages + [new]
+        number: Repetitions
+
+    Returns:
+        Microseconds per update
+    """
+    history = _history(length)
+
+    def update():
+        if delta:
+            add_messages(history, reply("Let me look that up.")["messages"])
+        else:
+            add_messages(history, history + [AIMessage(content="Let me look that up.")])
+
+    return min(timeit.repeat(update, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 500, 1000])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'history':>8} {'full list us':>13} {'delta us':>9}")
+    for length in args.lengths:
+        full = per_update_microseconds(length, False, args.number)
+        delta = per_update_microseconds(length, True, args.number)
+        print(f"{length:>8} {full:>13.1f} {delta:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Session creation benchmark
+Runs --sessions first turns (create the session, send one message),
+--concurrency at a time, two ways and reports first-turn latency, write
+round trips to conversation_sessions and bytes stored per session in each
+collection:
+
+- eager: the old create_session, one insert_one of a full initial-state
+  document before the turn
+- lazy: the current signed ID plus a buffered metadata record, written by
+  SessionMetadataWriter with one insert_many per batch
+
+--write-latency-ms adds a simulated network round trip to each
+conversation_sessions write (the in-memory database has none).
+
+    python scripts/bench_sessions.py --in-memory --sessions 500
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import bson
+from bench_support import (
+    ScriptedLLM, add_common_arguments, close_database, install_agent, open_database, quiet_logging, summarize
+)
+
+from app.services.session_metadata import SESSION_COLLECTION, session_metadata
+
+COLLECTIONS = (SESSION_COLLECTION, "checkpoints", "checkpoint_writes")
+
+
+class CountingCollection:
+    """Counts write round trips (and delays each by the simulated latency)"""
+
+    def __init__(self, collection: Any, latency: float):
+        self.collection = collection
+        self.latency = latency
+        self.round_trips = 0
+
+    async def insert_one(self, document, **kwargs):
+        self.round_trips += 1
+        await asyncio.sleep(self.latency)
+        return await self.collection.insert_one(document, **kwargs)
+
+    async def insert_many(self, documents, **kwargs):
+        self.round_trips += 1
+        await asyncio.sleep(self.latency)
+        return await self.collection.insert_many(documents, **kwargs)
+
+
+def _initial_session_doc(session_id: str) -> Dict[str, Any]:
+    """The document the old create_session inserted"""
+    now = datetime.now(timezone.utc)
+    return {
+        "session_id": session_id,
+        "user_id": None,
+        "created_at": now,
+        "updated_at": now,
+        "state": {
+            "messages": [],
+            "intent": None,
+            "order_number": None,
+            "order_match_confidence": None,
+            "order": None,
+            "user_confirmed_order": None,
+            "eligibility": {},
+            "desired_action": None,
+            "action_ticket": {},
+            "email_status": None,
+            "error": None,
+            "meta": {"session_id": session_id, "idempotency_key": None, "locale": "en"},
+        },
+    }
+
+
+async def _stored_bytes(db: Any) -> Dict[str, int]:
+    totals = {}
+    for name in COLLECTIONS:
+        totals[name] = sum([len(bson.encode(doc)) async for doc in db[name].find({})])
+    return totals
+
+
+async def bench(args, mode: str) -> Dict[str, Any]:
+    client, db = await open_database(args.in_memory)
+    service = await install_agent(client, db, ScriptedLLM(args.llm_latency_ms / 1000))
+    sessions = CountingCollection(db[SESSION_COLLECTION], args.write_latency_ms / 1000)
+    if mode == "lazy":
+        session_metadata.start(db)
+        session_metadata.collection = sessions
+
+    durations: List[float] = []
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def first_turn():
+        async with slots:
+            started = time.perf_counter()
+            if mode == "eager":
+                session_id = str(uuid.uuid4())
+                await sessions.insert_one(_initial_session_doc(session_id))
+            else:
+                session_id = service.create_session()
+            result = await service.process_message(session_id, "Where is my order ORD-2024-001?")
+            durations.append(time.perf_counter() - started)
+        if not result["success"]:
+            raise RuntimeError(result)
+
+    await asyncio.gather(*(first_turn() for _ in range(args.sessions)))
+    if mode == "lazy":
+        await session_metadata.stop()
+
+    stored = await _stored_bytes(db)
+    await close_database(client, db)
+    return {"mode": mode, "round trips": sessions.round_trips, **stored, **summarize(durations)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_arguments(parser)
+    parser.add_argument("--sessions", type=int, default=500, help="first turns (one per new session)")
+    parser.add_argument("--concurrency", type=int, default=20, help="first turns in flight at once")
+    parser.add_argument("--write-latency-ms", type=float, default=0.0, help="simulated round trip per conversation_sessions write")
+    args = parser.parse_args()
+    quiet_logging()
+
+    print(f"{args.sessions} first turns, {args.concurrency} at a time, session write latency {args.write_latency_ms:.1f}ms")
+    print(
+        f"{'mode':<6} {'p50 ms':>7} {'p99 ms':>7} {'session writes':>15} "
+        + " ".join(f"{name + ' B/session':>29}" for name in COLLECTIONS)
+    )
+    for mode in ("eager", "lazy"):
+        row = asyncio.run(bench(args, mode))
+        print(
+            f"{row['mode']:<6} {row['p50']:>7.1f} {row['p99']:>7.1f} {row['round trips']:>15} "
+            + " ".join(f"{row[name] / args.sessions:>29.0f}" for name in COLLECTIONS)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Chat time-to-first-byte benchmark
+Serves the app with uvicorn and measures, per turn, the time to the first
+response byte, to the first assistant message and to the end of the
+response for POST /api/chat and POST /api/chat/stream (SSE)
+
+    python scripts/bench_streaming.py --in-memory --llm-latency-ms 300
+"""
+import argparse
+import asyncio
+import json
+import socket
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import uvicorn
+from bench_support import (
+    CONVERSATION, ScriptedLLM, add_common_arguments, close_database, install_agent, open_database,
+    quiet_logging, summarize
+)
+
+from app.core.config import settings
+from app.main import app
+
+
+async def _chat_turn(client: httpx.AsyncClient, session_id: Optional[str], message: str) -> Tuple[str, float, float, float]:
+    started = time.perf_counter()
+    async with client.stream("POST", "/api/chat", json={"message": message, "session_id": session_id}) as response:
+        first_byte = None
+        body = b""
+        async for chunk in response.aiter_bytes():
+            first_byte = first_byte or time.perf_counter()
+            body += chunk
+    done = time.perf_counter()
+    # The whole reply arrives in one body, so its first message comes with the first byte
+    return json.loads(body)["session_id"], first_byte - started, first_byte - started, done - started
+
+
+async def _stream_turn(client: httpx.AsyncClient, session_id: Optional[str], message: str) -> Tuple[str, float, float, float]:
+    started = time.perf_counter()
+    first_byte = first_message = None
+    event = None
+    async with client.stream("POST", "/api/chat/stream", json={"message": message, "session_id": session_id}) as response:
+        async for line in response.aiter_lines():
+            first_byte = first_byte or time.perf_counter()
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+                if event == "session":
+                    session_id = data["session_id"]
+                elif event == "message" and first_message is None:
+                    first_message = time.perf_counter()
+    done = time.perf_counter()
+    return session_id, first_byte - started, first_message - started, done - started
+
+
+async def measure(base_url: str, conversations: int) -> Dict[Tuple[str, str], Dict[str, List[float]]]:
+    """
+    Run the conversations through both endpoints, one turn at a time
+
+    Returns:
+        (endpoint, message) -> {"first byte", "first message", "complete"} -> seconds
+    """
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        for endpoint, turn in (("/api/chat", _chat_turn), ("/api/chat/stream", _stream_turn)):
+            for message in CONVERSATION:
+                results[endpoint, message] = {"first byte": [], "first message": [], "complete": []}
+            for _ in range(conversations):
+                session_id = None
+                for message in CONVERSATION:
+                    session_id, *measured = await turn(client, session_id, message)
+                    for key, seconds in zip(("first byte", "first message", "complete"), measured):
+                        results[endpoint, message][key].append(seconds)
+    return results
+
+
+async def bench(args) -> Dict[str, Any]:
+    client, db = await open_database(args.in_memory)
+    await install_agent(client, db, ScriptedLLM(args.llm_latency_ms / 1000))
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    # No lifespan: the benchmark has already wired the database and graph
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    try:
+        return await measure(f"http://127.0.0.1:{port}", args.conversations)
+    finally:
+        server.should_exit = True
+        await serving
+        await close_database(client, db)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_arguments(parser)
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--no-fast-path", action="store_true", help="send every classification to the (scripted) LLM")
+    args = parser.parse_args()
+    quiet_logging()
+    if args.no_fast_path:
+        settings.intent_fast_path_enabled = False
+        settings.llm_cache_enabled = False
+
+    results = asyncio.run(bench(args))
+    print(
+        f"{args.conversations} x {len(CONVERSATION)} turns, llm latency {args.llm_latency_ms:.0f}ms, "
+        f"fast path {'off' if args.no_fast_path else 'on'} (p50 / p99 ms)"
+    )
+    print(f"{'endpoint':<17} {'turn':<26} {'first byte':>15} {'first message':>15} {'complete':>15}")
+    for (endpoint, message), timings in results.items():
+        cells = [summarize(timings[key]) for key in ("first byte", "first message", "complete")]
+        print(f"{endpoint:<17} {message:<26} " + " ".join(f"{cell['p50']:>7.1f}/{cell['p99']:<7.1f}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Benchmark support
+Shared setup for the scripts/bench_*.py benchmarks: a database (a real
+MongoDB at MONGODB_URL, or in memory with --in-memory), a scripted chat
+model with a fixed latency instead of OpenAI, and an AgentService wired to
+both
+"""
+import argparse
+import asyncio
+import copy
+import logging
+import re
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import AIMessage
+
+import app.core.database as database
+import app.services.agent_service as agent_service
+from app.agent.graph import create_agent_graph
+from app.agent.workers.classify_intent import intent_cache
+from app.agent.workers.slot_filler import extraction_cache
+from app.core.checkpointer import AsyncMongoDBSaver
+from app.core.config import settings
+from app.fixtures.orders import SAMPLE_ORDERS
+from app.services.order_cache import order_cache
+
+# A typical return conversation (three turns)
+CONVERSATION = ("I want to return my order", "ORD-2024-001", "yes")
+
+
+def add_common_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the options every benchmark accepts
+
+    Args:
+        parser: Benchmark's argument parser
+    """
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock instead of MONGODB_URL (needs the dev dependencies)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="latency of each scripted LLM call")
+
+
+def _guess_intent(text: str) -> str:
+    text = text.lower()
+    if "return" in text or "send" in text:
+        return "return"
+    if "refund" in text or "money" in text:
+        return "refund"
+    if "where" in text or "status" in text:
+        return "order_status"
+    return "other"
+
+
+class _ScriptedStructured:
+    def __init__(self, llm: "ScriptedLLM", schema):
+        self.llm = llm
+        self.schema = schema
+
+    async def ainvoke(self, messages, **kwargs):
+        await self.llm.call()
+        text = messages[-1].content
+        if "intents" in self.schema.model_fields:
+            return self.schema(intents=[_guess_intent(line) for line in text.splitlines() if line.strip()])
+        match = re.search(r"ORD-\d{4}-\d{3}", text, re.IGNORECASE)
+        return self.schema(
+            intent=_guess_intent(text),
+            order_number=match.group(0).upper() if match else None,
+            action_preference="refund" if "money" in text.lower() else None
+        )
+
+
+class ScriptedLLM:
+    """
+    Keyword-driven stand-in for ChatOpenAI with a fixed per-call latency
+
+    Keeps benchmarks about this service's own overhead; the real model's
+    latency is added back with --llm-latency-ms.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    async def call(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency_seconds)
+
+    def with_structured_output(self, schema):
+        return _ScriptedStructured(self, schema)
+
+    async def ainvoke(self, messages, **kwargs):
+        await self.call()
+        text = messages[-1].content
+        if "intent classifier" in messages[0].content:
+            return AIMessage(content=_guess_intent(text))
+        match = re.search(r"ORD-\d{4}-\d{3}", text.split("Message:")[-1], re.IGNORECASE)
+        return AIMessage(content=match.group(0).upper() if match else "NONE")
+
+
+async def open_database(in_memory: bool) -> Tuple[Any, Any]:
+    """
+    Open a scratch database holding the sample orders
+
+    Args:
+        in_memory: Use mongomock-motor instead of MONGODB_URL
+
+    Returns:
+        (client, database); drop it with close_database
+    """
+    if in_memory:
+        import mongomock.collection
+        from mongomock_motor import AsyncMongoMockClient
+
+        # mongomock 4.3's bulk UpdateOne doesn't accept the `sort` argument PyMongo 4.9+ passes
+        add_update = mongomock.collection.BulkOperationBuilder.add_update
+        mongomock.collection.BulkOperationBuilder.add_update = (
+            lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs)
+        )
+        client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(settings.mongodb_url)
+
+    db = client[f"{settings.mongodb_db_name}_bench"]
+    await client.drop_database(db.name)
+    await db.orders.insert_many(copy.deepcopy(SAMPLE_ORDERS))
+    return client, db
+
+
+async def close_database(client: Any, db: Any):
+    """
+    Drop the scratch database and close the client
+
+    Args:
+        client: Client from open_database
+        db: Database from open_database
+    """
+    await client.drop_database(db.name)
+    client.close()
+
+
+async def install_agent(client: Any, db: Any, llm: Any, checkpointer: Optional[Any] = None, **graph_options) -> "agent_service.AgentService":
+    """
+    Point the process-wide singletons at the benchmark's database and model
+
+    Args:
+        client: Client from open_database
+        db: Database from open_database
+        llm: Chat model (usually ScriptedLLM)
+        checkpointer: Checkpoint saver (AsyncMongoDBSaver on db by default)
+        **graph_options: Passed to create_agent_graph (speculative, joint_nlu)
+
+    Returns:
+        AgentService running the compiled graph
+    """
+    if checkpointer is None:
+        checkpointer = AsyncMongoDBSaver(client, db.name)
+        await checkpointer.setup()
+
+    database.db.client = client
+    database.db.db = db
+    database.db.checkpointer = checkpointer
+    agent_service._graph_instance = create_agent_graph(llm, db, checkpointer, **graph_options)
+    agent_service._graph_initialized = True
+    reset_caches()
+    return agent_service.AgentService(db)
+
+
+def reset_caches():
+    """Empty the in-process caches so each run starts cold"""
+    for cache in (intent_cache.local, extraction_cache.local, order_cache.cache, order_cache.negative):
+        cache.clear()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile
+
+    Args:
+        samples: Measurements
+        pct: Percentile (0-100)
+
+    Returns:
+        Value at that percentile
+    """
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Latency summary in milliseconds
+
+    Args:
+        samples: Durations in seconds
+
+    Returns:
+        p50, p99, mean and max
+    """
+    return {
+        "p50": percentile(samples, 50) * 1000,
+        "p99": percentile(samples, 99) * 1000,
+        "mean": statistics.fmean(samples) * 1000,
+        "max": max(samples) * 1000,
+    }
+
+
+def quiet_logging():
+    """Keep per-turn logging out of the measurements"""
+    logging.basicConfig(level=logging.WARNING)
+    for name in ("", "app"):
+        logging.getLogger(name).setLevel(logging.WARNING)
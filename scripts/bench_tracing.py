@@ -0,0 +1,234 @@
+"""
+Tracing and metrics overhead benchmark
+Runs the same conversations with the turn, node and router instrumentation
+(as the app builds the graph) and without it (plain nodes and router, no
+trace_turn), one conversation each in turn, and reports turn time and the
+overhead against the 1% budget
+
+Hooks the in-memory setup never fires (the MongoDB command listener, the
+LLM callback, checkpoint byte accounting) are timed per call and multiplied
+by their per-turn counts for an estimate of the whole instrumentation.
+OpenTelemetry spans are off (OTEL_ENABLED=false, the default); their cost
+depends on the deployment's exporter.
+
+    python scripts/bench_tracing.py --in-memory
+"""
+import argparse
+import asyncio
+import contextlib
+import time
+import timeit
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from bench_support import (
+    CONVERSATION, ScriptedLLM, add_common_arguments, close_database, install_agent, open_database,
+    quiet_logging, summarize
+)
+from langchain_core.outputs import LLMResult
+from langgraph.checkpoint.memory import InMemorySaver
+
+import app.agent.graph as graph_module
+import app.services.agent_service as agent_service
+from app.agent.registry import WORKERS
+from app.core.metrics import metrics
+from app.core.tracing import (
+    COUNT_BUCKETS, instrument_node, instrument_router, llm_metrics_handler, mongo_command_counter,
+    record_checkpoint_bytes, trace_turn
+)
+
+SETUPS = ("instrumented", "bare")
+
+
+@contextlib.asynccontextmanager
+async def _no_trace(thread_id: str):
+    yield None
+
+
+def _bare_graph(llm: Any, db: Any, checkpointer: Any):
+    """The graph without instrument_node / instrument_router"""
+    graph_module.instrument_node = lambda name, node: node
+    graph_module.instrument_router = lambda router: router
+    try:
+        return graph_module.create_agent_graph(llm, db, checkpointer)
+    finally:
+        graph_module.instrument_node = instrument_node
+        graph_module.instrument_router = instrument_router
+
+
+async def end_to_end(args) -> Dict[str, Any]:
+    client, db = await open_database(args.in_memory)
+    llm = ScriptedLLM(args.llm_latency_ms / 1000)
+    # mongomock has no indexes, so its checkpoint reads slow down as sessions accumulate
+    checkpointer = InMemorySaver() if args.in_memory else None
+    services = {"instrumented": await install_agent(client, db, llm, checkpointer)}
+    services["bare"] = agent_service.AgentService(db)
+    services["bare"].graph = _bare_graph(llm, db, agent_service._graph_instance.checkpointer)
+
+    durations: Dict[str, List[float]] = {setup: [] for setup in SETUPS}
+    nodes_before = hops_before = llm_calls_before = 0
+    for number in range(args.warmup + args.conversations):
+        if number == args.warmup:
+            nodes_before, hops_before = _node_calls(), _hop_count()
+            llm_calls_before = llm.calls
+        for setup in SETUPS[number % 2:] + SETUPS[:number % 2]:
+            agent_service.trace_turn = trace_turn if setup == "instrumented" else _no_trace
+            session_id = services[setup].create_session()
+            for message in CONVERSATION:
+                started = time.perf_counter()
+                await services[setup].process_message(session_id, message)
+                if number >= args.warmup:
+                    durations[setup].append(time.perf_counter() - started)
+    agent_service.trace_turn = trace_turn
+
+    await close_database(client, db)
+    turns = len(durations["instrumented"])
+    return {
+        "durations": durations,
+        "nodes/turn": (_node_calls() - nodes_before) / turns,
+        "hops/turn": (_hop_count() - hops_before) / turns,
+        # Both setups call the model; only the instrumented turns count
+        "llm calls/turn": (llm.calls - llm_calls_before) / (2 * turns),
+    }
+
+
+# Collection methods that each send one command (find_one calls find internally)
+_COMMANDS = (
+    "find", "find_one", "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "bulk_write", "aggregate", "count_documents", "find_one_and_update",
+)
+
+
+async def mongo_commands_per_turn(args) -> float:
+    """MongoDB commands per turn through the app's checkpointer (mongomock only)"""
+    from mongomock.collection import Collection
+
+    sent = 0
+    inside = False
+
+    def counting(method):
+        def wrapper(*call_args, **kwargs):
+            nonlocal sent, inside
+            if inside:
+                return method(*call_args, **kwargs)
+            sent += 1
+            inside = True
+            try:
+                return method(*call_args, **kwargs)
+            finally:
+                inside = False
+        return wrapper
+
+    originals = {name: getattr(Collection, name) for name in _COMMANDS}
+    client, db = await open_database(args.in_memory)
+    service = await install_agent(client, db, ScriptedLLM())
+    for name, method in originals.items():
+        setattr(Collection, name, counting(method))
+    try:
+        for _ in range(args.warmup):
+            session_id = service.create_session()
+            for message in CONVERSATION:
+                await service.process_message(session_id, message)
+    finally:
+        for name, method in originals.items():
+            setattr(Collection, name, method)
+    await close_database(client, db)
+    return sent / (args.warmup * len(CONVERSATION))
+
+
+def _node_calls() -> int:
+    return sum(metrics.histogram("node_duration_seconds", node=spec.name).count for spec in WORKERS)
+
+
+def _hop_count() -> float:
+    return metrics.histogram("turn_supervisor_hops", COUNT_BUCKETS).sum
+
+
+def _per_call(statement, number: int = 20000) -> float:
+    """Best-of-five seconds per call"""
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number
+
+
+def hook_costs() -> Dict[str, float]:
+    """Seconds per call of each hook, net of the uninstrumented call"""
+
+    async def node(state):
+        return {}
+
+    def router(state):
+        return "finalize"
+
+    wrapped_node = instrument_node("bench", node)
+    wrapped_router = instrument_router(router)
+
+    async def turns(context, count: int):
+        for _ in range(count):
+            async with context("bench"):
+                pass
+
+    async def nodes(target, count: int):
+        for _ in range(count):
+            await target({})
+
+    def looped(coroutine, count: int = 20000) -> float:
+        return min(timeit.repeat(lambda: asyncio.run(coroutine(count)), number=1, repeat=5)) / count
+
+    event = SimpleNamespace(command_name="find")
+    response = LLMResult(generations=[[]], llm_output={"token_usage": {"prompt_tokens": 120, "completion_tokens": 4}})
+
+    def llm_call():
+        run_id = uuid4()
+        llm_metrics_handler.on_chat_model_start({}, [[]], run_id=run_id)
+        llm_metrics_handler.on_llm_end(response, run_id=run_id)
+
+    return {
+        "trace_turn": looped(lambda count: turns(trace_turn, count)) - looped(lambda count: turns(_no_trace, count)),
+        "node": looped(lambda count: nodes(wrapped_node, count)) - looped(lambda count: nodes(node, count)),
+        "router": _per_call(lambda: wrapped_router(None)) - _per_call(lambda: router(None)),
+        "llm call": _per_call(llm_call) - _per_call(uuid4),
+        "mongo command": _per_call(lambda: mongo_command_counter.started(event)),
+        "checkpoint write": _per_call(lambda: record_checkpoint_bytes("checkpoint", 4096)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_arguments(parser)
+    parser.add_argument("--conversations", type=int, default=300, help="conversations per setup")
+    parser.add_argument("--warmup", type=int, default=10, help="conversations per setup left out of the results")
+    parser.add_argument("--mongo-commands", type=float, default=4, help="MongoDB commands per turn for the estimate (counted with --in-memory)")
+    args = parser.parse_args()
+    quiet_logging()
+
+    result = asyncio.run(end_to_end(args))
+    rows = {setup: summarize(samples) for setup, samples in result["durations"].items()}
+    bare = rows["bare"]["mean"]
+    print(f"{args.conversations} x {len(CONVERSATION)} turns per setup, llm latency {args.llm_latency_ms:.0f}ms")
+    print(f"{'setup':<13} {'p50 ms':>7} {'p99 ms':>7} {'mean ms':>8} {'overhead':>9}")
+    for setup, row in rows.items():
+        print(f"{setup:<13} {row['p50']:>7.3f} {row['p99']:>7.3f} {row['mean']:>8.3f} {(row['mean'] - bare) / bare * 100:>+8.2f}%")
+
+    mongo_commands = asyncio.run(mongo_commands_per_turn(args)) if args.in_memory else args.mongo_commands
+    costs = hook_costs()
+    counts = {
+        "trace_turn": 1,
+        "node": result["nodes/turn"],
+        "router": result["hops/turn"],
+        "llm call": result["llm calls/turn"],
+        "mongo command": mongo_commands,
+        # Checkpoint durability "exit": one checkpoint per turn
+        "checkpoint write": 1,
+    }
+    print()
+    print(f"{'hook':<17} {'us/call':>8} {'calls/turn':>11} {'us/turn':>8}")
+    total = 0.0
+    for hook, seconds in costs.items():
+        per_turn = seconds * counts[hook] * 1e6
+        total += per_turn
+        print(f"{hook:<17} {seconds * 1e6:>8.2f} {counts[hook]:>11.2f} {per_turn:>8.2f}")
+    print(f"{'total':<17} {'':>8} {'':>11} {total:>8.2f}  ({total / 10 / bare:.2f}% of a {bare:.2f}ms turn, budget 1%)")
+
+
+if __name__ == "__main__":
+    main()
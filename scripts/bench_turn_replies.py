@@ -0,0 +1,87 @@
+"""
+Turn reply extraction benchmark
+Grows one conversation with compaction off (MESSAGE_HISTORY_WINDOW=0) and,
+at each --report size, compares the replies process_message returns (taken
+from the turn's node updates) with the old post-turn scan that matched the
+user's text in the full history: the scan's cost and how many replies it
+would have returned
+
+    python scripts/bench_turn_replies.py --in-memory --report 100 500
+"""
+import argparse
+import asyncio
+import time
+import timeit
+from typing import Any, Dict, List
+
+from bench_support import (
+    ScriptedLLM, add_common_arguments, close_database, install_agent, open_database, quiet_logging
+)
+from langchain_core.messages import AIMessage, HumanMessage
+
+import app.core.database as database
+from app.core.config import settings
+
+# Repeats, like real users ("thanks", "yes"), are what broke the old scan
+TURNS = ("where is my order", "ORD-2024-001", "thanks")
+
+
+def scan_replies(messages: List[Any], message: str) -> List[str]:
+    """The extraction process_message used to run after every turn"""
+    replies = []
+    found_our_message = False
+    for msg in messages:
+        if isinstance(msg, HumanMessage) and msg.content == message:
+            found_our_message = True
+            continue
+        if found_our_message and isinstance(msg, AIMessage):
+            replies.append(msg.content)
+    return replies
+
+
+async def bench(args) -> List[Dict[str, Any]]:
+    client, db = await open_database(args.in_memory)
+    service = await install_agent(client, db, ScriptedLLM(args.llm_latency_ms / 1000))
+    session_id = service.create_session()
+
+    rows = []
+    report_at = sorted(args.report)
+    turn = 0
+    while report_at:
+        message = TURNS[turn % len(TURNS)]
+        started = time.perf_counter()
+        result = await service.process_message(session_id, message)
+        elapsed = time.perf_counter() - started
+        turn += 1
+
+        messages = (await database.db.checkpointer.aget_channel_values(session_id))["messages"]
+        if len(messages) >= report_at[0]:
+            report_at.pop(0)
+            scan_seconds = min(timeit.repeat(lambda: scan_replies(messages, message), number=100, repeat=5)) / 100
+            rows.append({
+                "messages": len(messages),
+                "turn ms": elapsed * 1000,
+                "scan us": scan_seconds * 1e6,
+                "replies": len(result["messages"]),
+                "scan replies": len(scan_replies(messages, message)),
+            })
+
+    await close_database(client, db)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_arguments(parser)
+    parser.add_argument("--report", type=int, nargs="+", default=[50, 100, 250, 500], help="history sizes to report at")
+    args = parser.parse_args()
+    quiet_logging()
+    settings.message_history_window = 0
+
+    print(f"{'messages':>8} {'turn ms':>8} {'old scan us':>12} {'replies':>8} {'old scan replies':>17}")
+    for row in asyncio.run(bench(args)):
+        print(f"{row['messages']:>8} {row['turn ms']:>8.1f} {row['scan us']:>12.1f} {row['replies']:>8} {row['scan replies']:>17}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+WebSocket load test
+Holds thousands of idle chat sockets open plus a set of active ones running
+conversations, and reports the server's resident memory per connection and
+the active sockets' turn latency
+
+The server runs in a child process (so its RSS excludes the clients):
+
+    python scripts/bench_websocket.py --in-memory --idle 2000 --active 100
+"""
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import uvicorn
+import websockets
+from bench_support import (
+    CONVERSATION, ScriptedLLM, add_common_arguments, close_database, install_agent, open_database,
+    quiet_logging, summarize
+)
+
+from app.main import app
+
+
+def _rss_bytes(pid: int) -> int:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) * 1024
+    raise RuntimeError("VmRSS not available")
+
+
+async def serve(args):
+    """Child process: the app on args.serve, with the benchmark's database and model"""
+    client, db = await open_database(args.in_memory)
+    await install_agent(client, db, ScriptedLLM(args.llm_latency_ms / 1000))
+    server = uvicorn.Server(uvicorn.Config(
+        app, host="127.0.0.1", port=args.serve, log_level="warning", lifespan="off", backlog=4096
+    ))
+    await server.serve()
+    await close_database(client, db)
+
+
+class Client:
+    """One chat socket; answers heartbeats and collects turn results"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.frames: asyncio.Queue = asyncio.Queue()
+
+    async def open(self):
+        self.socket = await websockets.connect(self.url, open_timeout=60, ping_interval=None)
+        self.reader = asyncio.create_task(self._read())
+        await self.next("session")
+
+    async def _read(self):
+        async for raw in self.socket:
+            frame = json.loads(raw)
+            if frame["type"] == "ping":
+                await self.socket.send(json.dumps({"type": "pong"}))
+            else:
+                self.frames.put_nowait(frame)
+
+    async def next(self, kind: str):
+        while True:
+            frame = await self.frames.get()
+            if frame["type"] == kind:
+                return frame
+            if frame["type"] == "error":
+                raise RuntimeError(frame)
+
+    async def turn(self, message: str) -> float:
+        started = time.perf_counter()
+        await self.socket.send(json.dumps({"type": "message", "message": message}))
+        await self.next("done")
+        return time.perf_counter() - started
+
+    async def close(self):
+        await self.socket.close()
+        self.reader.cancel()
+
+
+async def _open_all(url: str, count: int, parallel: int = 200) -> List[Client]:
+    clients = [Client(url) for _ in range(count)]
+    for start in range(0, count, parallel):
+        await asyncio.gather(*(client.open() for client in clients[start:start + parallel]))
+    return clients
+
+
+async def load(args, pid: int, url: str):
+    # Warm up imports, the graph and the first allocations
+    warm = await _open_all(url, 10)
+    for client in warm:
+        for message in CONVERSATION:
+            await client.turn(message)
+    await asyncio.gather(*(client.close() for client in warm))
+    await asyncio.sleep(1)
+    baseline = _rss_bytes(pid)
+
+    idle = await _open_all(url, args.idle)
+    await asyncio.sleep(1)
+    with_idle = _rss_bytes(pid)
+
+    active = await _open_all(url, args.active)
+    durations: List[float] = []
+
+    async def converse(client: Client):
+        for _ in range(args.rounds):
+            for message in CONVERSATION:
+                durations.append(await client.turn(message))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(converse(client) for client in active))
+    elapsed = time.perf_counter() - started
+    with_active = _rss_bytes(pid)
+
+    await asyncio.gather(*(client.close() for client in idle + active))
+
+    print(f"server RSS before: {baseline / 2**20:.1f} MiB")
+    print(f"{args.idle} idle sockets: +{(with_idle - baseline) / 2**20:.1f} MiB ({(with_idle - baseline) / max(args.idle, 1) / 1024:.1f} KiB per socket)")
+    print(
+        f"+{args.active} active sockets after {len(durations)} turns: +{(with_active - with_idle) / 2**20:.1f} MiB "
+        f"({(with_active - with_idle) / max(args.active, 1) / 1024:.1f} KiB per socket, includes their conversations' state)"
+    )
+    latency = summarize(durations)
+    print(f"active turns: {len(durations) / elapsed:.0f}/s, p50 {latency['p50']:.1f} ms, p99 {latency['p99']:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_arguments(parser)
+    parser.add_argument("--idle", type=int, default=2000, help="sockets that only answer heartbeats")
+    parser.add_argument("--active", type=int, default=100, help="sockets running conversations")
+    parser.add_argument("--rounds", type=int, default=3, help="conversations per active socket")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    quiet_logging()
+
+    if args.serve:
+        asyncio.run(serve(args))
+        return
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    command = [sys.executable, __file__, "--serve", str(port), "--llm-latency-ms", str(args.llm_latency_ms)]
+    server = subprocess.Popen(command + (["--in-memory"] if args.in_memory else []))
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError("server did not start")
+                time.sleep(0.1)
+        asyncio.run(load(args, server.pid, f"ws://127.0.0.1:{port}/ws/chat"))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Index self-check
+Ensures the registered indexes and fails if any hot query plan is a collection scan
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.core.checkpointer import AsyncMongoDBSaver
+from app.core.indexes import ensure_indexes, verify_query_plans
+
+
+async def check_indexes() -> bool:
+    """
+    Ensure indexes and verify hot query plans
+
+    Returns:
+        True if no hot query uses a COLLSCAN
+    """
+    client = AsyncIOMotorClient(settings.mongodb_url)
+    db = client[settings.mongodb_db_name]
+
+    try:
+        print("Ensuring indexes...")
+        await ensure_indexes(db)
+        await AsyncMongoDBSaver(client, settings.mongodb_db_name, "checkpoints").setup()
+
+        print("Explaining hot queries...")
+        plans = await verify_query_plans(db)
+
+        ok = True
+        for name, stages in plans.items():
+            if "COLLSCAN" in stages:
+                ok = False
+                print(f"  ❌ {name}: {' <- '.join(stages)}")
+            else:
+                print(f"  ✅ {name}: {' <- '.join(stages)}")
+        return ok
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    print("🔄 Checking MongoDB indexes...")
+    if not asyncio.run(check_indexes()):
+        print("\n❌ COLLSCAN on a hot query - add the missing index to app/core/indexes.py")
+        sys.exit(1)
+    print("\n✅ All hot queries use indexes")
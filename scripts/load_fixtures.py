@@ -13,6 +13,7 @@ sys.path.insert(0, str(project_root))
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core.config import settings
+from app.core.indexes import ensure_indexes
 from app.fixtures.orders import SAMPLE_ORDERS
 
 
@@ -37,10 +38,7 @@ async def load_fixtures():
         
         # Create indexes for better query performance
         print("Creating indexes...")
-        await db.orders.create_index("order_number", unique=True)
-        await db.orders.create_index("user_email")
-        await db.orders.create_index("status")
-        await db.orders.create_index("order_date")
+        await ensure_indexes(db)
         
         print("✅ Indexes created")
         
@@ -0,0 +1,113 @@
+"""
+Train the bag-of-words intent model used by the classifier fast path
+Reads logged turns (JSONL with "text" and "intent" keys, e.g. LLM-labelled
+user messages) and writes JSON weights for INTENT_MODEL_PATH
+"""
+import argparse
+import json
+import math
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.agent.intent_classifier import INTENTS, extract_features
+
+
+def load_examples(path: Path) -> list:
+    """
+    Load labelled turns
+
+    Args:
+        path: JSONL file path
+
+    Returns:
+        List of (features, intent) tuples
+    """
+    examples = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("intent") in INTENTS and record.get("text"):
+                examples.append((set(extract_features(record["text"])), record["intent"]))
+    return examples
+
+
+def train(examples: list, epochs: int, learning_rate: float, l2: float, min_count: int) -> dict:
+    """
+    Fit multinomial logistic regression with SGD
+
+    Args:
+        examples: (features, intent) tuples
+        epochs: Passes over the data
+        learning_rate: SGD step size
+        l2: L2 regularization strength
+        min_count: Drop features seen fewer times than this
+
+    Returns:
+        Model dict (intents, bias, weights)
+    """
+    feature_counts = Counter(feature for features, _ in examples for feature in features)
+    vocabulary = {feature for feature, count in feature_counts.items() if count >= min_count}
+
+    bias = {intent: 0.0 for intent in INTENTS}
+    weights = {feature: {intent: 0.0 for intent in INTENTS} for feature in vocabulary}
+
+    for epoch in range(epochs):
+        random.shuffle(examples)
+        loss = 0.0
+        for features, label in examples:
+            features = features & vocabulary
+            scores = {intent: bias[intent] + sum(weights[f][intent] for f in features) for intent in INTENTS}
+            top = max(scores.values())
+            exp_scores = {intent: math.exp(score - top) for intent, score in scores.items()}
+            total = sum(exp_scores.values())
+
+            for intent in INTENTS:
+                probability = exp_scores[intent] / total
+                gradient = probability - (1.0 if intent == label else 0.0)
+                bias[intent] -= learning_rate * gradient
+                for feature in features:
+                    weights[feature][intent] -= learning_rate * (gradient + l2 * weights[feature][intent])
+            loss -= math.log(max(exp_scores[label] / total, 1e-12))
+
+        print(f"Epoch {epoch + 1}/{epochs} - loss: {loss / max(len(examples), 1):.4f}")
+
+    # Drop near-zero weights to keep the model file small
+    compact_weights = {
+        feature: {intent: round(w, 4) for intent, w in per_intent.items() if abs(w) >= 1e-3}
+        for feature, per_intent in weights.items()
+    }
+    return {
+        "intents": list(INTENTS),
+        "bias": {intent: round(b, 4) for intent, b in bias.items()},
+        "weights": {feature: w for feature, w in compact_weights.items() if w},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("input", type=Path, help="JSONL file of labelled turns")
+    parser.add_argument("output", type=Path, help="Where to write the model JSON")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--learning-rate", type=float, default=0.1)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--min-count", type=int, default=2)
+    args = parser.parse_args()
+
+    examples = load_examples(args.input)
+    print(f"🔄 Training on {len(examples)} labelled turns...")
+    model = train(examples, args.epochs, args.learning_rate, args.l2, args.min_count)
+
+    args.output.write_text(json.dumps(model))
+    print(f"✅ Wrote model with {len(model['weights'])} features to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,38 +35,21 @@ async function sendMessage() {
     // Show typing indicator
     showTypingIndicator();
 
+    const turn = { receivedMessage: false };
     try {
-        // Send message to backend
-        const response = await fetch('/api/chat', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                message: message,
-                session_id: sessionId
-            })
-        });
-
-        const data = await response.json();
+        // Prefer the persistent WebSocket; fall back to the HTTP stream if it can't connect
+        const socket = await getSocket();
+        if (socket) {
+            await sendOverSocket(socket, message, turn);
+        } else {
+            await sendOverHttp(message, turn);
+        }
 
         // Hide typing indicator
         hideTypingIndicator();
 
-        if (data.success) {
-            // Store session ID
-            sessionId = data.session_id;
-
-            // Add bot messages
-            if (data.messages && data.messages.length > 0) {
-                for (const msg of data.messages) {
-                    addMessage(msg, 'bot');
-                }
-            } else {
-                addMessage("I'm processing your request...", 'bot');
-            }
-        } else {
-            addMessage(data.error || "Sorry, I encountered an error. Please try again.", 'bot');
+        if (!turn.receivedMessage) {
+            addMessage("I'm processing your request...", 'bot');
         }
     } catch (error) {
         console.error('Error sending message:', error);
@@ -77,6 +60,134 @@ async function sendMessage() {
     }
 }
 
+// Handle one streamed chat event (same event types over WebSocket and SSE)
+function handleChatEvent(event, data, turn) {
+    if (event === 'session') {
+        // Store session ID
+        sessionId = data.session_id;
+    } else if (event === 'message') {
+        turn.receivedMessage = true;
+        // Keep the typing indicator below the latest message until the turn is done
+        hideTypingIndicator();
+        addMessage(data.content, 'bot');
+        showTypingIndicator();
+    } else if (event === 'error') {
+        turn.receivedMessage = true;
+        hideTypingIndicator();
+        addMessage(data.content || "Sorry, I encountered an error. Please try again.", 'bot');
+    }
+}
+
+// WebSocket transport: one connection per session, reused across turns
+let chatSocket = null;
+let socketUnavailable = false;
+let currentTurn = null;
+
+function getSocket() {
+    if (socketUnavailable || !('WebSocket' in window)) return Promise.resolve(null);
+    if (chatSocket && chatSocket.readyState === WebSocket.OPEN) return Promise.resolve(chatSocket);
+
+    return new Promise((resolve) => {
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        const query = sessionId ? `?session_id=${encodeURIComponent(sessionId)}` : '';
+        const socket = new WebSocket(`${protocol}//${window.location.host}/ws/chat${query}`);
+        let opened = false;
+
+        socket.onmessage = (event) => {
+            const data = JSON.parse(event.data);
+            if (data.type === 'ping') {
+                // Server heartbeat
+                socket.send(JSON.stringify({ type: 'pong' }));
+            } else if (data.type === 'session' && !opened) {
+                opened = true;
+                sessionId = data.session_id;
+                chatSocket = socket;
+                resolve(socket);
+            } else if (currentTurn) {
+                handleChatEvent(data.type, data, currentTurn);
+                if (data.type === 'done' || data.type === 'error') {
+                    currentTurn.resolve();
+                }
+            }
+        };
+
+        socket.onclose = () => {
+            if (!opened) {
+                // Couldn't connect (e.g. a proxy without WebSocket support) - stay on HTTP
+                socketUnavailable = true;
+                resolve(null);
+            }
+            if (chatSocket === socket) chatSocket = null;
+            if (currentTurn) currentTurn.reject(new Error('WebSocket closed'));
+        };
+    });
+}
+
+function sendOverSocket(socket, message, turn) {
+    return new Promise((resolve, reject) => {
+        currentTurn = Object.assign(turn, {
+            resolve: () => { currentTurn = null; resolve(); },
+            reject: (error) => { currentTurn = null; reject(error); }
+        });
+        socket.send(JSON.stringify({ type: 'message', message: message }));
+    });
+}
+
+function closeSocket() {
+    if (chatSocket) {
+        chatSocket.close();
+        chatSocket = null;
+    }
+}
+
+// HTTP transport: Server-Sent Events from a POST per turn
+async function sendOverHttp(message, turn) {
+    const response = await fetch('/api/chat/stream', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            message: message,
+            session_id: sessionId
+        })
+    });
+
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+    }
+
+    await readEventStream(response, (event, data) => handleChatEvent(event, data, turn));
+}
+
+// Read a text/event-stream response, calling onEvent(event, data) per event
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            for (const line of frame.split('\n')) {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            }
+            if (data) onEvent(event, JSON.parse(data));
+        }
+    }
+}
+
 function addMessage(text, sender) {
     const messageDiv = document.createElement('div');
     messageDiv.className = `message ${sender}-message`;
@@ -135,6 +246,7 @@ function clearChat() {
     if (confirm('Are you sure you want to clear the chat history?')) {
         chatMessages.innerHTML = '';
         sessionId = null; // Reset session
+        closeSocket(); // The next message opens a socket bound to a new session
         // Add welcome message back
         addMessage("Hello! 👋 I'm your customer service assistant. How can I help you today?", 'bot');
     }
@@ -0,0 +1,130 @@
+"""
+Shared test fixtures
+In-memory MongoDB (mongomock-motor) and a deterministic stand-in for the chat
+model, so the graph runs end to end without network access
+"""
+import asyncio
+import copy
+import re
+
+import mongomock.collection
+import pytest
+from langchain_core.messages import AIMessage
+from mongomock_motor import AsyncMongoMockClient
+
+from app.fixtures.orders import SAMPLE_ORDERS
+
+
+def _guess_intent(text: str) -> str:
+    text = text.lower()
+    if "return" in text or "send" in text:
+        return "return"
+    if "refund" in text or "money" in text:
+        return "refund"
+    if "where" in text or "status" in text:
+        return "order_status"
+    return "other"
+
+
+class _FakeStructured:
+    def __init__(self, llm: "FakeLLM", schema):
+        self.llm = llm
+        self.schema = schema
+
+    async def ainvoke(self, messages, **kwargs):
+        self.llm.calls += 1
+        text = messages[-1].content
+        if "intents" in self.schema.model_fields:
+            lines = [line for line in text.splitlines() if line.strip()]
+            return self.schema(intents=[_guess_intent(line) for line in lines])
+        match = re.search(r"ORD-\d{4}-\d{3}", text, re.IGNORECASE)
+        return self.schema(
+            intent=_guess_intent(text),
+            order_number=match.group(0).upper() if match else None,
+            action_preference="refund" if "money" in text.lower() else None
+        )
+
+
+class FakeLLM:
+    """
+    Keyword-driven stand-in for ChatOpenAI
+
+    Answers the intent prompt with a keyword guess and the extraction prompt
+    with the first ORD-YYYY-NNN in the message; counts calls.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def with_structured_output(self, schema):
+        return _FakeStructured(self, schema)
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0)
+        text = messages[-1].content
+        if "intent classifier" in messages[0].content:
+            return AIMessage(content=_guess_intent(text))
+        match = re.search(r"ORD-\d{4}-\d{3}", text.split("Message:")[-1], re.IGNORECASE)
+        return AIMessage(content=match.group(0).upper() if match else "NONE")
+
+
+def run(coro):
+    """Run a coroutine to completion on a fresh event loop"""
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """Empty in-memory database"""
+    # mongomock 4.3's bulk UpdateOne doesn't accept the `sort` argument PyMongo 4.9+ passes
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+    monkeypatch.setattr(
+        mongomock.collection.BulkOperationBuilder,
+        "add_update",
+        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs)
+    )
+    return AsyncMongoMockClient()["chatbot_test"]
+
+
+@pytest.fixture
+def orders_db(mongo_db):
+    """In-memory database holding the sample orders"""
+    run(mongo_db.orders.insert_many(copy.deepcopy(SAMPLE_ORDERS)))
+    return mongo_db
+
+
+@pytest.fixture
+def fake_llm():
+    return FakeLLM()
+
+
+@pytest.fixture
+def agent(orders_db, fake_llm, monkeypatch):
+    """
+    AgentService running the real graph on the in-memory database
+
+    The process-wide singletons (database handle, checkpointer, graph,
+    caches) are pointed at this test's objects and reset afterwards.
+    """
+    import app.core.database as database
+    import app.services.agent_service as agent_service
+    from app.agent.graph import create_agent_graph
+    from app.agent.workers.classify_intent import intent_cache
+    from app.agent.workers.slot_filler import extraction_cache
+    from app.core.checkpointer import AsyncMongoDBSaver
+    from app.services.order_cache import order_cache
+
+    client = orders_db.client
+    checkpointer = AsyncMongoDBSaver(client, orders_db.name)
+    run(checkpointer.setup())
+
+    monkeypatch.setattr(database.db, "client", client)
+    monkeypatch.setattr(database.db, "db", orders_db)
+    monkeypatch.setattr(database.db, "checkpointer", checkpointer)
+    monkeypatch.setattr(agent_service, "_graph_instance", create_agent_graph(fake_llm, orders_db, checkpointer))
+    monkeypatch.setattr(agent_service, "_graph_initialized", True)
+    for cache in (intent_cache.local, extraction_cache.local, order_cache.cache, order_cache.negative):
+        cache.clear()
+
+    return agent_service.AgentService(orders_db)
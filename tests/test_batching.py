@@ -0,0 +1,75 @@
+"""
+Micro-batching of concurrent requests (LLM intent classification)
+"""
+import asyncio
+
+import pytest
+
+from app.agent.workers.classify_intent import llm_classify
+from app.core.batching import MicroBatcher
+from conftest import run
+
+
+class _Recorder:
+    """process_batch stand-in recording every batch it receives"""
+
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        await asyncio.sleep(0)
+        return [item * 10 for item in items]
+
+
+def _submit_all(batcher, items):
+    async def submit_all():
+        return await asyncio.gather(*(batcher.submit(item) for item in items))
+    return run(submit_all())
+
+
+def test_concurrent_submits_share_one_batch():
+    recorder = _Recorder()
+    batcher = MicroBatcher("test", recorder, max_batch_size=16, max_wait_seconds=0.01)
+
+    assert _submit_all(batcher, [1, 2, 3, 4, 5]) == [10, 20, 30, 40, 50]
+    assert recorder.batches == [[1, 2, 3, 4, 5]]
+
+
+def test_full_batch_flushes_without_waiting():
+    recorder = _Recorder()
+    batcher = MicroBatcher("test", recorder, max_batch_size=2, max_wait_seconds=60)
+
+    assert _submit_all(batcher, [1, 2, 3, 4]) == [10, 20, 30, 40]
+    assert recorder.batches == [[1, 2], [3, 4]]
+
+
+def test_batch_failure_reaches_every_caller():
+    async def broken(items):
+        raise RuntimeError("backend down")
+
+    batcher = MicroBatcher("test", broken, max_batch_size=16, max_wait_seconds=0.01)
+
+    async def submit_all():
+        return await asyncio.gather(*(batcher.submit(item) for item in range(3)), return_exceptions=True)
+
+    results = run(submit_all())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_concurrent_classifications_make_one_llm_call(fake_llm):
+    messages = ["where did my parcel go", "i want my money", "send this back"]
+
+    async def classify_all():
+        return await asyncio.gather(*(llm_classify(message, fake_llm) for message in messages))
+
+    assert run(classify_all()) == ["order_status", "refund", "return"]
+    assert fake_llm.calls == 1
+
+
+@pytest.mark.parametrize("count", [1, 2])
+def test_small_batches_are_answered(fake_llm, count):
+    async def classify_all():
+        return await asyncio.gather(*(llm_classify("where is it", fake_llm) for _ in range(count)))
+
+    assert run(classify_all()) == ["order_status"] * count
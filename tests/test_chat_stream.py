@@ -0,0 +1,48 @@
+"""
+Streamed chat turns (POST /api/chat/stream)
+"""
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from app.main import app
+from app.services import agent_service as agent_service_module
+from conftest import run
+
+
+def _events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_turn_is_streamed_as_server_sent_events(agent):
+    response = TestClient(app).post("/api/chat/stream", json={"message": "where is ORD-2024-001"})
+
+    events = _events(response.text)
+    kinds = [kind for kind, _ in events]
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert kinds[0] == "session" and kinds[-1] == "done"
+    assert "node" in kinds and "message" in kinds
+    assert events[-1][1]["state"]["has_order"]
+
+
+def test_turn_completes_after_the_client_disconnects(agent):
+    session_id = agent.create_session()
+
+    async def disconnect_after_first_event():
+        stream = agent.stream_message(session_id, "where is ORD-2024-001")
+        await anext(stream)
+        await stream.aclose()
+        await asyncio.gather(*agent_service_module._streamed_turns)
+        return await agent.graph.aget_state({"configurable": {"thread_id": session_id}})
+
+    state = run(disconnect_after_first_event())
+
+    assert state.values["order"] is not None
+    assert any(isinstance(m, AIMessage) for m in state.values["messages"])
@@ -0,0 +1,56 @@
+"""
+Checkpoint writes per turn (durability "exit")
+"""
+import pytest
+
+import app.core.database as database
+from app.core.config import settings
+from conftest import run
+
+TURNS = ("where is my order", "ORD-2024-001", "thanks")
+
+
+async def _converse(agent, session_id):
+    """Send TURNS; return (checkpoints, pending writes) stored after each"""
+    counts = []
+    for message in TURNS:
+        await agent.process_message(session_id, message)
+        counts.append((
+            await agent.db.checkpoints.count_documents({"thread_id": session_id}),
+            await agent.db.checkpoint_writes.count_documents({"thread_id": session_id}),
+        ))
+    return counts
+
+
+def test_one_checkpoint_per_turn(agent):
+    assert settings.checkpoint_durability == "exit"
+    session_id = agent.create_session()
+
+    counts = run(_converse(agent, session_id))
+
+    assert counts == [(turn, 0) for turn in range(1, len(TURNS) + 1)]
+
+
+def test_per_superstep_durability_writes_more(agent, monkeypatch):
+    monkeypatch.setattr(settings, "checkpoint_durability", "async")
+    session_id = agent.create_session()
+
+    checkpoints, writes = run(_converse(agent, session_id))[-1]
+
+    assert checkpoints > len(TURNS) and writes > 0
+
+
+@pytest.mark.parametrize("durability", ["exit", "async"])
+def test_next_turn_resumes_from_the_checkpoint(agent, monkeypatch, durability):
+    monkeypatch.setattr(settings, "checkpoint_durability", durability)
+    session_id = agent.create_session()
+
+    async def converse_then_load():
+        await agent.process_message(session_id, "where is my order")
+        await agent.process_message(session_id, "ORD-2024-001")
+        return await database.db.checkpointer.aget_channel_values(session_id)
+
+    state = run(converse_then_load())
+
+    assert state["order_number"] == "ORD-2024-001"
+    assert [m.content for m in state["messages"] if m.type == "human"] == ["where is my order", "ORD-2024-001"]
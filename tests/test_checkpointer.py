@@ -0,0 +1,88 @@
+"""
+Async Motor-backed checkpoint saver
+"""
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from app.core.checkpointer import AsyncMongoDBSaver
+from conftest import run
+
+
+def _config(thread_id: str, checkpoint_id: str = None) -> dict:
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+@pytest.fixture
+def saver(mongo_db):
+    saver = AsyncMongoDBSaver(mongo_db.client, mongo_db.name)
+    run(saver.setup())
+    return saver
+
+
+def _checkpoint(checkpoint_id: str, value: str) -> dict:
+    checkpoint = empty_checkpoint()
+    checkpoint["id"] = checkpoint_id
+    checkpoint["channel_values"] = {"intent": value}
+    return checkpoint
+
+
+def test_put_and_get_latest(saver):
+    async def put_two():
+        first = await saver.aput(_config("t1"), _checkpoint("1", "return"), {"step": 1}, {})
+        await saver.aput(first, _checkpoint("2", "refund"), {"step": 2}, {})
+        return await saver.aget_tuple(_config("t1")), [c async for c in saver.alist(_config("t1"))]
+
+    latest, listed = run(put_two())
+
+    assert latest.checkpoint["channel_values"] == {"intent": "refund"}
+    assert latest.parent_config["configurable"]["checkpoint_id"] == "1"
+    assert latest.metadata["step"] == 2
+    assert [c.checkpoint["id"] for c in listed] == ["2", "1"]
+    assert run(saver.aget_channel_values("t1")) == {"intent": "refund"}
+
+
+def test_pending_writes_are_attached(saver):
+    async def put_with_writes():
+        config = await saver.aput(_config("t2"), _checkpoint("1", "return"), {}, {})
+        await saver.aput_writes(config, [("intent", "refund"), ("order_number", "ORD-2024-001")], "task-1")
+        return await saver.aget_tuple(config)
+
+    checkpoint = run(put_with_writes())
+
+    assert [(w[1], w[2]) for w in checkpoint.pending_writes] == [("intent", "refund"), ("order_number", "ORD-2024-001")]
+
+
+def test_threads_are_isolated_and_deletable(saver):
+    async def two_threads():
+        await saver.aput(_config("a"), _checkpoint("1", "return"), {}, {})
+        await saver.aput(_config("b"), _checkpoint("1", "refund"), {}, {})
+        await saver.adelete_thread("a")
+        return await saver.aget_tuple(_config("a")), await saver.aget_tuple(_config("b"))
+
+    a, b = run(two_threads())
+
+    assert a is None
+    assert b.checkpoint["channel_values"] == {"intent": "refund"}
+
+
+def test_rejects_non_string_identifiers(saver):
+    with pytest.raises(ValueError):
+        run(saver.aget_tuple({"configurable": {"thread_id": {"$ne": None}}}))
+
+
+def test_conversation_resumes_from_checkpoint(agent):
+    session_id = agent.create_session()
+
+    async def two_turns():
+        await agent.process_message(session_id, "where is my order")
+        return await agent.process_message(session_id, "ORD-2024-001")
+
+    result = run(two_turns())
+
+    # The second turn only works if the first turn's intent was restored
+    assert result["success"]
+    assert result["state"]["intent"] == "order_status"
+    assert result["state"]["has_order"]
@@ -0,0 +1,47 @@
+"""
+ClassifyIntentWorker fast path and LLM fallback
+"""
+import asyncio
+
+from langchain_core.messages import HumanMessage
+
+from app.agent.workers import classify_intent
+from app.core.config import settings
+from conftest import run
+
+
+def test_fast_path_hit_skips_the_llm(fake_llm):
+    classify_intent.intent_cache.local.clear()
+    result = run(classify_intent.classify_intent_worker(
+        {"messages": [HumanMessage(content="I want to return my order")]}, fake_llm
+    ))
+
+    assert result["intent"] == "return"
+    assert fake_llm.calls == 0
+
+
+def test_bare_keyword_is_classified_by_the_llm(fake_llm):
+    classify_intent.intent_cache.local.clear()
+    result = run(classify_intent.classify_intent_worker(
+        {"messages": [HumanMessage(content="What is your return policy? I never got an answer")]}, fake_llm
+    ))
+
+    assert fake_llm.calls == 1
+    assert result["intent"] == "return"  # the stand-in LLM answers by keyword too
+
+
+def test_shadow_check_is_kept_alive_until_done(fake_llm, monkeypatch):
+    monkeypatch.setattr(settings, "intent_shadow_rate", 1.0)
+
+    async def classify_and_drain():
+        await classify_intent.classify_intent_worker(
+            {"messages": [HumanMessage(content="Where is my order?")]}, fake_llm
+        )
+        assert len(classify_intent._shadow_tasks) == 1
+        await asyncio.gather(*classify_intent._shadow_tasks)
+        await asyncio.sleep(0)  # let the done callbacks run
+
+    run(classify_and_drain())
+
+    assert not classify_intent._shadow_tasks
+    assert fake_llm.calls == 1
@@ -0,0 +1,127 @@
+"""
+Email outbox dispatcher (claims, retries, wakeups)
+"""
+import asyncio
+
+import pytest
+
+from app.agent.workers.finalize import finalize_worker
+from app.services.email_outbox import OUTBOX_COLLECTION, EmailDispatcher, enqueue_email
+from conftest import run
+
+
+class _Sender:
+    """Records deliveries; optionally fails or runs a hook on each send"""
+
+    def __init__(self, fail: bool = False, on_send=None):
+        self.sent = []
+        self.fail = fail
+        self.on_send = on_send
+
+    async def send(self, to, subject, body):
+        if self.on_send:
+            await self.on_send(to)
+        if self.fail:
+            raise ConnectionError("SMTP down")
+        self.sent.append(to)
+
+
+async def _queue(db, count: int):
+    for i in range(count):
+        await enqueue_email(db, f"T-{i}:confirmation", f"user{i}@example.com", "Your return", "Details")
+
+
+def _dispatcher(db, sender, **options) -> EmailDispatcher:
+    dispatcher = EmailDispatcher(**options)
+    dispatcher.collection = db[OUTBOX_COLLECTION]
+    dispatcher.sender = sender
+    return dispatcher
+
+
+def test_batch_is_claimed_and_sent(mongo_db):
+    sender = _Sender()
+    dispatcher = _dispatcher(mongo_db, sender, batch_size=3)
+
+    async def dispatch():
+        await _queue(mongo_db, 5)
+        claimed = await dispatcher.dispatch_batch()
+        docs = await mongo_db[OUTBOX_COLLECTION].find().to_list(None)
+        return claimed, docs
+
+    claimed, docs = run(dispatch())
+
+    assert claimed == 3 and len(sender.sent) == 3
+    sent = [doc for doc in docs if doc["status"] == "sent"]
+    assert len(sent) == 3 and len({doc["claim_id"] for doc in sent}) == 1
+    assert sum(doc["status"] == "queued" for doc in docs) == 2
+
+
+def test_concurrent_dispatchers_send_each_email_once(mongo_db):
+    sender = _Sender()
+    dispatchers = [_dispatcher(mongo_db, sender, batch_size=10) for _ in range(3)]
+
+    async def dispatch():
+        await _queue(mongo_db, 12)
+        for _ in range(3):
+            await asyncio.gather(*(dispatcher.dispatch_batch() for dispatcher in dispatchers))
+
+    run(dispatch())
+
+    assert sorted(sender.sent) == sorted(f"user{i}@example.com" for i in range(12))
+
+
+def test_failed_send_backs_off_then_fails(mongo_db):
+    dispatcher = _dispatcher(mongo_db, _Sender(fail=True), max_attempts=2, backoff_seconds=0)
+
+    async def dispatch():
+        await _queue(mongo_db, 1)
+        await dispatcher.dispatch_batch()
+        first = await mongo_db[OUTBOX_COLLECTION].find_one()
+        await dispatcher.dispatch_batch()
+        return first, await mongo_db[OUTBOX_COLLECTION].find_one()
+
+    first, last = run(dispatch())
+
+    assert (first["status"], first["attempts"]) == ("queued", 1)
+    assert (last["status"], last["attempts"], last["last_error"]) == ("failed", 2, "SMTP down")
+
+
+def test_mail_queued_during_a_batch_is_not_left_for_the_poll(mongo_db):
+    async def queue_follow_up(to):
+        if to == "user0@example.com":
+            await enqueue_email(mongo_db, "T-follow-up:confirmation", "late@example.com", "Your refund", "Details")
+
+    sender = _Sender(on_send=queue_follow_up)
+    dispatcher = EmailDispatcher(poll_interval_seconds=60)
+
+    async def dispatch():
+        await _queue(mongo_db, 1)
+        dispatcher.start(mongo_db, sender)
+        for _ in range(100):
+            if "late@example.com" in sender.sent:
+                break
+            await asyncio.sleep(0.01)
+        await dispatcher.stop()
+
+    run(dispatch())
+
+    assert sender.sent == ["user0@example.com", "late@example.com"]
+
+
+@pytest.mark.parametrize("email_status, note", [
+    ("queued", "I'll email all the details to"),
+    ("failed", "There was an issue sending the email"),
+])
+def test_finalize_reports_the_queuing_outcome(email_status, note):
+    state = {
+        "intent": "return",
+        "desired_action": "return",
+        "action_ticket": {"id": "RET-1"},
+        "order": {"customer_email": "jane@example.com"},
+        "email_status": email_status,
+    }
+
+    update = run(finalize_worker(state))
+
+    content = update["messages"][0].content
+    assert "RET-1" in content and note in content
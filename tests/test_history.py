@@ -0,0 +1,83 @@
+"""
+Conversation history endpoint (paged from the latest checkpoint)
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from conftest import run
+
+
+@pytest.fixture
+def conversation(agent):
+    """Client plus a session with a few turns"""
+    session_id = agent.create_session()
+
+    async def converse():
+        for message in ("where is my order", "ORD-2024-001"):
+            await agent.process_message(session_id, message)
+
+    run(converse())
+    return TestClient(app), session_id
+
+
+def test_pages_cover_the_whole_window(conversation):
+    client, session_id = conversation
+    url = f"/api/session/{session_id}/history"
+
+    newest = client.get(url, params={"limit": 2}).json()
+    older = client.get(url, params={"limit": 1000, "before": newest["next_before"]}).json()
+
+    assert len(newest["messages"]) == 2
+    assert older["next_before"] is None
+    contents = [m["content"] for m in older["messages"] + newest["messages"]]
+    assert contents[0] == "where is my order"
+    assert "ORD-2024-001" in contents
+
+
+def test_unknown_cursor_is_rejected(conversation):
+    client, session_id = conversation
+
+    response = client.get(f"/api/session/{session_id}/history", params={"before": "no-such-message"})
+
+    assert response.status_code == 400
+
+
+def test_unsigned_session_is_not_found(conversation):
+    client, session_id = conversation
+    forged = session_id.partition(".")[0] + "." + "0" * 32
+
+    assert client.get(f"/api/session/{forged}/history").status_code == 404
+    assert client.get("/api/session/anything/history").status_code == 404
+
+
+def test_ndjson_returns_one_message_per_line(conversation):
+    client, session_id = conversation
+
+    response = client.get(f"/api/session/{session_id}/history", params={"format": "ndjson", "limit": 2})
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 2 and {"id", "role", "content", "timestamp"} <= set(lines[0])
+    assert response.headers["X-Next-Before"]
+
+
+def test_history_stops_at_the_compaction_window(agent, monkeypatch):
+    monkeypatch.setattr(settings, "message_history_window", 4)
+    client, session_id = TestClient(app), agent.create_session()
+
+    async def converse():
+        for _ in range(5):
+            for message in ("where is my order", "ORD-2024-001"):
+                await agent.process_message(session_id, message)
+
+    run(converse())
+    page = client.get(f"/api/session/{session_id}/history", params={"limit": 1000}).json()
+
+    assert page["next_before"] is None
+    assert page["compacted_messages"] > 0
+    assert len(page["messages"]) + page["compacted_messages"] >= 20
+    assert len(page["messages"]) < 20
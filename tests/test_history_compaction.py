@@ -0,0 +1,37 @@
+"""
+Checkpoint size over a long conversation (rolling history compaction)
+"""
+from app.core.config import settings
+from conftest import run
+
+
+TURNS = ["where is my order", "ORD-2024-001", "thanks, and where is my other order?", "ORD-2024-002"]
+
+
+async def _latest_checkpoint_bytes(db, session_id: str) -> int:
+    doc = await db.checkpoints.find_one({"thread_id": session_id}, sort=[("checkpoint_id", -1)])
+    return len(doc["checkpoint"])
+
+
+def test_checkpoint_size_stays_bounded(agent, orders_db):
+    session_id = agent.create_session()
+
+    async def converse():
+        sizes = []
+        for i in range(30):
+            for message in TURNS:
+                result = await agent.process_message(session_id, message)
+                assert result["success"], result
+            sizes.append(await _latest_checkpoint_bytes(orders_db, session_id))
+        state = await agent.graph.aget_state({"configurable": {"thread_id": session_id}})
+        return sizes, state.values
+
+    sizes, values = run(converse())
+
+    # 120 turns: the window holds the messages, the summary holds counters only
+    assert len(values["messages"]) <= settings.message_history_window + len(TURNS) * 3
+    assert values["history_summary"]["compacted_messages"] > 0
+    # Flat after the window fills (first rounds still grow into it)
+    steady = sizes[len(sizes) // 3:]
+    assert max(steady) <= min(steady) * 1.1
+    assert max(sizes) < 32 * 1024
@@ -0,0 +1,26 @@
+"""
+Startup index management
+"""
+import pytest
+
+from app.core.indexes import REQUIRED_INDEXES, ensure_indexes
+from conftest import run
+
+
+def test_creates_every_registered_index(mongo_db):
+    run(ensure_indexes(mongo_db))
+
+    for collection, specs in REQUIRED_INDEXES.items():
+        existing = [index["key"] for index in run(mongo_db[collection].index_information()).values()]
+        for spec in specs:
+            assert spec.keys in existing
+
+
+def test_duplicates_blocking_a_unique_index_abort_startup(mongo_db):
+    run(mongo_db.action_tickets.insert_many([
+        {"idempotency_key": "same", "ticket_id": "T-1"},
+        {"idempotency_key": "same", "ticket_id": "T-2"},
+    ]))
+
+    with pytest.raises(RuntimeError, match="idempotency_key"):
+        run(ensure_indexes(mongo_db))
@@ -0,0 +1,45 @@
+"""
+Local fast-path intent classifier
+"""
+import pytest
+
+from app.agent.intent_classifier import BagOfWordsModel, IntentClassifier
+
+
+@pytest.mark.parametrize("message, intent", [
+    ("I want to return my order", "return"),
+    ("Can I get a refund?", "refund"),
+    ("I'd like my money back", "refund"),
+    ("Where is my order?", "order_status"),
+    ("return ORD-2024-001", "return"),
+    ("refund for ORD-2024-002 please", "refund"),
+])
+def test_explicit_requests_skip_the_llm(message, intent):
+    prediction = IntentClassifier().predict(message)
+
+    assert prediction.confident
+    assert prediction.intent == intent
+
+
+@pytest.mark.parametrize("message", [
+    "What is your return policy?",
+    "Where is my refund?",
+    "I want to return my order and get a refund",
+    "Thanks for the help",
+])
+def test_bare_keywords_and_conflicts_go_to_the_llm(message):
+    prediction = IntentClassifier().predict(message)
+
+    assert prediction is None or not prediction.confident
+
+
+def test_model_tier_respects_threshold():
+    model = BagOfWordsModel(
+        ["return", "other"],
+        {"return": 0.0, "other": 0.0},
+        {"policy": {"return": 1.0}}
+    )
+
+    # p(return) = e / (1 + e) ~ 0.73
+    assert not IntentClassifier(model, threshold=0.9).predict("What is your return policy?").confident
+    assert IntentClassifier(model, threshold=0.7).predict("What is your return policy?").confident
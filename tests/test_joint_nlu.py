@@ -0,0 +1,65 @@
+"""
+Joint NLU: intent, order number and action preference from one structured call
+"""
+from langchain_core.messages import HumanMessage
+
+from app.agent.workers.joint_nlu import joint_nlu_worker
+from conftest import run
+
+
+class _Intake:
+    """Records delegation to the regular intake step"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, state):
+        self.calls += 1
+        return {"intent": "delegated"}
+
+
+def _state(text: str, **fields) -> dict:
+    return {"messages": [HumanMessage(content=text)], **fields}
+
+
+def test_one_call_fills_intent_and_order_number(fake_llm):
+    intake = _Intake()
+    update = run(joint_nlu_worker(_state("the jacket from ord-2024-002 doesn't fit, can I send it"), fake_llm, intake))
+
+    assert (update["intent"], update["order_number"]) == ("return", "ORD-2024-002")
+    assert (fake_llm.calls, intake.calls) == (1, 0)
+
+
+def test_missing_order_number_is_left_to_slot_filler(fake_llm):
+    update = run(joint_nlu_worker(_state("I'd like my money back"), fake_llm, _Intake()))
+
+    assert update["intent"] == "refund"
+    assert update["action_preference"] == "refund"
+    assert update["nlu_extracted"] is True
+    assert "order_number" not in update
+
+
+def test_locally_resolvable_message_skips_the_llm(fake_llm):
+    intake = _Intake()
+    update = run(joint_nlu_worker(_state("I want to return order ORD-2024-001"), fake_llm, intake))
+
+    assert update == {"intent": "delegated"}
+    assert (fake_llm.calls, intake.calls) == (0, 1)
+
+
+def test_mid_flow_turn_delegates(fake_llm):
+    intake = _Intake()
+    run(joint_nlu_worker(_state("yes", intent="return"), fake_llm, intake))
+
+    assert (fake_llm.calls, intake.calls) == (0, 1)
+
+
+def test_failed_call_falls_back_to_intake(fake_llm, monkeypatch):
+    async def broken(self, messages, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(type(fake_llm.with_structured_output(None)), "ainvoke", broken)
+    intake = _Intake()
+
+    assert run(joint_nlu_worker(_state("I'd like my money back"), fake_llm, intake)) == {"intent": "delegated"}
+    assert intake.calls == 1
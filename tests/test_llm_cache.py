@@ -0,0 +1,96 @@
+"""
+LLM response cache (in-process tier plus the shared MongoDB tier)
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.core.database as database
+from app.agent.llm_cache import LLM_CACHE_COLLECTION, LLMResponseCache
+from app.core.config import settings
+from conftest import run
+
+
+class _LLM:
+    """compute() stand-in counting calls"""
+
+    def __init__(self, answer: str = "return"):
+        self.answer = answer
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        return self.answer
+
+
+def test_prompt_or_model_change_invalidates_keys(monkeypatch):
+    key = LLMResponseCache("intent", "prompt v1").key("Where is my order?")
+
+    assert LLMResponseCache("intent", "prompt v2").key("Where is my order?") != key
+    monkeypatch.setattr(settings, "openai_model", "another-model")
+    assert LLMResponseCache("intent", "prompt v1").key("Where is my order?") != key
+
+
+def test_normalized_variants_share_an_entry():
+    cache = LLMResponseCache("intent", "prompt")
+    llm = _LLM()
+
+    async def ask_variants():
+        for message in ("Where is my order?", "  where IS my   order "):
+            await cache.get_or_compute(message, llm)
+
+    run(ask_variants())
+
+    assert llm.calls == 1
+
+
+def test_local_entries_expire():
+    cache = LLMResponseCache("intent", "prompt")
+    cache.local.ttl_seconds = 0.01
+    llm = _LLM()
+
+    async def ask_after_expiry():
+        await cache.get_or_compute("Where is my order?", llm)
+        await asyncio.sleep(0.02)
+        await cache.get_or_compute("Where is my order?", llm)
+
+    run(ask_after_expiry())
+
+    assert llm.calls == 2
+
+
+@pytest.fixture
+def shared_tier(mongo_db, monkeypatch):
+    monkeypatch.setattr(settings, "llm_cache_shared", True)
+    monkeypatch.setattr(database.db, "db", mongo_db)
+    return mongo_db[LLM_CACHE_COLLECTION]
+
+
+def test_shared_tier_serves_other_workers(shared_tier):
+    # Separate instances = separate processes' in-process tiers
+    worker_a, worker_b = LLMResponseCache("intent", "prompt"), LLMResponseCache("intent", "prompt")
+    llm = _LLM("refund")
+
+    async def ask_on_both():
+        return await worker_a.get_or_compute("money back", llm), await worker_b.get_or_compute("money back", llm)
+
+    assert run(ask_on_both()) == ("refund", "refund")
+    assert llm.calls == 1
+
+
+def test_expired_shared_entries_are_not_served(shared_tier):
+    cache = LLMResponseCache("intent", "prompt")
+    llm = _LLM("refund")
+
+    async def ask_with_stale_entry():
+        # The TTL monitor deletes expired documents only periodically
+        await shared_tier.insert_one({
+            "_id": cache.key("money back"),
+            "value": "return",
+            "expires_at": datetime.now(timezone.utc) - timedelta(seconds=1),
+        })
+        return await cache.get_or_compute("money back", llm)
+
+    assert run(ask_with_stale_entry()) == "refund"
+    assert llm.calls == 1
@@ -0,0 +1,51 @@
+"""
+Queued logging
+"""
+import json
+import logging
+
+import pytest
+
+from app.core.config import settings
+from app.core.logging import configure_logging, shutdown_logging
+
+
+@pytest.fixture
+def log_output(capsys):
+    """Reconfigure logging so the writer thread prints to the captured stdout"""
+    def flushed_output() -> str:
+        shutdown_logging()  # stops the listener after it drained the queue
+        return capsys.readouterr().out
+
+    shutdown_logging()
+    yield flushed_output
+    shutdown_logging()
+    configure_logging(settings.log_level, settings.log_format)
+
+
+def test_arguments_are_rendered_when_logged(log_output):
+    configure_logging("DEBUG")
+    update = {"intent": "return"}
+
+    logging.getLogger("app.test").debug("updated %s", update.keys())
+    update["order"] = {}
+
+    assert "updated dict_keys(['intent'])" in log_output()
+
+
+def test_json_lines_carry_extra_fields(log_output):
+    configure_logging("INFO", "json")
+
+    logging.getLogger("app.test").info("turn done", extra={"thread_id": "t-1"})
+
+    line = json.loads(log_output().strip().splitlines()[-1])
+    assert line["message"] == "turn done"
+    assert (line["level"], line["logger"], line["thread_id"]) == ("INFO", "app.test", "t-1")
+
+
+def test_level_filters_before_queueing(log_output):
+    configure_logging("INFO")
+
+    logging.getLogger("app.test").debug("hidden")
+
+    assert "hidden" not in log_output()
@@ -0,0 +1,116 @@
+"""
+Order cache: singleflight loads and invalidation
+"""
+import asyncio
+
+import pytest
+
+from app.core.indexes import REQUIRED_INDEXES
+from app.services import order_cache as order_cache_module
+from app.services import ticket_service as ticket_service_module
+from app.services.order_cache import OrderCache
+from app.services.order_filter import OrderNumberFilter
+from app.services.ticket_service import TicketService
+from conftest import run
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """
+    Order numbers OrderCache queried (one find_one each)
+
+    Queries yield to the loop first so concurrent lookups overlap; set
+    `queries.fail` to make the next query raise.
+    """
+    class Recorder(list):
+        fail = False
+
+    queried = Recorder()
+    original = OrderCache._query
+
+    async def counting_query(db, order_number):
+        queried.append(order_number)
+        await asyncio.sleep(0.01)
+        if queried.fail:
+            queried.fail = False
+            raise ConnectionError("primary stepped down")
+        return await original(db, order_number)
+
+    monkeypatch.setattr(OrderCache, "_query", staticmethod(counting_query))
+    # Unbuilt filter: every order number is possibly present
+    monkeypatch.setattr(order_cache_module, "order_filter", OrderNumberFilter(1000, 0.001))
+    return queried
+
+
+def test_concurrent_misses_share_one_query(orders_db, queries):
+    cache = OrderCache(100, 60, 60)
+
+    async def lookup_concurrently():
+        return await asyncio.gather(*(cache.get(orders_db, "ORD-2024-001") for _ in range(50)))
+
+    orders = run(lookup_concurrently())
+
+    assert queries == ["ORD-2024-001"]
+    assert all(order["order_number"] == "ORD-2024-001" for order in orders)
+
+
+def test_failed_load_is_not_cached(orders_db, queries):
+    cache = OrderCache(100, 60, 60)
+    queries.fail = True
+
+    async def lookup():
+        failed = await asyncio.gather(*(cache.get(orders_db, "ORD-2024-001") for _ in range(5)), return_exceptions=True)
+        return failed, await cache.get(orders_db, "ORD-2024-001")
+
+    failed, retried = run(lookup())
+
+    assert all(isinstance(result, ConnectionError) for result in failed)
+    assert retried["order_number"] == "ORD-2024-001"
+    assert queries == ["ORD-2024-001", "ORD-2024-001"]
+
+
+def test_cancelled_caller_does_not_fail_the_others(orders_db, queries):
+    cache = OrderCache(100, 60, 60)
+
+    async def lookup():
+        first = asyncio.create_task(cache.get(orders_db, "ORD-2024-001"))
+        second = asyncio.create_task(cache.get(orders_db, "ORD-2024-001"))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert run(lookup())["order_number"] == "ORD-2024-001"
+    assert queries == ["ORD-2024-001"]
+
+
+def test_invalidate_evicts_positive_and_negative_entries(orders_db, queries):
+    cache = OrderCache(100, 60, 60)
+
+    async def lookup_invalidate_lookup():
+        await cache.get(orders_db, "ORD-2024-001")
+        await cache.get(orders_db, "ORD-1999-000")
+        cache.invalidate("ORD-2024-001")
+        cache.invalidate("ORD-1999-000")
+        await cache.get(orders_db, "ORD-2024-001")
+        await cache.get(orders_db, "ORD-1999-000")
+
+    run(lookup_invalidate_lookup())
+
+    assert queries == ["ORD-2024-001", "ORD-1999-000"] * 2
+
+
+def test_new_ticket_invalidates_the_order(orders_db, queries, monkeypatch):
+    cache = OrderCache(100, 60, 60)
+    monkeypatch.setattr(ticket_service_module, "order_cache", cache)
+
+    async def lookup_ticket_lookup():
+        for spec in REQUIRED_INDEXES["action_tickets"]:
+            await orders_db.action_tickets.create_index(spec.keys, unique=spec.unique)
+        await cache.get(orders_db, "ORD-2024-001")
+        await cache.get(orders_db, "ORD-2024-001")
+        await TicketService(orders_db).create_or_get("ORD-2024-001", "return", "RET-1")
+        await cache.get(orders_db, "ORD-2024-001")
+
+    run(lookup_ticket_lookup())
+
+    assert queries == ["ORD-2024-001", "ORD-2024-001"]
@@ -0,0 +1,120 @@
+"""
+Order number Bloom filter and the order cache's handling of its negatives
+"""
+import copy
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+
+from app.core.metrics import metrics
+from app.fixtures.orders import SAMPLE_ORDERS
+from app.services import order_cache as order_cache_module
+from app.services.order_cache import OrderCache
+from app.services.order_filter import OrderNumberFilter
+from conftest import run
+
+
+def _new_order(order_number: str) -> dict:
+    order = copy.deepcopy(SAMPLE_ORDERS[0])
+    order["order_number"] = order_number
+    return order
+
+
+def test_persisted_filter_is_rebuilt_for_another_database(orders_db, tmp_path):
+    path = tmp_path / "order_filter.bin"
+    run(OrderNumberFilter(1000, 0.001, path).load_or_build(orders_db))
+
+    # Same orders plus one with an older _id, as after a restore into another database
+    other_db = AsyncMongoMockClient()["restored"]
+    run(other_db.orders.insert_many(copy.deepcopy(SAMPLE_ORDERS) + [_new_order("ORD-2023-999")]))
+
+    restored = OrderNumberFilter(1000, 0.001, path)
+    run(restored.load_or_build(other_db))
+
+    assert restored.might_contain("ORD-2023-999")
+
+
+def test_persisted_filter_is_rebuilt_when_older_orders_change(orders_db, tmp_path):
+    path = tmp_path / "order_filter.bin"
+    run(OrderNumberFilter(1000, 0.001, path).load_or_build(orders_db))
+
+    # Backfilled order whose _id sorts before the recorded last_id (the refresh never scans it)
+    backfill = _new_order("ORD-2024-900")
+    backfill["_id"] = ObjectId.from_datetime(datetime(2020, 1, 1))
+    run(orders_db.orders.insert_one(backfill))
+
+    reloaded = OrderNumberFilter(1000, 0.001, path)
+    run(reloaded.load_or_build(orders_db))
+
+    assert reloaded.might_contain("ORD-2024-900")
+
+
+def test_persisted_filter_is_reused_for_the_same_database(orders_db, tmp_path):
+    path = tmp_path / "order_filter.bin"
+    run(OrderNumberFilter(1000, 0.001, path).load_or_build(orders_db))
+
+    reloaded = OrderNumberFilter(1000, 0.001, path)
+    run(reloaded.load_or_build(orders_db))
+
+    assert reloaded.ready
+    assert all(reloaded.might_contain(order["order_number"]) for order in SAMPLE_ORDERS)
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """Order numbers OrderCache actually queried"""
+    queried = []
+    original = OrderCache._query
+
+    async def counting_query(db, order_number):
+        queried.append(order_number)
+        return await original(db, order_number)
+
+    monkeypatch.setattr(OrderCache, "_query", staticmethod(counting_query))
+    return queried
+
+
+def _use_filter(monkeypatch, order_filter: OrderNumberFilter) -> OrderNumberFilter:
+    monkeypatch.setattr(order_cache_module, "order_filter", order_filter)
+    return order_filter
+
+
+def test_filter_negative_skips_mongodb(orders_db, monkeypatch, queries):
+    order_filter = _use_filter(monkeypatch, OrderNumberFilter(1000, 0.001))
+    run(order_filter.load_or_build(orders_db))
+    saved = metrics.counter("order_cache_round_trips_saved_total", reason="bloom")
+    before = saved.value
+
+    assert run(OrderCache(100, 60, 60).get(orders_db, "ORD-1999-000")) is None
+    assert queries == []
+    assert saved.value == before + 1
+
+
+def test_order_inserted_elsewhere_is_found_after_refresh(orders_db, monkeypatch, queries):
+    order_filter = _use_filter(monkeypatch, OrderNumberFilter(1000, 0.001))
+    run(order_filter.load_or_build(orders_db))
+    cache = OrderCache(100, 60, 60)
+
+    # Written by another process after the filter was built
+    run(orders_db.orders.insert_one(_new_order("ORD-2025-777")))
+    assert run(cache.get(orders_db, "ORD-2025-777")) is None
+
+    run(order_filter.refresh(orders_db))
+    order = run(cache.get(orders_db, "ORD-2025-777"))
+
+    assert order is not None and order["order_number"] == "ORD-2025-777"
+    assert queries == ["ORD-2025-777"]
+
+
+def test_miss_passing_the_filter_is_negatively_cached(orders_db, monkeypatch, queries):
+    # Not built yet: every order number is possibly present
+    _use_filter(monkeypatch, OrderNumberFilter(1000, 0.001))
+    cache = OrderCache(100, 60, 60)
+
+    async def lookup_twice():
+        return await cache.get(orders_db, "ORD-1999-000"), await cache.get(orders_db, "ORD-1999-000")
+
+    assert run(lookup_twice()) == (None, None)
+    assert queries == ["ORD-1999-000"]
@@ -0,0 +1,45 @@
+"""
+Local order-number recognizer
+"""
+import pytest
+
+from app.agent.order_numbers import OrderNumberRecognizer
+
+
+@pytest.fixture
+def recognizer():
+    return OrderNumberRecognizer(["ORD"])
+
+
+@pytest.mark.parametrize("message, order_number", [
+    ("ORD-2024-001", "ORD-2024-001"),
+    ("my order is ord 2024 001", "ORD-2024-001"),
+    ("ORD-2024-0001", "ORD-2024-001"),
+    ("2024-0001", "ORD-2024-001"),
+    ("2024-001", "ORD-2024-001"),
+    ("2024-2001", "ORD-2024-2001"),
+    ("ORD-2024-2025", "ORD-2024-2025"),
+    ("for the 2024-2025 season, order 2024-007", "ORD-2024-007"),
+    ("0RD-2024-001", "ORD-2024-001"),
+    ("order ABC-123456", "ABC-123456"),
+    ("my order number is 1234567890", "1234567890"),
+])
+def test_recognizes_and_canonicalizes(recognizer, message, order_number):
+    assert recognizer.recognize(message).order_number == order_number
+
+
+@pytest.mark.parametrize("message", [
+    "call me at 5551234567",
+    "my phone is 555-1234567",
+    "I want to return my order",
+])
+def test_phone_numbers_are_not_orders(recognizer, message):
+    assert recognizer.recognize(message) is None
+
+
+@pytest.mark.parametrize("message", [
+    "we ordered for the 2024-2025 season",
+    "the 2019-2020 catalogue",
+])
+def test_year_ranges_are_not_orders(recognizer, message):
+    assert recognizer.recognize(message) is None
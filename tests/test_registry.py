@@ -0,0 +1,68 @@
+"""
+Worker registry validation and the graph built from it
+"""
+from typing import get_args
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END
+
+from app.agent.graph import create_agent_graph
+from app.agent.registry import END_ROUTE, WORKERS, WorkerSpec, validate_registry
+from app.agent.supervisor import Route, build_routing_table
+
+DEPS = {"llm": None, "db": None, "speculative": False, "joint_nlu": False}
+
+
+def _routes():
+    return build_routing_table().values()
+
+
+def test_shipped_registry_is_valid():
+    validate_registry(WORKERS, _routes(), DEPS)
+
+
+def test_duplicate_node_name_is_rejected():
+    spec = next(spec for spec in WORKERS if spec.name == "finalize")
+    duplicate = WorkerSpec("finalize", spec.worker, route="finalize_again")
+
+    with pytest.raises(ValueError, match=r"duplicate node names: \['finalize'\]"):
+        validate_registry(WORKERS + (duplicate,), list(_routes()) + ["finalize_again"], DEPS)
+
+
+def test_route_without_a_node_is_rejected():
+    workers = tuple(spec for spec in WORKERS if spec.name != "email")
+
+    with pytest.raises(ValueError, match=r"routes without a registered node: \['send_email'\]"):
+        validate_registry(workers, _routes(), DEPS)
+
+
+def test_missing_entry_point_is_rejected():
+    # Keep the route resolvable so only the entry point is reported
+    workers = tuple(
+        WorkerSpec("intake", spec.worker, spec.deps, route=spec.route) if spec.name == "classify_intent" else spec
+        for spec in WORKERS
+    )
+
+    with pytest.raises(ValueError, match=r"^Invalid worker registry: entry point 'classify_intent' is not registered$"):
+        validate_registry(workers, _routes(), DEPS)
+
+
+def test_missing_dependency_is_rejected():
+    deps = {key: value for key, value in DEPS.items() if key != "db"}
+
+    with pytest.raises(ValueError, match="order_lookup needs missing dependencies"):
+        validate_registry(WORKERS, _routes(), deps)
+
+
+def test_graph_keeps_the_supervisor_route_names(fake_llm):
+    graph = create_agent_graph(fake_llm, None, MemorySaver())
+    expected = {route: route for route in get_args(Route)}
+    expected.update({"send_email": "email", END_ROUTE: END})
+
+    for spec in WORKERS:
+        if spec.terminal:
+            assert (spec.name, END) in graph.builder.edges
+            continue
+        (branch,) = graph.builder.branches[spec.name].values()
+        assert branch.ends == expected, spec.name
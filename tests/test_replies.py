@@ -0,0 +1,57 @@
+"""
+Workers return only their new messages (delta updates)
+"""
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.agent.replies import ask, reply
+from app.agent.workers.confirm_details import confirm_details_worker
+from app.agent.workers.finalize import finalize_worker
+from app.agent.workers.order_lookup import lookup_result
+from app.agent.workers.show_order_status import show_order_status_worker
+from app.fixtures.orders import SAMPLE_ORDERS
+from conftest import run
+
+
+def _history(turns: int):
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"message {i}"))
+        messages.append(AIMessage(content=f"reply {i}"))
+    return messages
+
+
+def test_reply_is_a_single_message_delta():
+    update = reply("Hello")
+
+    assert list(update) == ["messages"]
+    assert len(update["messages"]) == 1
+    assert update["messages"][0].additional_kwargs["timestamp"]
+    assert ask("Order number?")["awaiting_user"] is True
+
+
+def test_workers_do_not_return_the_history():
+    history = _history(20)
+    order = lookup_result("ORD-2024-001", SAMPLE_ORDERS[0])["order"]
+    state = {"messages": history, "intent": "order_status", "order_number": "ORD-2024-001", "order": order}
+
+    for worker in (confirm_details_worker, show_order_status_worker, finalize_worker):
+        update = run(worker(dict(state)))
+        new_messages = update.get("messages", [])
+        assert len(new_messages) == 1, worker.__name__
+        assert all(m not in history for m in new_messages), worker.__name__
+
+
+def test_graph_history_has_no_duplicate_messages(agent):
+    session_id = agent.create_session()
+
+    async def converse():
+        for message in ("where is my order", "ORD-2024-001", "thanks"):
+            await agent.process_message(session_id, message)
+        state = await agent.graph.aget_state({"configurable": {"thread_id": session_id}})
+        return state.values["messages"]
+
+    messages = run(converse())
+    ids = [m.id for m in messages]
+
+    assert len(ids) == len(set(ids))
+    assert [m.content for m in messages if isinstance(m, HumanMessage)] == ["where is my order", "ORD-2024-001", "thanks"]
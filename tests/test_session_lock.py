@@ -0,0 +1,179 @@
+"""
+Per-session turn serialization and coalescing
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import app.core.database as database
+from app.services import agent_service as agent_service_module
+from app.services.session_lock import SESSION_LEASE_COLLECTION, SessionLocks, session_locks
+from conftest import run
+
+
+class _Turns:
+    """Stand-in for AgentService._run_turn whose turns finish when released"""
+
+    def __init__(self):
+        self.messages = []
+        self.gates = []
+
+    async def __call__(self, session_id, message):
+        gate = asyncio.Event()
+        self.messages.append(message)
+        self.gates.append(gate)
+        await gate.wait()
+        return {"success": True, "messages": [f"reply to {message}"]}
+
+    async def started(self, count: int):
+        while len(self.gates) < count:
+            await asyncio.sleep(0.001)
+
+
+@pytest.fixture
+def turns(agent, monkeypatch):
+    stand_in = _Turns()
+    monkeypatch.setattr(agent, "_run_turn", stand_in)
+    return stand_in
+
+
+def test_turns_on_one_session_are_serialized():
+    locks = SessionLocks("local", 30, 5)
+    events = []
+
+    async def turn(name):
+        async with locks.hold("session-1"):
+            events.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} end")
+
+    async def run_two():
+        await asyncio.gather(turn("a"), turn("b"))
+
+    run(run_two())
+
+    assert events == ["a start", "a end", "b start", "b end"]
+    assert not locks._locks
+
+
+def test_queued_messages_are_coalesced_into_one_turn(agent, turns):
+    session_id = agent.create_session()
+
+    async def send_while_busy():
+        first = asyncio.create_task(agent.process_message(session_id, "where is my order"))
+        await turns.started(1)
+        queued = [asyncio.create_task(agent.process_message(session_id, m)) for m in ("ORD-2024-001", "ORD-2024-001", "thanks")]
+        await asyncio.sleep(0.01)
+        turns.gates[0].set()
+        await turns.started(2)
+        turns.gates[1].set()
+        return await first, await asyncio.gather(*queued)
+
+    first, queued = run(send_while_busy())
+
+    assert turns.messages == ["where is my order", "ORD-2024-001\nthanks"]
+    assert first["messages"] == ["reply to where is my order"]
+    assert all(result == {"success": True, "messages": ["reply to ORD-2024-001\nthanks"]} for result in queued)
+
+
+def test_cancelled_holder_hands_its_batch_to_the_next(agent, turns):
+    session_id = agent.create_session()
+
+    async def cancel_the_coalesced_turn():
+        first = asyncio.create_task(agent.process_message(session_id, "one"))
+        await turns.started(1)
+        second = asyncio.create_task(agent.process_message(session_id, "two"))
+        third = asyncio.create_task(agent.process_message(session_id, "three"))
+        await asyncio.sleep(0.01)
+        turns.gates[0].set()
+        await turns.started(2)  # "two" holds the lock and runs "two\nthree"
+        second.cancel()
+        await turns.started(3)
+        turns.gates[2].set()
+        await first
+        return await third
+
+    third = run(cancel_the_coalesced_turn())
+
+    assert turns.messages == ["one", "two\nthree", "three"]
+    assert third["messages"] == ["reply to three"]
+
+
+def test_lock_timeout_returns_the_busy_message(agent, turns, monkeypatch):
+    monkeypatch.setattr(session_locks, "timeout_seconds", 0.05)
+    session_id = agent.create_session()
+
+    async def send_while_busy():
+        first = asyncio.create_task(agent.process_message(session_id, "one"))
+        await turns.started(1)
+        busy = await agent.process_message(session_id, "two")
+        turns.gates[0].set()
+        await first
+        return busy
+
+    busy = run(send_while_busy())
+
+    assert busy["success"] is False
+    assert busy["messages"] == [agent_service_module.BUSY_MESSAGE]
+    assert turns.messages == ["one"]
+
+
+@pytest.fixture
+def leases(mongo_db, monkeypatch):
+    monkeypatch.setattr(database.db, "db", mongo_db)
+    return mongo_db[SESSION_LEASE_COLLECTION]
+
+
+def test_mongo_lease_serializes_workers(leases):
+    workers = [SessionLocks("mongo", 30, 5) for _ in range(2)]
+    events = []
+
+    async def turn(locks, name):
+        async with locks.hold("session-1"):
+            events.append(f"{name} start")
+            await asyncio.sleep(0.05)
+            events.append(f"{name} end")
+
+    async def run_two():
+        await asyncio.gather(turn(workers[0], "a"), turn(workers[1], "b"))
+        return await leases.count_documents({})
+
+    assert run(run_two()) == 0  # released on exit
+    assert events in (["a start", "a end", "b start", "b end"], ["b start", "b end", "a start", "a end"])
+
+
+def test_abandoned_lease_expires(leases):
+    locks = SessionLocks("mongo", 30, 5)
+
+    async def acquire_after_dead_worker():
+        await leases.insert_one({"_id": "session-1", "owner": "dead-worker", "expires_at": datetime.utcnow() + timedelta(seconds=0.1)})
+        started = asyncio.get_running_loop().time()
+        async with locks.hold("session-1"):
+            owner = (await leases.find_one({"_id": "session-1"}))["owner"]
+        return owner, asyncio.get_running_loop().time() - started
+
+    owner, waited = run(acquire_after_dead_worker())
+
+    assert owner == locks.owner
+    assert waited >= 0.05
+
+
+def test_lease_is_renewed_while_held(leases):
+    holder = SessionLocks("mongo", 0.15, 5)
+    other = SessionLocks("mongo", 0.15, 0.2)
+
+    async def hold_past_the_lease():
+        async with holder.hold("session-1"):
+            first = (await leases.find_one({"_id": "session-1"}))["expires_at"]
+            # Longer than the lease: only renewal keeps the other worker out
+            with pytest.raises(TimeoutError):
+                async with other.hold("session-1"):
+                    pass
+            await asyncio.sleep(0.1)
+            renewed = (await leases.find_one({"_id": "session-1"}))["expires_at"]
+        return first, renewed
+
+    first, renewed = run(hold_past_the_lease())
+
+    assert renewed > first
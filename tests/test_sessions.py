@@ -0,0 +1,98 @@
+"""
+Signed session IDs and buffered session metadata
+"""
+import asyncio
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.auth import issue_session_id, verify_session_id
+from app.core.config import settings
+from app.main import app
+from app.services.session_metadata import SESSION_COLLECTION, SessionMetadataWriter
+from conftest import run
+
+
+def test_issued_session_id_verifies():
+    assert verify_session_id(issue_session_id())
+
+
+@pytest.mark.parametrize("tamper", [
+    lambda sid: sid[:-1] + ("0" if sid[-1] != "0" else "1"),
+    lambda sid: "f" + sid[1:] if sid[0] != "f" else "e" + sid[1:],
+    lambda sid: sid.partition(".")[0],
+    lambda sid: "not-a-session",
+])
+def test_tampered_session_id_is_rejected(tamper):
+    assert not verify_session_id(tamper(issue_session_id()))
+
+
+def test_resolve_session_keeps_only_valid_ids(agent):
+    session_id = agent.create_session()
+
+    assert run(agent.resolve_session(session_id)) == session_id
+    assert run(agent.resolve_session(session_id + "x")) != session_id + "x"
+    assert verify_session_id(run(agent.resolve_session(None)))
+
+
+@pytest.fixture
+def legacy_session(agent):
+    """Unsigned UUID session with a conversation from before IDs were signed"""
+    session_id = str(uuid.uuid4())
+    run(agent.process_message(session_id, "where is my order"))
+    return session_id
+
+
+def test_legacy_session_with_a_checkpoint_is_resumed(agent, legacy_session):
+    client = TestClient(app)
+
+    assert run(agent.resolve_session(legacy_session)) == legacy_session
+    history = client.get(f"/api/session/{legacy_session}/history")
+    assert history.status_code == 200
+    assert history.json()["messages"][0]["content"] == "where is my order"
+
+
+@pytest.mark.parametrize("session_id", [
+    str(uuid.uuid4()),  # never had a conversation
+    uuid.uuid4().hex,  # not the legacy format
+])
+def test_unknown_unsigned_session_is_replaced(agent, session_id):
+    assert not run(agent.is_known_session(session_id))
+    assert verify_session_id(run(agent.resolve_session(session_id)))
+    assert TestClient(app).get(f"/api/session/{session_id}/history").status_code == 404
+
+
+def test_legacy_sessions_can_be_turned_off(agent, legacy_session, monkeypatch):
+    monkeypatch.setattr(settings, "legacy_session_ids_enabled", False)
+
+    assert run(agent.resolve_session(legacy_session)) != legacy_session
+
+
+def test_metadata_is_written_in_batches(mongo_db):
+    writer = SessionMetadataWriter(batch_size=3, flush_interval_seconds=60)
+    collection = mongo_db[SESSION_COLLECTION]
+
+    async def record_sessions():
+        writer.start(mongo_db)
+        for _ in range(2):
+            writer.record(issue_session_id(), "user@example.com")
+        await asyncio.sleep(0.01)
+        buffered = await collection.count_documents({})
+
+        writer.record(issue_session_id())  # fills the batch
+        await asyncio.sleep(0.01)
+        flushed = await collection.count_documents({})
+
+        writer.record(issue_session_id())
+        await writer.stop()
+        return buffered, flushed, await collection.count_documents({})
+
+    assert run(record_sessions()) == (0, 3, 4)
+
+
+def test_metadata_is_not_buffered_when_the_writer_is_off():
+    writer = SessionMetadataWriter(batch_size=3, flush_interval_seconds=60)
+    writer.record(issue_session_id())
+
+    assert writer._buffer == []
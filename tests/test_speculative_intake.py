@@ -0,0 +1,58 @@
+"""
+Speculative intake: classification overlapped with order extraction and prefetch
+"""
+import pytest
+from langchain_core.messages import HumanMessage
+
+from app.agent.graph import create_agent_graph
+from app.agent.workers.speculative_intake import speculative_intake_worker
+from app.core import database
+from app.core.metrics import metrics
+from conftest import run
+
+
+def _state(text: str) -> dict:
+    return {"messages": [HumanMessage(content=text)]}
+
+
+def test_order_intent_commits_the_prefetched_order(orders_db, fake_llm):
+    update = run(speculative_intake_worker(_state("I want to return order ORD-2024-001"), fake_llm, orders_db))
+
+    assert update["intent"] == "return"
+    assert update["order_number"] == "ORD-2024-001"
+    assert update["order"]["order_id"] == "ORD-2024-001"
+
+
+def test_prefetch_is_discarded_when_no_order_is_needed(orders_db, fake_llm):
+    update = run(speculative_intake_worker(_state("hello, ORD-2024-001 here"), fake_llm, orders_db))
+
+    assert update["intent"] == "other"
+    assert "order" not in update and "order_number" not in update
+
+
+def test_message_without_order_number_is_not_speculated(orders_db, fake_llm):
+    update = run(speculative_intake_worker(_state("I want to return something"), fake_llm, orders_db))
+
+    assert update["intent"] == "return"
+    assert "order_number" not in update
+
+
+@pytest.mark.parametrize("message", ["I want to return order ORD-2024-001", "where is ORD-2024-002"])
+def test_speculative_graph_ends_in_the_same_state(agent, fake_llm, orders_db, message):
+    checkpointer = database.db.checkpointer
+
+    committed = metrics.counter("speculative_intake_total", result="committed")
+
+    agent.graph = create_agent_graph(fake_llm, orders_db, checkpointer, speculative=False)
+    before = committed.value
+    sequential_result = run(agent.process_message(agent.create_session(), message))
+    assert committed.value == before  # slot_filler and order_lookup ran as their own nodes
+
+    agent.graph = create_agent_graph(fake_llm, orders_db, checkpointer, speculative=True)
+    speculative_result = run(agent.process_message(agent.create_session(), message))
+    assert committed.value == before + 1
+
+    assert sequential_result["success"] and speculative_result["success"]
+    assert speculative_result["state"] == sequential_result["state"]
+    assert speculative_result["state"]["has_order"]
+    assert len(speculative_result["messages"]) == len(sequential_result["messages"])
@@ -0,0 +1,126 @@
+"""
+Supervisor routing table vs. the original nested-conditional router
+"""
+from itertools import product
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.agent.supervisor import SIGNATURE_DOMAINS, build_routing_table, create_supervisor_router
+
+
+ORDER = {"order_number": "ORD-2024-001", "status": "delivered"}
+
+# Last assistant message the baseline inspected, per (status_shown, awaiting_user)
+LAST_MESSAGE = {
+    (False, False): "Great! Let me look up order ORD-2024-001 for you...",
+    (False, True): "What's your order number?",
+    (True, False): "Order #ORD-2024-001\n• Status: Delivered",
+    (True, True): "Order #ORD-2024-001\n• Status: Delivered\n\nAnything else I can help with?",
+}
+
+
+def baseline_route(state) -> str:
+    """The router as it was before the transition table (prints removed)"""
+    if state.get("error"):
+        return "__end__"
+    if state.get("conversation_complete"):
+        return "__end__"
+
+    messages = state.get("messages", [])
+    intent = state.get("intent")
+
+    if intent == "order_status" and state.get("order"):
+        if messages and isinstance(messages[-1], AIMessage):
+            last_msg = messages[-1].content
+            if "Order #" in last_msg or "• Status:" in last_msg or "• Delivery:" in last_msg:
+                return "finalize"
+            return "show_order_status"
+
+    if messages and isinstance(messages[-1], AIMessage):
+        last_content = messages[-1].content
+        if "?" in last_content or "please" in last_content.lower():
+            return "__end__"
+
+    if not state.get("intent"):
+        return "classify_intent"
+    if intent in ["return", "refund", "order_status"] and not state.get("order_number"):
+        return "slot_filler"
+    if state.get("order_number") and not state.get("order"):
+        return "order_lookup"
+    if state.get("order") and state.get("user_confirmed_order") is None and intent in ["return", "refund"]:
+        return "confirm_details"
+    if state.get("user_confirmed_order") is False:
+        return "finalize"
+    if state.get("user_confirmed_order") and not state.get("eligibility"):
+        return "policy_check"
+    eligibility = state.get("eligibility", {})
+    if eligibility.get("eligible") and not state.get("desired_action"):
+        return "decide_action"
+    if eligibility and not eligibility.get("eligible"):
+        return "finalize"
+    desired_action = state.get("desired_action")
+    action_ticket = state.get("action_ticket", {})
+    if desired_action == "return" and not action_ticket.get("id"):
+        return "process_return"
+    if desired_action == "refund" and not action_ticket.get("id"):
+        return "process_refund"
+    if action_ticket.get("id") and not state.get("email_status"):
+        return "send_email"
+    return "finalize"
+
+
+def _states(signature):
+    """Equivalent (baseline, table) states for one routing signature"""
+    (intent, has_order_number, has_order, confirmed, has_eligibility, eligible,
+     desired_action, has_ticket, has_email_status, status_shown, awaiting_user) = signature
+
+    fields = {
+        "intent": intent,
+        "order_number": "ORD-2024-001" if has_order_number else None,
+        "order": ORDER if has_order else None,
+        "user_confirmed_order": confirmed,
+        "eligibility": {"eligible": eligible} if has_eligibility else {},
+        "desired_action": desired_action,
+        "action_ticket": {"id": "RET-1"} if has_ticket else {},
+        "email_status": "queued" if has_email_status else None,
+    }
+    last_message = AIMessage(content=LAST_MESSAGE[(status_shown, awaiting_user)])
+    baseline = {**fields, "messages": [HumanMessage(content="hi"), last_message]}
+    table = {
+        **fields,
+        "messages": [],
+        "phase": "status_shown" if status_shown else None,
+        "awaiting_user": awaiting_user,
+    }
+    return baseline, table
+
+
+def _reachable(signature) -> bool:
+    has_eligibility, eligible = signature[4], signature[5]
+    # "eligible" without an eligibility result can't happen
+    return has_eligibility or not eligible
+
+
+def test_table_matches_baseline_on_every_flag_combination():
+    router = create_supervisor_router(build_routing_table())
+    mismatches = []
+    compared = 0
+
+    for signature in filter(_reachable, product(*SIGNATURE_DOMAINS)):
+        baseline_state, table_state = _states(signature)
+        compared += 1
+        expected, actual = baseline_route(baseline_state), router(table_state)
+        if expected != actual:
+            mismatches.append((signature, expected, actual))
+
+    assert compared > 10_000
+    assert mismatches == []
+
+
+@pytest.mark.parametrize("halt", [{"error": {"code": "X"}}, {"conversation_complete": True}])
+def test_halted_states_end_the_turn(halt):
+    router = create_supervisor_router()
+    state = {"intent": "return", "order_number": "ORD-2024-001", **halt}
+
+    assert router(state) == baseline_route(state) == "__end__"
@@ -0,0 +1,46 @@
+"""
+Idempotent ticket creation
+"""
+import asyncio
+
+from app.core.indexes import REQUIRED_INDEXES
+from app.services.ticket_service import TicketService
+from conftest import run
+
+
+async def _create_ticket_index(db):
+    for spec in REQUIRED_INDEXES["action_tickets"]:
+        await db.action_tickets.create_index(spec.keys, unique=spec.unique)
+
+
+def test_parallel_identical_requests_create_one_ticket(mongo_db):
+    service = TicketService(mongo_db)
+
+    async def create_in_parallel():
+        await _create_ticket_index(mongo_db)
+        return await asyncio.gather(*(
+            service.create_or_get("ORD-2024-001", "return", f"RET-{i:03d}", customer_email="a@example.com")
+            for i in range(100)
+        ))
+
+    results = run(create_in_parallel())
+
+    assert run(mongo_db.action_tickets.count_documents({})) == 1
+    assert sum(not result.duplicate for result in results) == 1
+    assert len({result.ticket_id for result in results}) == 1
+
+
+def test_different_actions_get_separate_tickets(mongo_db):
+    service = TicketService(mongo_db)
+
+    async def create_both():
+        await _create_ticket_index(mongo_db)
+        return (
+            await service.create_or_get("ORD-2024-001", "return", "RET-1"),
+            await service.create_or_get("ORD-2024-001", "refund", "REF-1"),
+        )
+
+    ret, ref = run(create_both())
+
+    assert not ret.duplicate and not ref.duplicate
+    assert run(mongo_db.action_tickets.count_documents({})) == 2
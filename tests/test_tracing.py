@@ -0,0 +1,93 @@
+"""
+Turn tracing and the Prometheus exposition
+"""
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from langchain_core.outputs import LLMResult
+
+from app.core.metrics import MetricsRegistry, metrics
+from app.core.tracing import COUNT_BUCKETS, TOKEN_BUCKETS, current_turn, llm_metrics_handler, trace_turn
+from app.main import app
+from conftest import run
+
+
+def test_turn_records_node_durations_and_hops(agent):
+    intake = metrics.histogram("node_duration_seconds", node="classify_intent")
+    hops = metrics.histogram("turn_supervisor_hops", COUNT_BUCKETS)
+    before = (intake.count, hops.count, hops.sum)
+
+    result = run(agent.process_message(agent.create_session(), "where is ORD-2024-001"))
+
+    assert result["success"]
+    assert intake.count == before[0] + 1
+    assert hops.count == before[1] + 1
+    assert hops.sum > before[2]
+
+
+def test_trace_turn_scopes_the_stats():
+    async def traced():
+        async with trace_turn("thread-1") as stats:
+            inside = current_turn()
+        return stats, inside, current_turn()
+
+    stats, inside, after = run(traced())
+
+    assert inside is stats and stats.thread_id == "thread-1"
+    assert after is None
+
+
+def test_nested_turn_restores_the_outer_one():
+    async def traced():
+        async with trace_turn("outer") as outer:
+            async with trace_turn("inner"):
+                pass
+            return outer, current_turn()
+
+    outer, restored = run(traced())
+
+    assert restored is outer
+
+
+def test_turn_tokens_use_token_scale_buckets():
+    tokens = metrics.histogram("turn_llm_tokens", TOKEN_BUCKETS)
+    usage = LLMResult(generations=[], llm_output={"token_usage": {"prompt_tokens": 250, "completion_tokens": 50}})
+    before = list(tokens.bucket_counts)
+
+    async def traced():
+        async with trace_turn("thread-1") as stats:
+            llm_metrics_handler.on_llm_end(usage, run_id=uuid4())
+        return stats
+
+    stats = run(traced())
+
+    assert stats.llm_tokens == 300
+    assert tokens.buckets == TOKEN_BUCKETS
+    # Lands in the 512 bucket, not the first bytes-scale one
+    assert tokens.bucket_counts[TOKEN_BUCKETS.index(512)] == before[TOKEN_BUCKETS.index(512)] + 1
+
+
+def test_prometheus_exposition():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", route='say "hi"').inc(2)
+    registry.gauge("connections").set(3)
+    registry.histogram("latency_seconds", (0.1, 1.0)).observe(0.5)
+
+    text = registry.render_prometheus()
+
+    assert '# TYPE requests_total counter\nrequests_total{route="say \\"hi\\""} 2.0' in text
+    assert "connections 3" in text
+    assert 'latency_seconds_bucket{le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{le="1.0"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in text
+    assert "latency_seconds_count 1" in text
+
+
+def test_metrics_endpoint():
+    metrics.counter("tracing_test_total").inc()
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE tracing_test_total counter" in response.text
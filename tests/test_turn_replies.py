@@ -0,0 +1,38 @@
+"""
+Turn replies are collected from the graph's per-node updates
+"""
+from langchain_core.messages import AIMessage
+
+from conftest import run
+
+
+def test_replies_match_the_messages_added_by_the_turn(agent):
+    session_id = agent.create_session()
+
+    async def converse():
+        results = []
+        for message in ("where is my order", "ORD-2024-001"):
+            results.append(await agent.process_message(session_id, message))
+        state = await agent.graph.aget_state({"configurable": {"thread_id": session_id}})
+        return results, state.values["messages"]
+
+    results, messages = run(converse())
+    replies = [content for result in results for content in result["messages"]]
+
+    assert replies == [m.content for m in messages if isinstance(m, AIMessage)]
+
+
+def test_repeated_reply_is_returned_again(agent):
+    session_id = agent.create_session()
+
+    async def converse():
+        return [
+            await agent.process_message(session_id, message)
+            for message in ("where is my order", "ORD-2024-001", "where is my order")
+        ]
+
+    first, _, again = run(converse())
+
+    # Identical text already in the history is still a new reply of this turn
+    assert first["messages"]
+    assert again["messages"] == first["messages"]
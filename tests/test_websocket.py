@@ -0,0 +1,64 @@
+"""
+WebSocket chat transport (/ws/chat)
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture
+def client(agent):
+    # Not used as a context manager: startup would connect to a real MongoDB
+    return TestClient(app)
+
+
+def _receive_turn(ws) -> list:
+    frames = []
+    while not frames or frames[-1]["type"] not in ("done", "error"):
+        frames.append(ws.receive_json())
+    return frames
+
+
+def test_turns_stream_over_one_connection(client):
+    with client.websocket_connect("/ws/chat") as ws:
+        session = ws.receive_json()
+        assert session["type"] == "session" and session["session_id"]
+
+        ws.send_json({"type": "message", "message": "where is my order"})
+        first = _receive_turn(ws)
+        ws.send_json({"type": "message", "message": "ORD-2024-001"})
+        second = _receive_turn(ws)
+
+    assert first[-1]["type"] == "done" and first[-1]["state"]["intent"] == "order_status"
+    assert second[-1]["state"]["has_order"]
+    assert any(frame["type"] == "node" for frame in second)
+    assert any(frame["type"] == "message" and "ORD-2024-001" in frame["content"] for frame in second)
+
+
+def test_known_session_is_resumed(client, agent):
+    session_id = agent.create_session()
+
+    with client.websocket_connect(f"/ws/chat?session_id={session_id}") as ws:
+        assert ws.receive_json() == {"type": "session", "session_id": session_id}
+
+
+def test_tampered_session_gets_a_new_one(client, agent):
+    forged = agent.create_session()[:-1] + "0"
+
+    with client.websocket_connect(f"/ws/chat?session_id={forged}") as ws:
+        assert ws.receive_json()["session_id"] != forged
+
+
+def test_control_frames(client):
+    with client.websocket_connect("/ws/chat") as ws:
+        ws.receive_json()
+
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+
+        ws.send_text("not json")
+        assert ws.receive_json() == {"type": "error", "error": "invalid_json"}
+
+        ws.send_json({"type": "subscribe"})
+        assert ws.receive_json() == {"type": "error", "error": "unknown_frame"}